@@ -0,0 +1,211 @@
+"""
+RMF Fund Store for the Python MCP Server
+
+Loads the RMF corpus (data/rmf-funds/*.json) once and keeps it in an
+immutable, fork-friendly layout:
+- one compact JSON ``bytes`` blob per fund, addressed by symbol
+- NAV history packed into three flat typed arrays (dates, values, offsets)
+- a sorted tuple of symbols
+
+Text fields the SEC API delivers base64-encoded (``suitability.risk_level``)
+are decoded to plain UTF-8 at load time, so responses do not carry the
+base64 form. Set ``RMF_NORMALIZE_TEXT=0`` to keep them as delivered.
+
+Nothing in the store is mutated after load. When the store is built in a
+pre-fork master and ``freeze()`` is called before forking, the workers keep
+sharing the master's pages instead of each holding its own copy.
+"""
+
+import base64
+import binascii
+import gc
+import json
+import os
+import re
+from array import array
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_DATA_DIR = Path(__file__).resolve().parents[3] / "data" / "rmf-funds"
+
+# Fields whose values arrive as base64-encoded UTF-8, by section
+ENCODED_FIELDS = {
+    "suitability": ("risk_level",),
+}
+
+# ENCODED_FIELDS, _BASE64 and decode_text mirror utility/sec-api-example/corpus/FundModel.py,
+# which writes the corpus this store reads. The example stays importable on its own, so
+# they are copied rather than imported; change both together.
+_BASE64 = re.compile(r"[A-Za-z0-9+/]+={0,2}")
+
+# ============================================================================
+# Text Normalization
+# ============================================================================
+
+def decode_text(value: Any) -> Any:
+    """Decode a base64 UTF-8 string; return anything else unchanged"""
+    if not isinstance(value, str) or len(value) % 4 or not _BASE64.fullmatch(value):
+        return value
+    try:
+        text = base64.b64decode(value, validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError):
+        return value
+    # Short plain words can be valid base64 too ("High"); keep them if the result is junk
+    return text if text.replace("\n", "").replace("\r", "").replace("\t", "").isprintable() else value
+
+def normalize_text(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace the record's base64-encoded text fields with plain text (in place)"""
+    for section, names in ENCODED_FIELDS.items():
+        values = record.get(section)
+        if not isinstance(values, dict):
+            continue
+        for name in names:
+            if name in values:
+                values[name] = decode_text(values[name])
+    return record
+
+# ============================================================================
+# Fund Store
+# ============================================================================
+
+class FundStore:
+    """Read-only view over the RMF fund corpus"""
+
+    __slots__ = (
+        "data_dir",
+        "version",
+        "symbols",
+        "_index",
+        "_blobs",
+        "_nav_offsets",
+        "_nav_dates",
+        "_nav_values",
+    )
+
+    def __init__(
+        self,
+        data_dir: Path,
+        version: str,
+        symbols: Tuple[str, ...],
+        blobs: Tuple[bytes, ...],
+        nav_offsets: array,
+        nav_dates: array,
+        nav_values: array
+    ):
+        self.data_dir = data_dir
+        self.version = version
+        self.symbols = symbols
+        self._index = {s.upper(): i for i, s in enumerate(symbols)}
+        self._blobs = blobs
+        self._nav_offsets = nav_offsets
+        self._nav_dates = nav_dates
+        self._nav_values = nav_values
+
+    @classmethod
+    def load(
+        cls,
+        data_dir: Optional[Path] = None,
+        normalize: Optional[bool] = None
+    ) -> "FundStore":
+        """Load every fund JSON file in ``data_dir`` into a new store"""
+        data_dir = Path(data_dir or os.getenv("RMF_DATA_DIR") or DEFAULT_DATA_DIR)
+        if normalize is None:
+            normalize = os.getenv("RMF_NORMALIZE_TEXT", "1").lower() not in ("0", "false", "no")
+        paths = sorted(data_dir.glob("*.json"))
+
+        records = []
+        latest_mtime = 0.0
+        for path in paths:
+            try:
+                record = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not load fund file: {path.name}", e)
+                continue
+            if not record.get("symbol"):
+                continue
+            if normalize:
+                normalize_text(record)
+            records.append(record)
+            latest_mtime = max(latest_mtime, path.stat().st_mtime)
+
+        records.sort(key=lambda r: r["symbol"])
+
+        nav_offsets = array("q", [0])
+        nav_dates = array("l")
+        nav_values = array("d")
+        blobs = []
+        for record in records:
+            history = sorted(
+                (h for h in record.get("nav_history_30d") or [] if h.get("nav_date")),
+                key=lambda h: h["nav_date"]
+            )
+            for entry in history:
+                nav_dates.append(date.fromisoformat(entry["nav_date"][:10]).toordinal())
+                nav_values.append(float(entry.get("last_val") or 0.0))
+            nav_offsets.append(len(nav_values))
+            blobs.append(
+                json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            )
+
+        version = f"{len(records)}-{int(latest_mtime)}"
+        return cls(
+            data_dir=data_dir,
+            version=version,
+            symbols=tuple(r["symbol"] for r in records),
+            blobs=tuple(blobs),
+            nav_offsets=nav_offsets,
+            nav_dates=nav_dates,
+            nav_values=nav_values
+        )
+
+    # -------------------------------------------------------------------------
+    # Lookups
+    # -------------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol.upper() in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.symbols)
+
+    def get_raw(self, symbol: str) -> Optional[bytes]:
+        """Return the fund's JSON blob without decoding it"""
+        i = self._index.get(symbol.upper())
+        return None if i is None else self._blobs[i]
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Return a freshly decoded copy of the fund record"""
+        blob = self.get_raw(symbol)
+        return None if blob is None else json.loads(blob)
+
+    def nav_history(self, symbol: str) -> List[Dict[str, Any]]:
+        """Return the fund's NAV history (oldest first) as date/nav pairs"""
+        i = self._index.get(symbol.upper())
+        if i is None:
+            return []
+        start, end = self._nav_offsets[i], self._nav_offsets[i + 1]
+        return [
+            {
+                "date": date.fromordinal(self._nav_dates[j]).isoformat(),
+                "nav": self._nav_values[j]
+            }
+            for j in range(start, end)
+        ]
+
+    # -------------------------------------------------------------------------
+    # Pre-fork support
+    # -------------------------------------------------------------------------
+
+    def freeze(self) -> None:
+        """Move everything allocated so far into the permanent GC generation
+
+        Called in the master right before forking. Frozen objects are never
+        scanned by the collector, so workers do not touch (and copy) their
+        pages just by running a GC pass.
+        """
+        gc.collect()
+        gc.freeze()
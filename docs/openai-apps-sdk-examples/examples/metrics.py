@@ -0,0 +1,308 @@
+"""
+Metrics for the Python MCP Server
+
+Collects per-tool, per-resource and per-route counters and latency
+histograms, and renders them in the Prometheus text exposition format for
+the ``/metrics`` endpoint.
+
+- ``MetricsMiddleware``: ASGI middleware timing every HTTP request
+- ``metrics.track(kind, name)``: context manager timing one tool call or
+  resource read, with ``phase()`` breakdowns (validate, lookup, serialize)
+- ``SamplingProfiler``: optional stack sampler (``MCP_PROFILE=1``) whose
+  folded stacks can be fed straight into flamegraph.pl / speedscope
+
+In prefork mode every worker keeps its own registry, so each scrape reports
+the worker that answered it.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Latency buckets in seconds (upper bounds); +Inf is implicit
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Payload size buckets in bytes
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# ============================================================================
+# Primitives
+# ============================================================================
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics)"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self) -> List[int]:
+        total, result = 0, []
+        for c in self.counts:
+            total += c
+            result.append(total)
+        return result
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in pairs
+    )
+    return "{" + body + "}"
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+# ============================================================================
+# Registry
+# ============================================================================
+
+class MetricsRegistry:
+    """Thread-safe store of counters and histograms keyed by label set"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._help: Dict[str, Tuple[str, str]] = {}
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, labels: Dict[str, str], value: float = 1) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(
+        self,
+        name: str,
+        labels: Dict[str, str],
+        value: float,
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = Histogram(buckets)
+            hist.observe(value)
+
+    @contextmanager
+    def track(self, kind: str, name: str) -> Iterator["CallTracker"]:
+        """Time one tool call / resource read and record its outcome"""
+        tracker = CallTracker(self, kind, name)
+        start = time.perf_counter()
+        try:
+            yield tracker
+        except BaseException:
+            # Keep a status the handler set before raising (e.g. "not_found")
+            if tracker.status == "ok":
+                tracker.status = "error"
+            raise
+        finally:
+            labels = {"kind": kind, "name": name}
+            self.inc("mcp_calls_total", {**labels, "status": tracker.status})
+            if tracker.status == "error":
+                self.inc("mcp_call_errors_total", labels)
+            self.observe("mcp_call_duration_seconds", labels, time.perf_counter() - start)
+            if tracker.payload_bytes is not None:
+                self.observe("mcp_call_payload_bytes", labels, tracker.payload_bytes, SIZE_BUCKETS)
+
+    def render(self) -> str:
+        """Render every series in the Prometheus text format"""
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self._counters):
+                self._render_header(lines, name, "counter")
+                for labels, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            for name in sorted(self._histograms):
+                self._render_header(lines, name, "histogram")
+                for labels, hist in sorted(self._histograms[name].items()):
+                    for bound, total in zip(hist.buckets, hist.cumulative()):
+                        lines.append(f"{name}_bucket{_format_labels(labels, ('le', repr(float(bound))))} {total}")
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {hist.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {hist.sum!r}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def _render_header(self, lines: List[str], name: str, default_kind: str) -> None:
+        kind, help_text = self._help.get(name, (default_kind, ""))
+        if help_text:
+            lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+class CallTracker:
+    """Handle yielded by ``MetricsRegistry.track`` for phase timing"""
+
+    __slots__ = ("registry", "kind", "name", "status", "payload_bytes")
+
+    def __init__(self, registry: MetricsRegistry, kind: str, name: str):
+        self.registry = registry
+        self.kind = kind
+        self.name = name
+        self.status = "ok"
+        self.payload_bytes: Optional[int] = None
+
+    @contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registry.observe(
+                "mcp_call_phase_duration_seconds",
+                {"kind": self.kind, "name": self.name, "phase": phase},
+                time.perf_counter() - start
+            )
+
+# ============================================================================
+# HTTP Middleware
+# ============================================================================
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and response size per route"""
+
+    def __init__(self, app: Any, registry: "MetricsRegistry"):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = {"status": 500, "bytes": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                state["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        # Read before the call: a mounted sub-app updates the scope in place
+        app, path = scope.get("app"), scope.get("path", "")
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            labels = {"method": scope.get("method", ""), "route": _route_label(scope, app, path)}
+            status = str(state["status"])
+            self.registry.inc("http_requests_total", {**labels, "status": status})
+            if state["status"] >= 500:
+                self.registry.inc("http_request_errors_total", labels)
+            self.registry.observe("http_request_duration_seconds", labels, time.perf_counter() - start)
+            self.registry.observe("http_response_bytes", labels, state["bytes"], SIZE_BUCKETS)
+
+def _route_label(scope, app, path: str) -> str:
+    """Matched route template, prefixed by the mount it sits under, so
+    unknown paths cannot explode label cardinality"""
+    route = scope.get("route")
+    template = getattr(route, "path", None) if route is not None else None
+    # Mounted sub-apps (the MCP app at /mcp) match their own routes, or none
+    for mount in getattr(app, "routes", ()):
+        prefix = getattr(mount, "path", None)
+        if prefix and not hasattr(mount, "endpoint") and (path == prefix or path.startswith(prefix + "/")):
+            if template is None or route is mount:
+                return prefix
+            return prefix + template
+    return template if template is not None else "unmatched"
+
+# ============================================================================
+# Sampling Profiler
+# ============================================================================
+
+class SamplingProfiler:
+    """Background thread sampling every thread's stack at a fixed interval
+
+    Stacks are aggregated in collapsed ("folded") form: one line per unique
+    stack, frames separated by ``;``, followed by the sample count.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self._samples: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                with self._lock:
+                    self._samples[";".join(reversed(stack))] += 1
+
+    def folded(self, reset: bool = False) -> str:
+        with self._lock:
+            lines = [f"{stack} {count}" for stack, count in self._samples.most_common()]
+            if reset:
+                self._samples.clear()
+        return "\n".join(lines) + "\n"
+
+# ============================================================================
+# Defaults
+# ============================================================================
+
+metrics = MetricsRegistry()
+metrics.describe("mcp_calls_total", "counter", "Tool calls and resource reads by outcome")
+metrics.describe("mcp_call_errors_total", "counter", "Tool calls and resource reads that raised")
+metrics.describe("mcp_call_duration_seconds", "histogram", "End-to-end tool/resource handler latency")
+metrics.describe("mcp_call_phase_duration_seconds", "histogram", "Handler latency by phase")
+metrics.describe("mcp_call_payload_bytes", "histogram", "Serialized tool/resource payload size")
+metrics.describe("http_requests_total", "counter", "HTTP requests by route and status")
+metrics.describe("http_request_errors_total", "counter", "HTTP requests answered with a 5xx")
+metrics.describe("http_request_duration_seconds", "histogram", "HTTP request latency by route")
+metrics.describe("http_response_bytes", "histogram", "HTTP response body size by route")
+
+def profiler_from_env() -> Optional[SamplingProfiler]:
+    """Build the sampling profiler if MCP_PROFILE is set"""
+    if os.getenv("MCP_PROFILE", "").lower() not in ("1", "true", "yes"):
+        return None
+    interval_ms = float(os.getenv("MCP_PROFILE_INTERVAL_MS", "10"))
+    return SamplingProfiler(interval=interval_ms / 1000)
@@ -0,0 +1,239 @@
+"""
+Pre-fork Serving for the Python MCP Server
+
+The master process binds the listening socket, runs ``before_fork`` (load and
+freeze the fund store), then forks N uvicorn workers that all accept on the
+shared socket. Because the corpus is loaded before forking, every worker
+reads the same copy-on-write pages instead of loading its own.
+
+Signals handled by the master:
+- SIGTERM / SIGINT: graceful shutdown of all workers
+- SIGHUP: rolling restart (new worker up before the old one is stopped)
+
+With a ``watch`` callable the master also checks for new data every
+``watch_interval`` seconds: when ``watch()`` returns True it has loaded a new
+fund store, which is frozen again and handed to the workers by a rolling
+restart, so they go on sharing one copy.
+
+Workers recycle themselves after ``max_requests`` (plus jitter, so they do
+not all restart at once); the master replaces any worker that exits.
+"""
+
+import os
+import random
+import signal
+import socket
+import time
+from typing import Any, Callable, Dict, Optional
+
+import uvicorn
+
+# ============================================================================
+# Helpers
+# ============================================================================
+
+def default_worker_count() -> int:
+    """Number of CPUs this process may run on"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Create the listening socket shared by all workers"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+# ============================================================================
+# Pre-fork Master
+# ============================================================================
+
+class PreforkMaster:
+    """Fork and supervise uvicorn workers sharing one listening socket"""
+
+    # A worker that dies faster than this is treated as crashing on boot
+    MIN_WORKER_LIFETIME = 1.0
+
+    def __init__(
+        self,
+        app: Any,
+        host: str,
+        port: int,
+        workers: Optional[int] = None,
+        max_requests: int = 0,
+        max_requests_jitter: int = 0,
+        graceful_timeout: int = 30,
+        before_fork: Optional[Callable[[], None]] = None,
+        watch: Optional[Callable[[], bool]] = None,
+        watch_interval: float = 5.0,
+        log_level: str = "info"
+    ):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.num_workers = workers or default_worker_count()
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.before_fork = before_fork
+        self.watch = watch
+        self.watch_interval = watch_interval
+        self.log_level = log_level
+
+        self._sock: Optional[socket.socket] = None
+        self._workers: Dict[int, float] = {}
+        self._stopping = False
+        self._reload = False
+
+    # -------------------------------------------------------------------------
+    # Master loop
+    # -------------------------------------------------------------------------
+
+    def run(self) -> None:
+        """Start the workers and supervise them until shutdown"""
+        self._sock = bind_socket(self.host, self.port)
+
+        if self.before_fork is not None:
+            self.before_fork()
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+        print(f"Pre-fork master {os.getpid()}: starting {self.num_workers} workers")
+        for _ in range(self.num_workers):
+            self._spawn()
+
+        next_watch = time.monotonic() + self.watch_interval
+        try:
+            while not self._stopping:
+                self._reap()
+                if self.watch is not None and time.monotonic() >= next_watch:
+                    next_watch = time.monotonic() + self.watch_interval
+                    if self._check_watch():
+                        self._reload = True
+                if self._reload:
+                    self._reload = False
+                    self._rolling_restart()
+                while not self._stopping and len(self._workers) < self.num_workers:
+                    self._spawn()
+                time.sleep(0.5)
+        finally:
+            self._shutdown()
+            self._sock.close()
+
+    def _check_watch(self) -> bool:
+        """Run ``watch``; after new data, prepare it for the next forks"""
+        try:
+            changed = self.watch()
+        except Exception as e:
+            print("Warning: watch failed:", e)
+            return False
+        if not changed:
+            return False
+        if self.before_fork is not None:
+            self.before_fork()
+        print(f"Pre-fork master {os.getpid()}: new data, restarting workers")
+        return True
+
+    def _handle_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _handle_reload(self, signum, frame) -> None:
+        self._reload = True
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker()
+        self._workers[pid] = time.monotonic()
+
+    def _reap(self) -> None:
+        """Collect exited workers; crash-looping workers back off briefly"""
+        while self._workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self._workers.clear()
+                return
+            if pid == 0:
+                return
+            started = self._workers.pop(pid, None)
+            if started is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            # uvicorn re-raises SIGTERM after a graceful shutdown
+            if code not in (0, -signal.SIGTERM):
+                print(f"Worker {pid} exited with code {code}")
+            if time.monotonic() - started < self.MIN_WORKER_LIFETIME:
+                time.sleep(self.MIN_WORKER_LIFETIME)
+
+    def _rolling_restart(self) -> None:
+        """Replace workers one at a time so capacity never drops to zero"""
+        for pid in list(self._workers):
+            self._spawn()
+            self._terminate(pid)
+            self._wait_for(lambda: pid not in self._workers, self.graceful_timeout)
+
+    def _terminate(self, pid: int) -> None:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            self._workers.pop(pid, None)
+
+    def _wait_for(self, done: Callable[[], bool], timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            self._reap()
+            if done():
+                return True
+            time.sleep(0.1)
+        return done()
+
+    def _shutdown(self) -> None:
+        """Ask every worker to finish in-flight requests, then force-kill"""
+        for pid in list(self._workers):
+            self._terminate(pid)
+        if not self._wait_for(lambda: not self._workers, self.graceful_timeout):
+            for pid in list(self._workers):
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+            self._wait_for(lambda: not self._workers, 5)
+        print(f"Pre-fork master {os.getpid()}: all workers stopped")
+
+    # -------------------------------------------------------------------------
+    # Worker
+    # -------------------------------------------------------------------------
+
+    def _run_worker(self) -> None:
+        """Body of a forked worker; never returns"""
+        code = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGHUP, signal.SIG_DFL)
+            random.seed()
+
+            limit = None
+            if self.max_requests > 0:
+                limit = self.max_requests + random.randint(0, max(self.max_requests_jitter, 0))
+
+            config = uvicorn.Config(
+                self.app,
+                log_level=self.log_level,
+                limit_max_requests=limit,
+                timeout_graceful_shutdown=self.graceful_timeout
+            )
+            uvicorn.Server(config).run(sockets=[self._sock])
+        except BaseException as e:
+            print(f"Worker {os.getpid()} failed:", e)
+            code = 1
+        finally:
+            os._exit(code)
@@ -8,8 +8,13 @@ This example demonstrates:
 - Handling tool invocations
 - Serving widget resources
 - FastAPI integration
+- Pre-fork multi-worker serving over a shared, frozen fund store
+- Per-tool / per-resource metrics at /metrics (Prometheus text format)
+- Short-TTL tool result cache with single-flight coalescing
+- Hot reload of the fund store when the corpus on disk changes
 """
 
+import asyncio
 import os
 import json
 from typing import Any, Dict, List, Optional
@@ -17,9 +22,16 @@ from pathlib import Path
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, Field
 import uvicorn
 
+from fund_store import FundStore
+from metrics import MetricsMiddleware, metrics, profiler_from_env
+from prefork import PreforkMaster, default_worker_count
+from store_reload import StoreHandle, StoreWatcher, load_current
+from tool_cache import ToolResultCache
+
 try:
     from mcp.server.fastmcp import FastMCP
 except ImportError:
@@ -37,6 +49,42 @@ HOST = os.getenv("HOST", "127.0.0.1")
 WIDGET_BASE_URL = os.getenv("WIDGET_BASE_URL", "http://localhost:4444/assets")
 CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*").split(",")
 
+# "single" runs one uvicorn worker; "prefork" loads the fund store once in a
+# master process and forks WORKERS workers that share it copy-on-write
+SERVE_MODE = os.getenv("SERVE_MODE", "single")
+WORKERS = int(os.getenv("WORKERS", "0")) or default_worker_count()
+MAX_REQUESTS = int(os.getenv("MAX_REQUESTS", "0"))
+MAX_REQUESTS_JITTER = int(os.getenv("MAX_REQUESTS_JITTER", "0"))
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+
+# Tool results are cached until TOOL_CACHE_TTL seconds pass or the daily NAV
+# refresh (NAV_REFRESH_TIME, Bangkok time) happens; TOOL_CACHE_TTL=0 disables
+TOOL_CACHE_TTL = float(os.getenv("TOOL_CACHE_TTL", "300"))
+TOOL_CACHE_MAX_ENTRIES = int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "1024"))
+NAV_REFRESH_TIME = os.getenv("NAV_REFRESH_TIME", "20:00")
+
+# The corpus is checked for updates every STORE_RELOAD_INTERVAL seconds and a
+# changed one is loaded and swapped in without a restart; 0 disables
+STORE_RELOAD_INTERVAL = float(os.getenv("STORE_RELOAD_INTERVAL", "5"))
+
+# ============================================================================
+# Fund Store
+# ============================================================================
+
+# Loaded at import so that in prefork mode it lives in the master's memory;
+# requests lease the current store from the handle
+store_handle = StoreHandle(load_current())
+
+metrics.describe("mcp_store_reloads_total", "counter", "Fund store reload attempts by outcome")
+metrics.describe("mcp_store_reload_seconds", "histogram", "Time to load a new fund store")
+
+def record_reload(event: str, seconds: float) -> None:
+    metrics.inc("mcp_store_reloads_total", {"result": event})
+    if event == "reload":
+        metrics.observe("mcp_store_reload_seconds", {}, seconds)
+
+store_watcher = StoreWatcher(store_handle, interval=STORE_RELOAD_INTERVAL, on_event=record_reload)
+
 # ============================================================================
 # Widget Definition
 # ============================================================================
@@ -133,6 +181,27 @@ def load_widget_html(filename: str) -> str:
 </html>
     """.strip()
 
+def extract_fund_codes(data: Dict[str, Any]) -> List[str]:
+    """Collect the fund codes referenced by a widget payload"""
+    codes = data.get("fundCodes") or ([data["fundCode"]] if data.get("fundCode") else [])
+    if not isinstance(codes, list) or not all(isinstance(c, str) for c in codes):
+        raise ValueError("fundCode/fundCodes must be a string or a list of strings")
+    return codes
+
+def lookup_fund_data(data: Dict[str, Any], codes: List[str], store: FundStore) -> Dict[str, Any]:
+    """Attach fund records from the store for the given fund codes"""
+    if not codes:
+        return data
+
+    funds = []
+    for code in codes:
+        fund = store.get(code)
+        if fund is not None:
+            fund["nav_history"] = store.nav_history(code)
+            funds.append(fund)
+
+    return {**data, "funds": funds}
+
 # ============================================================================
 # Widget Registry
 # ============================================================================
@@ -194,6 +263,18 @@ class WidgetInput(BaseModel):
 
 mcp = FastMCP("rmf-market-pulse-mcp")
 
+metrics.describe("mcp_tool_cache_requests_total", "counter", "Tool result cache lookups by outcome")
+
+tool_cache = ToolResultCache(
+    ttl=TOOL_CACHE_TTL,
+    max_entries=TOOL_CACHE_MAX_ENTRIES,
+    nav_refresh_time=NAV_REFRESH_TIME,
+    version=lambda: store_handle.current.version,
+    on_event=lambda tool, event: metrics.inc(
+        "mcp_tool_cache_requests_total", {"tool": tool, "result": event}
+    )
+)
+
 # -------------------------------------------------------------------------
 # Dynamic Tool Registration
 # -------------------------------------------------------------------------
@@ -204,28 +285,24 @@ def create_tool_handler(widget: Widget):
         """Handle tool invocation for this widget"""
         print(f"Tool called: {widget.id}", input.data)
 
-        # In a real implementation, you would:
-        # 1. Fetch data from your database/API
-        # 2. Process the data according to the widget's needs
-        # 3. Return structured content with the widget metadata
+        with metrics.track("tool", widget.id) as call:
+            async def compute() -> Dict[str, Any]:
+                with call.phase("validate"):
+                    codes = extract_fund_codes(input.data)
 
-        return {
-            "content": [
-                {
-                    "type": "text",
-                    "text": widget.response_text
-                }
-            ],
-            # Pass through the data to the widget
-            "structuredContent": input.data,
-            # Widget metadata for ChatGPT
-            "_meta": {
-                "openai/outputTemplate": {
-                    "templateUri": widget.template_uri
-                },
-                "openai/invocationStates": widget.invocation_states
-            }
-        }
+                # Resolve any fund codes against the in-memory fund store;
+                # the lease keeps this call on one store through a reload
+                with call.phase("lookup"), store_handle.lease() as store:
+                    data = lookup_fund_data(input.data, codes, store)
+
+                with call.phase("serialize"):
+                    result = build_tool_result(widget, data)
+                    call.payload_bytes = len(json.dumps(result, ensure_ascii=False).encode("utf-8"))
+
+                return result
+
+            # Identical concurrent calls share one computation
+            return await tool_cache.get_or_compute(widget.id, input.data, compute)
 
     # Set function metadata
     handler.__name__ = widget.id
@@ -233,6 +310,26 @@ def create_tool_handler(widget: Widget):
 
     return handler
 
+def build_tool_result(widget: Widget, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Wrap structured data in the MCP tool result shape for a widget"""
+    return {
+        "content": [
+            {
+                "type": "text",
+                "text": widget.response_text
+            }
+        ],
+        # Pass through the data to the widget
+        "structuredContent": data,
+        # Widget metadata for ChatGPT
+        "_meta": {
+            "openai/outputTemplate": {
+                "templateUri": widget.template_uri
+            },
+            "openai/invocationStates": widget.invocation_states
+        }
+    }
+
 # Register all widgets as tools
 for widget in widgets:
     tool_func = create_tool_handler(widget)
@@ -250,11 +347,16 @@ async def list_resources() -> List[Dict[str, Any]]:
 @mcp.read_resource()
 async def read_resource(uri: str) -> str:
     """Read widget HTML content"""
-    for widget in widgets:
-        if widget.template_uri == uri:
-            return widget.html
+    widget = next((w for w in widgets if w.template_uri == uri), None)
+
+    # Labelled by widget, not by the requested URI, which the client chooses
+    with metrics.track("resource", widget.id if widget is not None else "unknown") as call:
+        if widget is None:
+            call.status = "not_found"
+            raise HTTPException(status_code=404, detail=f"Resource not found: {uri}")
 
-    raise HTTPException(status_code=404, detail=f"Resource not found: {uri}")
+        call.payload_bytes = len(widget.html.encode("utf-8"))
+        return widget.html
 
 # ============================================================================
 # FastAPI Application Setup
@@ -278,6 +380,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# -------------------------------------------------------------------------
+# Metrics Middleware
+# -------------------------------------------------------------------------
+
+app.add_middleware(MetricsMiddleware, registry=metrics)
+
+# Optional sampling profiler (MCP_PROFILE=1); started per worker because
+# threads do not survive fork
+profiler = profiler_from_env()
+
+@app.on_event("startup")
+async def start_profiler():
+    if profiler is not None:
+        profiler.start()
+
+# In prefork mode the master watches the corpus and rolls the workers over,
+# which start with empty caches
+@app.on_event("startup")
+async def start_store_watcher():
+    if SERVE_MODE != "prefork":
+        # Results computed from the old store are unreachable after a swap;
+        # the cache belongs to the event loop, so the clear is handed to it
+        loop = asyncio.get_running_loop()
+        store_handle.on_swap.append(lambda old, new: loop.call_soon_threadsafe(tool_cache.clear))
+        store_watcher.start()
+
 # -------------------------------------------------------------------------
 # Routes
 # -------------------------------------------------------------------------
@@ -290,7 +418,9 @@ async def root():
         "version": "1.0.0",
         "mcp_endpoint": "/mcp",
         "health_endpoint": "/health",
-        "widgets": len(widgets)
+        "metrics_endpoint": "/metrics",
+        "widgets": len(widgets),
+        "funds": len(store_handle.current)
     }
 
 @app.get("/health")
@@ -299,9 +429,28 @@ async def health():
     return {
         "status": "ok",
         "timestamp": __import__("datetime").datetime.now().isoformat(),
-        "widgets": len(widgets)
+        "widgets": len(widgets),
+        "funds": len(store_handle.current),
+        "data_version": store_handle.current.version,
+        "store": store_handle.stats(),
+        "pid": os.getpid()
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus-style metrics for this worker"""
+    return PlainTextResponse(
+        metrics.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+@app.get("/debug/profile", response_class=PlainTextResponse)
+async def profile_endpoint(reset: bool = False):
+    """Folded stacks from the sampling profiler (flame graph input)"""
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="Profiler disabled (set MCP_PROFILE=1)")
+    return PlainTextResponse(profiler.folded(reset=reset))
+
 # -------------------------------------------------------------------------
 # Mount MCP Server
 # -------------------------------------------------------------------------
@@ -324,17 +473,36 @@ if __name__ == "__main__":
 ║  Health Check: http://{HOST}:{PORT}/health                     ║
 ║  Widget Base URL: {WIDGET_BASE_URL}                            ║
 ║  Widgets: {widgets_count}                                      ║
+║  Funds: {funds_count}                                          ║
+║  Serve Mode: {serve_mode}                                      ║
 ╚════════════════════════════════════════════════════════════════╝
     """.format(
         PORT=PORT,
         HOST=HOST,
         WIDGET_BASE_URL=WIDGET_BASE_URL,
-        widgets_count=len(widgets)
+        widgets_count=len(widgets),
+        funds_count=len(store_handle.current),
+        serve_mode=SERVE_MODE if SERVE_MODE != "prefork" else f"prefork x{WORKERS}"
     ))
 
-    uvicorn.run(
-        app,
-        host=HOST,
-        port=PORT,
-        log_level="info"
-    )
+    if SERVE_MODE == "prefork":
+        PreforkMaster(
+            app,
+            host=HOST,
+            port=PORT,
+            workers=WORKERS,
+            max_requests=MAX_REQUESTS,
+            max_requests_jitter=MAX_REQUESTS_JITTER,
+            graceful_timeout=GRACEFUL_TIMEOUT,
+            before_fork=lambda: store_handle.current.freeze(),
+            watch=store_watcher.poll if STORE_RELOAD_INTERVAL > 0 else None,
+            watch_interval=STORE_RELOAD_INTERVAL,
+            log_level="info"
+        ).run()
+    else:
+        uvicorn.run(
+            app,
+            host=HOST,
+            port=PORT,
+            log_level="info"
+        )
@@ -0,0 +1,230 @@
+"""
+Hot Reload of the Fund Store for the Python MCP Server
+
+Swaps a freshly loaded ``FundStore`` in while the server keeps answering:
+
+- ``StoreHandle`` holds the current store. A request takes a ``lease()``
+  and sees that one store until it is done, even if a swap happens in
+  between. A swap only flips a reference under a short lock, and loading
+  never happens under that lock, so requests never wait for a reload. A
+  replaced store is dropped once its last lease is returned.
+- ``StoreWatcher`` polls the corpus every ``interval`` seconds by file
+  mtime, without an inotify dependency. It builds the new store off the
+  request path, then swaps it in and runs the handle's ``on_swap``
+  callbacks; the server clears its tool result cache there.
+
+What is watched:
+- The refresh service's snapshot file (``data/rmf-funds.snapshot.json``),
+  when it exists. It names a complete copy of each corpus version
+  (``data/rmf-funds.versions/vN``), and the store is loaded from that copy,
+  so a reload never sees half of an update.
+- Otherwise the JSON files themselves. A change must then hold still for
+  one more poll, so a crawler that is halfway through writing is not
+  picked up.
+
+In prefork mode the master calls ``poll()`` from its supervision loop,
+loads the new store itself and rolls the workers over. The workers
+therefore keep sharing the master's frozen pages.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from fund_store import DEFAULT_DATA_DIR, FundStore
+
+# ============================================================================
+# Store Handle
+# ============================================================================
+
+class _Generation:
+    """One loaded store and the requests still holding it"""
+
+    __slots__ = ("store", "leases", "retired")
+
+    def __init__(self, store: FundStore):
+        self.store = store
+        self.leases = 0
+        self.retired = False
+
+class StoreHandle:
+    """Reference-counted access to the current fund store"""
+
+    def __init__(self, store: FundStore):
+        self._lock = threading.Lock()
+        self._current = _Generation(store)
+        self._draining: List[_Generation] = []
+        self.swaps = 0
+        self.on_swap: List[Callable[[FundStore, FundStore], None]] = []
+
+    @property
+    def current(self) -> FundStore:
+        """The store new requests get (for reads that need no lease)"""
+        return self._current.store
+
+    @contextmanager
+    def lease(self) -> Iterator[FundStore]:
+        """Pin the current store for the duration of one request"""
+        with self._lock:
+            generation = self._current
+            generation.leases += 1
+        try:
+            yield generation.store
+        finally:
+            with self._lock:
+                generation.leases -= 1
+                if generation.retired and generation.leases == 0:
+                    self._draining.remove(generation)
+
+    def swap(self, store: FundStore) -> FundStore:
+        """Make ``store`` current; the old one lives until its leases end"""
+        with self._lock:
+            old = self._current
+            self._current = _Generation(store)
+            old.retired = True
+            if old.leases:
+                self._draining.append(old)
+            self.swaps += 1
+        for callback in self.on_swap:
+            callback(old.store, store)
+        return old.store
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "version": self._current.store.version,
+                "funds": len(self._current.store),
+                "leases": self._current.leases,
+                "swaps": self.swaps,
+                "draining": [
+                    {"version": g.store.version, "leases": g.leases} for g in self._draining
+                ]
+            }
+
+# ============================================================================
+# Watcher
+# ============================================================================
+
+def default_snapshot_path(data_dir: Path) -> Path:
+    """``data/rmf-funds`` -> ``data/rmf-funds.snapshot.json`` (RefreshService.py)"""
+    return Path(os.getenv("RMF_SNAPSHOT_PATH") or data_dir.with_name(data_dir.name + ".snapshot.json"))
+
+def current_data_dir(data_dir: Path, snapshot_path: Optional[Path] = None) -> Path:
+    """Folder of the current corpus version: the one the snapshot names, else ``data_dir``"""
+    snapshot_path = Path(snapshot_path or default_snapshot_path(data_dir))
+    try:
+        directory = json.loads(snapshot_path.read_text(encoding="utf-8")).get("directory")
+    except (OSError, ValueError):
+        directory = None
+    return snapshot_path.parent / directory if directory else data_dir
+
+def load_current(data_dir: Optional[Path] = None, snapshot_path: Optional[Path] = None) -> FundStore:
+    """Load the store from the current corpus version"""
+    data_dir = Path(data_dir or os.getenv("RMF_DATA_DIR") or DEFAULT_DATA_DIR)
+    return FundStore.load(current_data_dir(data_dir, snapshot_path))
+
+def corpus_signature(data_dir: Path, snapshot_path: Path) -> Tuple:
+    """Changes whenever the corpus does: the snapshot file, else the JSON files"""
+    try:
+        stat = os.stat(snapshot_path)
+        return ("snapshot", stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        pass
+    count, latest = 0, 0
+    try:
+        with os.scandir(data_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json"):
+                    count += 1
+                    latest = max(latest, entry.stat().st_mtime_ns)
+    except FileNotFoundError:
+        pass
+    return ("files", count, latest)
+
+class StoreWatcher:
+    """Reload the fund store when the corpus on disk changes"""
+
+    def __init__(
+        self,
+        handle: StoreHandle,
+        interval: float = 5.0,
+        data_dir: Optional[Path] = None,
+        snapshot_path: Optional[Path] = None,
+        loader: Optional[Callable[[], FundStore]] = None,
+        on_event: Optional[Callable[[str, float], None]] = None
+    ):
+        self.handle = handle
+        self.interval = interval
+        self.data_dir = Path(data_dir or os.getenv("RMF_DATA_DIR") or DEFAULT_DATA_DIR)
+        self.snapshot_path = Path(snapshot_path or default_snapshot_path(self.data_dir))
+        self.loader = loader or (lambda: load_current(self.data_dir, self.snapshot_path))
+        self.on_event = on_event
+
+        # Signature of the corpus the current store was loaded from
+        self._seen = corpus_signature(self.data_dir, self.snapshot_path)
+        self._pending: Optional[Tuple] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"reload": 0, "error": 0, "retry": 0}
+
+    def poll(self) -> bool:
+        """Check the corpus once; load and swap if it changed. True after a swap"""
+        signature = corpus_signature(self.data_dir, self.snapshot_path)
+        if signature == self._seen:
+            self._pending = None
+            return False
+        if signature[0] == "files" and signature != self._pending:
+            # Files still being written: wait until they hold still
+            self._pending = signature
+            return False
+
+        start = time.perf_counter()
+        try:
+            store = self.loader()
+        except Exception as e:
+            # Not retried until the corpus changes again
+            print("Warning: Could not reload the fund store:", e)
+            self._seen = signature
+            self._record("error", time.perf_counter() - start)
+            return False
+
+        if corpus_signature(self.data_dir, self.snapshot_path) != signature:
+            # Another update landed while loading: load again on the next poll
+            self._record("retry", time.perf_counter() - start)
+            return False
+
+        self._seen = signature
+        self._pending = None
+        old = self.handle.swap(store)
+        self._record("reload", time.perf_counter() - start)
+        print(f"Fund store reloaded: {old.version} -> {store.version} ({len(store)} funds)")
+        return True
+
+    def _record(self, event: str, seconds: float) -> None:
+        self.stats[event] += 1
+        if self.on_event is not None:
+            self.on_event(event, seconds)
+
+    def start(self) -> None:
+        if self._thread is not None or self.interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="fund-store-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print("Warning: Fund store watcher failed:", e)
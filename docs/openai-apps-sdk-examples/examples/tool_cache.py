@@ -0,0 +1,157 @@
+"""
+Tool Result Cache for the Python MCP Server
+
+Short-TTL cache for tool results, keyed by tool name, canonicalized
+arguments and the fund store's data version, with single-flight
+coalescing: while one call computes a result, identical concurrent calls
+await the same task instead of computing it again. The computation runs in
+its own task, so a caller that goes away (client disconnect) stops waiting
+without cancelling it for the others.
+
+Entries expire after ``ttl`` seconds or at the next NAV refresh boundary,
+whichever comes first, so a cached answer never outlives the data it was
+built from.
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# SEC publishes NAVs in Thai time
+BANGKOK_TZ = timezone(timedelta(hours=7))
+
+# ============================================================================
+# Helpers
+# ============================================================================
+
+def _strip_none(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _strip_none(v) for k, v in value.items() if v is not None}
+    if isinstance(value, list):
+        return [_strip_none(v) for v in value]
+    return value
+
+def canonical_arguments(arguments: Dict[str, Any]) -> str:
+    """Stable string form of tool arguments (sorted keys, no null fields)"""
+    return json.dumps(
+        _strip_none(arguments),
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str
+    )
+
+def next_nav_refresh(now: float, refresh_time: str) -> float:
+    """Epoch seconds of the next daily NAV refresh (``HH:MM`` Bangkok time)"""
+    hour, minute = (int(part) for part in refresh_time.split(":"))
+    local_now = datetime.fromtimestamp(now, BANGKOK_TZ)
+    boundary = local_now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if boundary <= local_now:
+        boundary += timedelta(days=1)
+    return boundary.timestamp()
+
+# ============================================================================
+# Cache
+# ============================================================================
+
+class ToolResultCache:
+    """LRU + TTL result cache with single-flight request coalescing"""
+
+    def __init__(
+        self,
+        ttl: float = 300,
+        max_entries: int = 1024,
+        nav_refresh_time: Optional[str] = "20:00",
+        version: Callable[[], str] = lambda: "",
+        on_event: Optional[Callable[[str, str], None]] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.nav_refresh_time = nav_refresh_time
+        self.version = version
+        self.on_event = on_event
+        self.clock = clock
+
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str, str], asyncio.Future] = {}
+        self.stats = {"hit": 0, "miss": 0, "coalesced": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def _expiry(self, now: float) -> float:
+        expires = now + self.ttl
+        if self.nav_refresh_time:
+            expires = min(expires, next_nav_refresh(now, self.nav_refresh_time))
+        return expires
+
+    async def get_or_compute(
+        self,
+        tool: str,
+        arguments: Dict[str, Any],
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Return the cached result, join an in-flight call, or compute it"""
+        if not self.enabled:
+            return await compute()
+
+        key = (tool, canonical_arguments(arguments), self.version())
+        now = self.clock()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, result = entry
+            if expires > now:
+                self._entries.move_to_end(key)
+                self._record(tool, "hit")
+                return result
+            del self._entries[key]
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._record(tool, "coalesced")
+        else:
+            self._record(tool, "miss")
+            pending = asyncio.ensure_future(self._compute(key, compute, now))
+            # Mark errors as retrieved in case every caller went away
+            pending.add_done_callback(lambda task: task.cancelled() or task.exception())
+            self._inflight[key] = pending
+
+        # shield: a cancelled caller stops waiting, the task goes on for the rest
+        return await asyncio.shield(pending)
+
+    async def _compute(
+        self,
+        key: Tuple[str, str, str],
+        compute: Callable[[], Awaitable[Any]],
+        now: float
+    ) -> Any:
+        # Errors are shared with every caller but never cached
+        try:
+            result = await compute()
+        finally:
+            self._inflight.pop(key, None)
+        self._store(key, result, now)
+        return result
+
+    def _record(self, tool: str, event: str) -> None:
+        self.stats[event] += 1
+        if self.on_event is not None:
+            self.on_event(tool, event)
+
+    def _store(self, key: Tuple[str, str, str], result: Any, now: float) -> None:
+        self._entries[key] = (self._expiry(now), result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
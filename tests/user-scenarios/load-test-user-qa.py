@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Thai RMF Investment Q&A Load Test
+Replays the questions from test-user-qa.py as a weighted scenario mix
+against a local MCP server and reports latency, throughput and error rates
+per tool as JSON.
+
+Modes:
+  closed  N workers, each sends its next request as soon as the previous
+          one finishes (optionally after --think-time)
+  open    requests are issued at a fixed --rate regardless of how fast the
+          server answers; latency is measured from the scheduled send time
+          so a slow server cannot hide queueing delay; every request
+          scheduled inside the measured window counts, however late it
+          finishes, and those still unanswered --timeout seconds after the
+          window are errors ("timeout", or "not_sent" if never sent)
+
+Examples:
+  python3 tests/user-scenarios/load-test-user-qa.py --concurrency 32 --duration 60
+  python3 tests/user-scenarios/load-test-user-qa.py --mode open --rate 200 --duration 30 --output report.json
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BASE_URL = "http://localhost:5000/mcp"
+HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json, text/event-stream"
+}
+
+# ============================================================================
+# Scenario Mix (questions 1-10 of test-user-qa.py)
+# ============================================================================
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    tool: str
+    arguments: dict
+    weight: float
+
+SCENARIOS = [
+    Scenario("top5_ytd", "get_rmf_fund_performance",
+             {"period": "ytd", "limit": 5, "sortOrder": "desc"}, 25),
+    Scenario("low_risk", "search_rmf_funds",
+             {"minRiskLevel": 1, "maxRiskLevel": 3, "sortBy": "ytd", "limit": 5}, 15),
+    Scenario("amc_bbl", "search_rmf_funds",
+             {"amc": "BBL", "limit": 8}, 10),
+    Scenario("detail_abapac", "get_rmf_fund_detail",
+             {"fundCode": "ABAPAC-RMF"}, 15),
+    Scenario("nav_history_abapac", "get_rmf_fund_nav_history",
+             {"fundCode": "ABAPAC-RMF", "days": 30}, 10),
+    Scenario("top5_1y", "get_rmf_fund_performance",
+             {"period": "1y", "limit": 5}, 8),
+    Scenario("compare_three", "compare_rmf_funds",
+             {"fundCodes": ["ABAPAC-RMF", "B-ASEANRMF", "K-PROPIRMF"], "compareBy": "performance"}, 7),
+    Scenario("moderate_risk_ytd5", "search_rmf_funds",
+             {"minRiskLevel": 4, "maxRiskLevel": 5, "minYtdReturn": 5, "sortBy": "ytd", "limit": 5}, 4),
+    Scenario("top5_3y", "get_rmf_fund_performance",
+             {"period": "3y", "limit": 5}, 3),
+    Scenario("scb_equity", "search_rmf_funds",
+             {"search": "SCB", "category": "Equity", "sortBy": "ytd", "limit": 5}, 3),
+]
+
+# ============================================================================
+# HTTP Client
+# ============================================================================
+
+_local = threading.local()
+
+def get_session(pool_size):
+    """One keep-alive session per thread, shared connection pool per host"""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(HEADERS)
+        _local.session = session
+    return session
+
+def parse_response(response):
+    """Decode a JSON or single-event SSE JSON-RPC response"""
+    if response.headers.get("Content-Type", "").startswith("text/event-stream"):
+        for line in response.text.splitlines():
+            if line.startswith("data:"):
+                return json.loads(line[5:].strip())
+        raise ValueError("empty event stream")
+    return response.json()
+
+def call_mcp_tool(base_url, scenario, request_id, pool_size, timeout):
+    """Send one tools/call; return (ok, error_kind)"""
+    payload = {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "tools/call",
+        "params": {
+            "name": scenario.tool,
+            "arguments": scenario.arguments
+        }
+    }
+    try:
+        response = get_session(pool_size).post(base_url, json=payload, timeout=timeout)
+    except requests.Timeout:
+        return False, "timeout"
+    except requests.RequestException:
+        return False, "connection"
+
+    if response.status_code != 200:
+        return False, f"http_{response.status_code}"
+    try:
+        body = parse_response(response)
+    except ValueError:
+        return False, "invalid_json"
+    if "error" in body:
+        return False, "rpc_error"
+    if body.get("result", {}).get("isError"):
+        return False, "tool_error"
+    return True, None
+
+# ============================================================================
+# Recording
+# ============================================================================
+
+class Recorder:
+    """Collects per-tool latencies and errors from all worker threads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.counts = {}
+        self.recording = False
+
+    def record(self, tool, latency, ok, error_kind):
+        """Record a request that completed while the window is open"""
+        if self.recording:
+            self.add(tool, latency, ok, error_kind)
+
+    def add(self, tool, latency, ok, error_kind):
+        """Record a request the caller already knows to be measured"""
+        with self.lock:
+            self.counts[tool] = self.counts.get(tool, 0) + 1
+            if ok:
+                self.latencies.setdefault(tool, []).append(latency)
+            else:
+                kinds = self.errors.setdefault(tool, {})
+                kinds[error_kind] = kinds.get(error_kind, 0) + 1
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def summarize(latencies, count, errors, elapsed):
+    latencies = sorted(latencies)
+    error_total = sum(errors.values())
+    to_ms = lambda v: None if v is None else round(v * 1000, 3)
+    return {
+        "requests": count,
+        "errors": error_total,
+        "error_rate": round(error_total / count, 6) if count else 0.0,
+        "error_kinds": errors,
+        "throughput_rps": round(count / elapsed, 3) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": to_ms(percentile(latencies, 50)),
+            "p95": to_ms(percentile(latencies, 95)),
+            "p99": to_ms(percentile(latencies, 99)),
+            "mean": to_ms(sum(latencies) / len(latencies)) if latencies else None,
+            "max": to_ms(latencies[-1]) if latencies else None
+        }
+    }
+
+def build_report(recorder, args, elapsed):
+    per_tool = {}
+    all_latencies, all_errors, all_count = [], {}, 0
+    for tool in sorted(recorder.counts):
+        latencies = recorder.latencies.get(tool, [])
+        errors = recorder.errors.get(tool, {})
+        per_tool[tool] = summarize(latencies, recorder.counts[tool], errors, elapsed)
+        all_latencies.extend(latencies)
+        all_count += recorder.counts[tool]
+        for kind, n in errors.items():
+            all_errors[kind] = all_errors.get(kind, 0) + n
+
+    return {
+        "config": {
+            "base_url": args.base_url,
+            "mode": args.mode,
+            "concurrency": args.concurrency,
+            "rate": args.rate if args.mode == "open" else None,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "think_time_s": args.think_time,
+            "seed": args.seed,
+            "scenarios": {s.name: s.weight for s in selected_scenarios(args)}
+        },
+        "elapsed_s": round(elapsed, 3),
+        "overall": summarize(all_latencies, all_count, all_errors, elapsed),
+        "tools": per_tool
+    }
+
+# ============================================================================
+# Load Generators
+# ============================================================================
+
+def selected_scenarios(args):
+    if not args.scenario:
+        return SCENARIOS
+    wanted = set(args.scenario)
+    return [s for s in SCENARIOS if s.name in wanted]
+
+def run_closed_loop(args, scenarios, recorder, measure_from, deadline):
+    weights = [s.weight for s in scenarios]
+
+    def worker(worker_id):
+        rng = random.Random(args.seed + worker_id)
+        request_id = worker_id * 10_000_000
+        while time.perf_counter() < deadline:
+            scenario = rng.choices(scenarios, weights)[0]
+            request_id += 1
+            start = time.perf_counter()
+            ok, error_kind = call_mcp_tool(args.base_url, scenario, request_id, args.concurrency, args.timeout)
+            recorder.record(scenario.tool, time.perf_counter() - start, ok, error_kind)
+            if args.think_time:
+                time.sleep(rng.expovariate(1.0 / args.think_time))
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for worker_id in range(args.concurrency):
+            pool.submit(worker, worker_id)
+
+def run_open_loop(args, scenarios, recorder, measure_from, deadline):
+    weights = [s.weight for s in scenarios]
+    rng = random.Random(args.seed)
+    interval = 1.0 / args.rate
+
+    def fire(scenario, request_id, scheduled):
+        ok, error_kind = call_mcp_tool(args.base_url, scenario, request_id, args.concurrency, args.timeout)
+        # Measured from the scheduled time, not the actual send time
+        return time.perf_counter() - scheduled, ok, error_kind
+
+    # Requests scheduled inside the window, counted by scheduled time: under
+    # overload the late ones are exactly the slow ones
+    measured = []
+    pool = ThreadPoolExecutor(max_workers=args.concurrency)
+    next_send = time.perf_counter()
+    request_id = 0
+    while next_send < deadline:
+        delay = next_send - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        request_id += 1
+        scenario = rng.choices(scenarios, weights)[0]
+        future = pool.submit(fire, scenario, request_id, next_send)
+        if next_send >= measure_from:
+            measured.append((scenario, future))
+        # Poisson arrivals
+        next_send += rng.expovariate(1.0 / interval)
+
+    # Give the backlog one request timeout to drain, then stop waiting for it
+    wait([future for _, future in measured], timeout=max(deadline - time.perf_counter(), 0) + args.timeout)
+    for scenario, future in measured:
+        if future.done():
+            if future.exception() is None:
+                recorder.add(scenario.tool, *future.result())
+            else:
+                recorder.add(scenario.tool, None, False, "exception")
+        elif future.cancel():
+            recorder.add(scenario.tool, None, False, "not_sent")
+        else:
+            recorder.add(scenario.tool, None, False, "timeout")
+    # Requests still in flight end within their own timeout; queued ones are dropped
+    pool.shutdown(wait=False, cancel_futures=True)
+
+# ============================================================================
+# Entry Point
+# ============================================================================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the RMF MCP server with the user Q&A scenarios")
+    parser.add_argument("--base-url", default=BASE_URL, help="MCP endpoint (default: %(default)s)")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument("--concurrency", type=int, default=16,
+                        help="closed: number of virtual users; open: max in-flight requests")
+    parser.add_argument("--rate", type=float, default=50.0, help="open mode: requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured seconds before measuring")
+    parser.add_argument("--think-time", type=float, default=0.0, help="closed mode: mean pause between requests")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--scenario", action="append", choices=[s.name for s in SCENARIOS],
+                        help="restrict the mix to these scenarios (repeatable)")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    scenarios = selected_scenarios(args)
+    recorder = Recorder()
+    run = run_open_loop if args.mode == "open" else run_closed_loop
+
+    start = time.perf_counter()
+    measure_from = start + args.warmup
+    deadline = measure_from + args.duration
+
+    def measurement_window():
+        # Closed mode: only requests completing inside [measure_from, deadline] count
+        for at, recording in ((measure_from, True), (deadline, False)):
+            delay = at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            recorder.recording = recording
+
+    timer = threading.Thread(target=measurement_window, daemon=True)
+    timer.start()
+    run(args, scenarios, recorder, measure_from, deadline)
+    timer.join()
+    elapsed = args.duration
+
+    report = json.dumps(build_report(recorder, args, elapsed), indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+        print(f"Report written to {args.output}", file=sys.stderr)
+    else:
+        print(report)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
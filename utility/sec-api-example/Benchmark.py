@@ -0,0 +1,184 @@
+# Benchmark the SEC API client (function/*.py) against the local FakeGateway
+#
+# Starts FakeGateway in-process (or uses --url of one already running), points the
+# client at it, runs a workload at several concurrency levels and prints calls/sec
+# and tail latency as JSON.
+#
+# python Benchmark.py
+# python Benchmark.py --workload mixed --concurrency 1,8,32 --calls 500 --latency lognormal:40,0.6
+# python Benchmark.py --quota 200/10 --error-rate 0.02 --output data/bench.json
+#
+# Note: RateLimiter in function/AllFunction.py allows 3000 calls per 300 seconds per
+# process and raises RateLimitException beyond that; keep concurrency levels x calls
+# under that budget or expect "RateLimitException" in the results.
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from pathlib import Path
+import argparse
+import io
+import json
+import os
+import sys
+import time
+import urllib.request
+
+import FakeGateway
+
+BENCH_KEY = "bench-key"
+KEY_NAMES = (
+    "FundFactsheetKey", "FundDailyInfoKey", "BondKey", "CommonKey",
+    "DigitalAssetKey", "OnereportKey", "PVDFactsheetKey", "LicenseCheckKey",
+)
+
+def percentile(SortedValues, pct):
+    if not SortedValues:
+        return None
+    rank = max(1, int(round(pct / 100.0 * len(SortedValues))))
+    return SortedValues[min(rank, len(SortedValues)) - 1]
+
+# Build the list of zero-argument calls for a workload
+def build_workload(name, calls):
+    from function.FundFactsheet import fund_factsheet_performance, fund_factsheet_fee, fund_factsheet_asset
+    from function.FundDailyInfo import fund_dailyinfo_dailynav, fund_dailyinfo_dividend
+    from function.Bond import bond_outs_coupon, bond_outs_outstanding_value
+    from function.PVDFactSheet import pvd_factsheet_policy
+    from function.Common import ref_role_person, ref_product_currency_code
+
+    funds = []
+    for path in sorted((FakeGateway.DEFAULT_DATA_DIR / "rmf-funds").glob("*.json")):
+        record = json.loads(path.read_text(encoding="utf-8"))
+        nav_date = (record.get("latest_nav") or {}).get("nav_date")
+        if record.get("fund_id") and nav_date:
+            funds.append((record["fund_id"], nav_date))
+
+    factsheet = [
+        lambda p=p: fund_factsheet_performance(p) for p, _ in funds
+    ] + [
+        lambda p=p: fund_factsheet_fee(p) for p, _ in funds
+    ] + [
+        lambda p=p: fund_factsheet_asset(p) for p, _ in funds
+    ]
+    dailynav = [
+        lambda p=p, d=d: fund_dailyinfo_dailynav(p, d) for p, d in funds
+    ] + [
+        lambda p=p: fund_dailyinfo_dividend(p) for p, _ in funds
+    ]
+    other = [
+        lambda i=i: bond_outs_coupon("B{:08d}".format(i)) for i in range(50)
+    ] + [
+        lambda i=i: bond_outs_outstanding_value("B{:08d}".format(i), "2025-01-31") for i in range(50)
+    ] + [
+        lambda i=i: pvd_factsheet_policy("P{:04d}".format(i)) for i in range(50)
+    ] + [ref_role_person, ref_product_currency_code]
+
+    pools = {
+        "factsheet" : factsheet,
+        "dailynav" : dailynav,
+        "mixed" : [c for group in zip(factsheet, dailynav, other * 10) for c in group],
+    }
+    pool = pools[name]
+    return [pool[i % len(pool)] for i in range(calls)]
+
+# Run one concurrency level and summarize it
+def run_level(workload, concurrency):
+    results = []
+
+    def timed(call):
+        start = time.perf_counter()
+        try:
+            resp = call()
+            outcome = "ok" if resp is not None else "failed"
+        except Exception as e:
+            outcome = type(e).__name__
+        return outcome, time.perf_counter() - start
+
+    # The client prints one line per call; keep it out of the measurement
+    with redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(timed, workload))
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for outcome, latency in results if outcome == "ok")
+    outcomes = {}
+    for outcome, _ in results:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    to_ms = lambda v: None if v is None else round(v * 1000, 3)
+
+    return {
+        "concurrency" : concurrency,
+        "calls" : len(results),
+        "outcomes" : outcomes,
+        "elapsed_s" : round(elapsed, 3),
+        "calls_per_sec" : round(len(results) / elapsed, 2) if elapsed else None,
+        "latency_ms" : {
+            "p50" : to_ms(percentile(latencies, 50)),
+            "p95" : to_ms(percentile(latencies, 95)),
+            "p99" : to_ms(percentile(latencies, 99)),
+            "max" : to_ms(latencies[-1] if latencies else None),
+        },
+    }
+
+def gateway_stats(url):
+    try:
+        with urllib.request.urlopen(url + "/__stats", timeout=5) as resp:
+            return json.loads(resp.read())
+    except Exception:
+        return None
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the SEC API client against FakeGateway")
+    parser.add_argument("--url", default=None, help="use an already running gateway instead of starting one")
+    parser.add_argument("--workload", choices=["factsheet", "dailynav", "mixed"], default="mixed")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma separated concurrency levels")
+    parser.add_argument("--calls", type=int, default=300, help="calls per concurrency level")
+    parser.add_argument("--latency", default="lognormal:30,0.5", help="latency model for the in-process gateway")
+    parser.add_argument("--quota", default=None, help="CALLS/SECONDS quota for the in-process gateway")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--output", default=None)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # The client writes log/ and reads .env relative to this folder
+    os.chdir(Path(__file__).resolve().parent)
+
+    server = None
+    url = args.url
+    if url is None:
+        server, url = FakeGateway.start_in_background(
+            port=0, latency=args.latency, quota=args.quota, keys=[BENCH_KEY], error_rate=args.error_rate,
+        )
+
+    # Must be set before the first client call: function/Client.py reads the env then
+    os.environ["Url"] = url
+    for name in KEY_NAMES:
+        os.environ[name] = BENCH_KEY
+    # Do not write what the fake gateway returns into data/fund-resolver-cache.json
+    os.environ["FundResolverCache"] = ""
+
+    levels = [int(c) for c in args.concurrency.split(",") if c]
+    report = {
+        "gateway" : url,
+        "workload" : args.workload,
+        "latency_model" : args.latency if server is not None else None,
+        "quota" : args.quota,
+        "error_rate" : args.error_rate,
+        "levels" : [run_level(build_workload(args.workload, args.calls), c) for c in levels],
+        "gateway_stats" : gateway_stats(url),
+    }
+
+    if server is not None:
+        server.shutdown()
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+        print("Benchmark report written to [{}]".format(args.output))
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+# Outstanding value history of bonds, for the fixed income holdings of RMF funds
+#
+# bond_outs_outstanding_value answers one issue on one date, so a history is
+# issues x dates calls. This script
+#   1. discovers issues: --security codes (bond_outs_issue), --issuer names
+#      (bond_outs_issuer) and, with --from-holdings, the issue codes held by the
+#      fixed income / mixed funds in data/holdings-index.json (Holdings.py)
+#   2. fetches coupon, issue_rating and redemption of each issue once, ever
+#      (corpus/BondStore.py StaticCache, data/bond-static.json)
+#   3. backfills outstanding values over --start .. --end (month ends, or business
+#      days with --freq day) with --workers calls in flight, skipping every
+#      (issue, date) already in data/bond-outstanding.npz, and saves the columns
+#      every --checkpoint calls so an interrupted run resumes where it stopped
+#
+# python BondBackfill.py --from-holdings --start 2024-01-01
+# python BondBackfill.py --security LB266A --security CB25D11 --start 2025-01-01 --freq day --workers 8
+# python BondBackfill.py --issuer "ธนาคารแห่งประเทศไทย" --static-only
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import time
+
+from DeltaSync import DEFAULT_CORPUS_DIR, CallCounter, load_records
+from corpus.BondStore import DEFAULT_OUTSTANDING_PATH, DEFAULT_STATIC_PATH, OutstandingStore, StaticCache
+from corpus.HoldingsIndex import DEFAULT_INDEX_PATH
+
+# Per-issue endpoints cached with no expiry
+STATIC_ENDPOINTS = ("coupon", "issue_rating", "redemption")
+
+# Fund classifications whose portfolios hold bonds
+BOND_FUND_CLASSES = ("FIX", "MIX")
+
+def backfill_dates(start, end, freq="month"):
+    # Month ends (or business days) from start to end, oldest first
+    days = []
+    day = start
+    while day <= end:
+        if freq == "day":
+            if day.weekday() < 5:
+                days.append(day)
+            day += timedelta(days=1)
+        else:
+            following = date(day.year + day.month // 12, day.month % 12 + 1, 1)
+            month_end = following - timedelta(days=1)
+            if month_end <= end:
+                days.append(month_end)
+            day = following
+    return days
+
+def holding_codes(IndexPath, CorpusDir):
+    # Issue codes held by fixed income / mixed funds of the corpus
+    index = json.loads(Path(IndexPath).read_text(encoding="utf-8"))
+    records = load_records(CorpusDir)
+    codes = set()
+    for symbol, fund in (index.get("funds") or {}).items():
+        record = records.get(symbol, (None, {}))[1]
+        classification = (record.get("metadata") or {}).get("fund_classification") or ""
+        if not classification.startswith(BOND_FUND_CLASSES):
+            continue
+        for holding in fund.get("holdings") or []:
+            code = (holding.get("code") or "").strip()
+            if code and code != "-":
+                codes.add(code)
+    return sorted(codes)
+
+def discover(counter, static, codes, issuers):
+    # issued_ref_id -> first lookup row, from security codes and issuer names
+    from function.Bond import bond_outs_issue, bond_outs_issuer
+
+    issues = {}
+    lookups = [("issue", code, bond_outs_issue) for code in codes] + [("issuer", name, bond_outs_issuer) for name in issuers]
+    for endpoint, key, function in lookups:
+        rows, _ = static.fetch(endpoint, key, counter, function, key)
+        for row in rows or []:
+            if row.get("issued_ref_id"):
+                issues.setdefault(row["issued_ref_id"], row)
+    return issues
+
+def fetch_static(counter, static, issues, workers):
+    import function.Bond as Bond
+
+    tasks = [(endpoint, ref_id) for ref_id in issues for endpoint in STATIC_ENDPOINTS if not static.has(endpoint, ref_id)]
+    def fetch(task):
+        endpoint, ref_id = task
+        static.fetch(endpoint, ref_id, counter, getattr(Bond, "bond_outs_" + endpoint), ref_id)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(fetch, tasks))
+    return len(tasks)
+
+def backfill(counter, store, issues, days, workers, checkpoint, StorePath):
+    from function.Bond import bond_outs_outstanding_value
+
+    tasks = [(ref_id, day) for ref_id in issues for day in days if not store.has(ref_id, day)]
+    def fetch(task):
+        ref_id, day = task
+        rows = counter(bond_outs_outstanding_value, ref_id, day.isoformat())
+        # None is a failed call (or no data); leave it for the next run
+        if rows is not None:
+            store.add(ref_id, day, rows)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(tasks), checkpoint):
+            list(pool.map(fetch, tasks[start:start + checkpoint]))
+            store.save(StorePath)
+    return len(tasks)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill bond outstanding values and cache per-issue bond data")
+    parser.add_argument("--security", action="append", default=[], help="security code (repeatable)")
+    parser.add_argument("--issuer", action="append", default=[], help="issuer name (repeatable)")
+    parser.add_argument("--from-holdings", action="store_true", help="issue codes held by fixed income / mixed RMFs")
+    parser.add_argument("--holdings-index", default=str(DEFAULT_INDEX_PATH))
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS_DIR))
+    parser.add_argument("--start", default=None, help="first date (default: one year before --end)")
+    parser.add_argument("--end", default=None, help="last date (default: today)")
+    parser.add_argument("--freq", choices=("month", "day"), default="month")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--checkpoint", type=int, default=500, help="save the store every this many calls")
+    parser.add_argument("--static-only", action="store_true", help="skip the outstanding value backfill")
+    parser.add_argument("--store", default=str(DEFAULT_OUTSTANDING_PATH))
+    parser.add_argument("--static", default=str(DEFAULT_STATIC_PATH))
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    StorePath = Path(args.store).resolve()
+    StaticPath = Path(args.static).resolve()
+    codes = list(args.security)
+    if args.from_holdings:
+        codes += holding_codes(args.holdings_index, args.corpus)
+    end = date.fromisoformat(args.end) if args.end else date.today()
+    start = date.fromisoformat(args.start) if args.start else end - timedelta(days=365)
+
+    # The client reads .env and writes log/ relative to this folder
+    os.chdir(Path(__file__).resolve().parent)
+
+    started = time.perf_counter()
+    counter = CallCounter(priority="backfill")
+    static = StaticCache(StaticPath)
+    store = OutstandingStore.load(StorePath)
+    # Redirected once around the pools: per call redirects from several threads
+    # could restore each other's stdout
+    with redirect_stdout(sys.stderr):
+        issues = discover(counter, static, sorted(set(codes)), args.issuer)
+        static_calls = fetch_static(counter, static, issues, args.workers)
+        static.save()
+        days = backfill_dates(start, end, args.freq)
+        outstanding_calls = 0 if args.static_only else backfill(counter, store, issues, days, args.workers, args.checkpoint, StorePath)
+
+    report = {
+        "issues" : len(issues),
+        "dates" : len(days),
+        "range" : [start.isoformat(), end.isoformat()],
+        "calls" : {
+            "total" : counter.calls,
+            "failed" : counter.failed,
+            "static" : static_calls,
+            "outstanding_value" : outstanding_calls,
+            "outstanding_value_cached" : len(issues) * len(days) - outstanding_calls if not args.static_only else None,
+        },
+        "store_rows" : len(store),
+        "elapsed_s" : round(time.perf_counter() - started, 2),
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    sys.exit(main())
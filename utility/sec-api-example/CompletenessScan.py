@@ -0,0 +1,84 @@
+# Completeness scan of the RMF corpus -> (fund, endpoint) refetch queue
+#
+# identify-incomplete-funds.ts marks a whole fund incomplete by counting its
+# errors, so reprocessing refetches all ~19 endpoints of a fund that misses one
+# section. This script reads data/rmf-funds/*.json through corpus/Completeness.py
+# (one frame, one funds x sections matrix) and writes the calls that fill only
+# what is missing:
+#   --output            [{"fund_id", "endpoint", "symbols", "sections"}, ...], one
+#                       entry per fund_id and function/Endpoints.py endpoint
+#   --matrix            the funds x sections matrix as CSV (1 = present)
+#   --reprocess-report  funds with any entry, in the incomplete-funds report shape
+#                       read by reprocess-incomplete-funds.ts
+# No API call is made.
+#
+# python CompletenessScan.py
+# python CompletenessScan.py --output ../../data/refetch-queue.json --matrix completeness.csv
+# python CompletenessScan.py --section risk_factors --section benchmark
+
+from pathlib import Path
+import argparse
+import json
+import sys
+import time
+
+from DeltaSync import FULL_FETCH_CALLS, FundPlan, reprocess_report
+from corpus.Completeness import DEFAULT_CORPUS_DIR, SECTIONS, load_frame, present, refetch_list
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Find missing sections of the RMF corpus and the calls that fill them")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS_DIR))
+    parser.add_argument("--section", action="append", choices=SECTIONS, default=None,
+                        help="only queue calls for these sections (repeatable, default all)")
+    parser.add_argument("--output", default=None, help="write the refetch queue here")
+    parser.add_argument("--matrix", default=None, help="write the funds x sections matrix here (CSV)")
+    parser.add_argument("--reprocess-report", default=None, help="write funds with missing sections here")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    started = time.perf_counter()
+    frame = load_frame(args.corpus)
+    presence = present(frame)
+    loaded = time.perf_counter()
+    queue = refetch_list(frame, presence[args.section] if args.section else presence)
+    elapsed = time.perf_counter() - started
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(queue, indent=2, ensure_ascii=False), encoding="utf-8")
+    if args.matrix:
+        presence.astype(int).to_csv(args.matrix)
+    if args.reprocess_report:
+        records = {symbol : (path, None) for symbol, path in frame["file_path"].items()}
+        fund_ids = {entry["fund_id"] for entry in queue}
+        plans = [FundPlan(symbol=symbol, fund_id=fund_id, action="full")
+                 for symbol, fund_id in frame["fund_id"].items() if fund_id in fund_ids]
+        Path(args.reprocess_report).write_text(
+            json.dumps(reprocess_report(plans, records), indent=2, ensure_ascii=False), encoding="utf-8")
+
+    endpoints = {}
+    for entry in queue:
+        endpoints[entry["endpoint"]] = endpoints.get(entry["endpoint"], 0) + 1
+    report = {
+        "corpus" : str(Path(args.corpus).resolve()),
+        "funds" : len(frame),
+        "fund_ids" : int(frame["fund_id"].nunique()),
+        "complete_funds" : int(presence.all(axis=1).sum()),
+        "missing" : {section : int(count) for section, count in (~presence).sum().items() if count},
+        "refetch" : {
+            "calls" : len(queue),
+            "fund_ids" : len({entry["fund_id"] for entry in queue}),
+            "endpoints" : dict(sorted(endpoints.items(), key=lambda kv: -kv[1])),
+            # What reprocessing those funds in full would cost
+            "full_fetch_calls" : len({entry["fund_id"] for entry in queue}) * FULL_FETCH_CALLS,
+        },
+        "load_s" : round(loaded - started, 3),
+        "elapsed_s" : round(elapsed, 3),
+    }
+    if not args.output:
+        report["queue"] = queue
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+# Pack data/ into one zstd archive (corpus/Archive.py) and read it back
+#
+# The corpus is hundreds of small JSON files; copying them to a serving node and
+# reading them cold costs one open per file. The archive is one file: per-record
+# zstd frames sharing a trained dictionary, and an index from name / symbol to
+# byte offset at the end, so one fund is read without decompressing the rest and
+# a full load is one sequential pass.
+#
+# Building also times the archive against the loose files (--no-timing to skip):
+#   get_us       median time to decompress one record by symbol
+#   load_s       archive.load_corpus() vs corpus.FundModel.load_corpus()
+#
+# python CorpusArchive.py                                # data/ -> data/corpus.secz
+# python CorpusArchive.py --get ABAPAC-RMF               # print one record
+# python CorpusArchive.py --extract /srv/sec/data        # loose files again
+# python CorpusArchive.py --verify                       # archive == data/, byte for byte
+
+from pathlib import Path
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from corpus.Archive import (
+    DEFAULT_ARCHIVE_PATH, DEFAULT_DATA_DIR, DEFAULT_DICT_SIZE, DEFAULT_LEVEL, DEFAULT_MEMBERS,
+    CorpusArchive, build_archive, collect,
+)
+
+def timing(ArchivePath, DataDir):
+    from corpus.FundModel import load_corpus
+
+    with CorpusArchive(ArchivePath) as archive:
+        times = []
+        for symbol in archive.symbols:
+            started = time.perf_counter()
+            archive.read(symbol)
+            times.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        funds = archive.load_corpus()
+        archive_s = time.perf_counter() - started
+    started = time.perf_counter()
+    load_corpus(Path(DataDir) / "rmf-funds")
+    loose_s = time.perf_counter() - started
+    return {
+        "get_us" : round(statistics.median(times) * 1e6, 1) if times else None,
+        "get_max_us" : round(max(times) * 1e6, 1) if times else None,
+        "load_s" : {"archive" : round(archive_s, 3), "loose" : round(loose_s, 3), "funds" : len(funds)},
+    }
+
+def verify(ArchivePath, DataDir, members):
+    files = collect(DataDir, members)
+    with CorpusArchive(ArchivePath) as archive:
+        stored = dict(archive.iter_bytes())
+    return {
+        "members" : len(stored),
+        "missing" : sorted(set(files) - set(stored)),
+        "extra" : sorted(set(stored) - set(files)),
+        "different" : sorted(name for name in set(files) & set(stored) if files[name] != stored[name]),
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pack the data/ corpus into a single zstd archive")
+    parser.add_argument("--data", default=str(DEFAULT_DATA_DIR))
+    parser.add_argument("--archive", default=str(DEFAULT_ARCHIVE_PATH))
+    parser.add_argument("--member", action="append", default=None, help="glob under --data (repeatable, default: the corpus files)")
+    parser.add_argument("--level", type=int, default=DEFAULT_LEVEL)
+    parser.add_argument("--dict-size", type=int, default=DEFAULT_DICT_SIZE)
+    parser.add_argument("--get", default=None, help="print one member (symbol or name) instead of building")
+    parser.add_argument("--extract", default=None, help="write the members under this folder instead of building")
+    parser.add_argument("--verify", action="store_true", help="compare the archive with --data instead of building")
+    parser.add_argument("--no-timing", action="store_true")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    members = tuple(args.member) if args.member else DEFAULT_MEMBERS
+
+    if args.get:
+        with CorpusArchive(args.archive) as archive:
+            if args.get not in archive:
+                print("Not in the archive: {}".format(args.get), file=sys.stderr)
+                return 1
+            print(archive.read(args.get).decode("utf-8"))
+        return 0
+    if args.extract:
+        started = time.perf_counter()
+        with CorpusArchive(args.archive) as archive:
+            count = archive.extract(args.extract)
+        report = {"extracted" : count, "output" : str(Path(args.extract).resolve()), "elapsed_s" : round(time.perf_counter() - started, 3)}
+    elif args.verify:
+        report = verify(args.archive, args.data, members)
+    else:
+        started = time.perf_counter()
+        report = build_archive(args.data, args.archive, members, level=args.level, DictSize=args.dict_size)
+        report["ratio"] = round(report["size"] / report["compressed"], 2) if report["compressed"] else None
+        report["build_s"] = round(time.perf_counter() - started, 2)
+        if not args.no_timing:
+            report.update(timing(args.archive, args.data))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+# Fund correlation and near-duplicate clusters from the RMF corpus NAV history
+#
+# Keeps corpus/ReturnsMatrix.py state in data/returns-matrix.npz of this folder
+# (ignored by git: it is rewritten every day) and pushes only the NAV dates newer
+# than the last run into it (run after DeltaSync.py --apply), then reports clusters
+# of funds whose returns are near-identical: share classes (-A/-P/-E), feeders of
+# one master fund, index funds on one index.
+#
+# python Correlation.py                                 # update state, print clusters
+# python Correlation.py --max-distance 0.005 --min-periods 20
+# python Correlation.py --fund ABAPAC-RMF --top 10      # funds most correlated with one fund
+# python Correlation.py --rebuild --window 120          # start over from the corpus
+
+from pathlib import Path
+import argparse
+import json
+import sys
+import time
+
+from corpus.FundModel import DEFAULT_CORPUS_DIR, load_corpus
+from corpus.ReturnsMatrix import DEFAULT_STATE_PATH, DEFAULT_WINDOW, MIN_PERIODS, ReturnsMatrix
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Update the rolling fund return correlation matrix and cluster funds")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS_DIR))
+    parser.add_argument("--state", default=str(DEFAULT_STATE_PATH))
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="trading days in the rolling window (new state only)")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the saved state")
+    parser.add_argument("--min-periods", type=int, default=MIN_PERIODS, help="common return days needed for a correlation")
+    parser.add_argument("--max-distance", type=float, default=0.002, help="cluster funds with 1 - correlation up to this")
+    parser.add_argument("--fund", default=None, help="list the funds most correlated with this one")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--output", default=None)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    StatePath = Path(args.state)
+
+    start = time.perf_counter()
+    matrix = ReturnsMatrix(window=args.window) if args.rebuild or not StatePath.is_file() else ReturnsMatrix.load(StatePath)
+    added = matrix.update(load_corpus(args.corpus))
+    if added:
+        matrix.save(StatePath)
+    elapsed = time.perf_counter() - start
+
+    window = matrix.window_dates()
+    report = {
+        "state" : str(StatePath),
+        "funds" : len(matrix),
+        "days_added" : added,
+        "window" : {
+            "size" : matrix.window,
+            "days" : len(window),
+            "first" : window[0].isoformat() if window else None,
+            "last" : window[-1].isoformat() if window else None,
+        },
+        "update_s" : round(elapsed, 3),
+    }
+    if args.fund:
+        if args.fund not in matrix.symbols:
+            print("Unknown fund [{}]".format(args.fund))
+            return 1
+        report["most_correlated"] = [
+            {"symbol" : symbol, "correlation" : round(corr, 4)}
+            for symbol, corr in matrix.most_correlated(args.fund, args.top, args.min_periods)
+        ]
+    else:
+        report["max_distance"] = args.max_distance
+        report["clusters"] = matrix.clusters(args.max_distance, args.min_periods)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+        print("Correlation report written to [{}]".format(args.output))
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+# Delta sync for the RMF corpus (data/rmf-funds/*.json)
+#
+# A full crawl (scripts/data-extraction/rmf) makes ~19 calls per fund. Most days
+# almost nothing but the NAV has moved, so this script fetches only the cheap
+# "latest" signals first:
+#   1. the AMC fund lists         FundFactsheet/fund/amc + one call per AMC
+#   2. one daily NAV per fund     FundDailyInfo/{proj_id}/dailynav/{nav_date}
+# and compares them with what is stored in each record:
+#   nav        NAV is newer (nav_date) or restated (same date, newer last_upd_date);
+#              patched into latest_nav / nav_history_30d from the response in hand
+#   full       the fund list says the fund changed after data_fetched_at, or
+#              data_fetched_at is older than --ttl-days; needs a full refetch
+#   new        RMF in the fund lists with no stored record; needs a full fetch
+#   cancelled  fund_status is no longer RG
+#   skip       nothing moved
+#
+# Funds planned for a full fetch can be written as an incomplete-funds report
+# (--reprocess-report) so scripts/data-extraction/rmf/reprocess-incomplete-funds.ts
+# refetches only those.
+#
+# python DeltaSync.py                                  # plan only, print JSON
+# python DeltaSync.py --apply --ttl-days 7             # also patch NAVs in place
+# python DeltaSync.py --reprocess-report ../../data/incomplete-funds-report.json
+
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import threading
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_CORPUS_DIR = REPO_ROOT / "data" / "rmf-funds"
+
+# Calls fetchCompleteFundData makes for one fund (policy, dividend policy,
+# suitability x2, daily NAV, NAV history, dividends, performance, benchmark,
+# 5YearLost, tracking error, asset, fund_compare, fee, InvolveParty, top 5,
+# risk, URLs, investment minimums)
+FULL_FETCH_CALLS = 19
+
+# fetchNavHistory30d goes back 42 calendar days to get ~30 trading days
+NAV_HISTORY_DAYS = 42
+
+# SEC timestamps without an offset are Thai time; data_fetched_at is UTC ("Z")
+BANGKOK_TZ = timezone(timedelta(hours=7))
+
+def parse_timestamp(value):
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=BANGKOK_TZ)
+
+def previous_weekdays(start, days):
+    day = start
+    for _ in range(days):
+        if day.weekday() < 5:
+            yield day
+        day -= timedelta(days=1)
+
+# Counts API calls made while collecting signals; priority is the scheduling class
+# of the calls (function/Scheduler.py) when the client queues them
+class CallCounter:
+
+    def __init__(self, priority=None):
+        self.calls = 0
+        self.failed = 0
+        self.priority = priority
+        # Shared by the worker threads of the crawlers
+        self._lock = threading.Lock()
+
+    def __call__(self, function, *args):
+        from function.Scheduler import priority
+
+        with self._lock:
+            self.calls += 1
+        # The client prints one line per call; keep stdout for the report
+        with redirect_stdout(sys.stderr), priority(self.priority):
+            resp = function(*args)
+        if resp is None:
+            with self._lock:
+                self.failed += 1
+        return resp
+
+@dataclass
+class FundPlan:
+    symbol: str
+    fund_id: str
+    action: str = "skip"
+    reasons: list = field(default_factory=list)
+    nav: dict = None
+
+    def to_dict(self):
+        return {"symbol" : self.symbol, "fund_id" : self.fund_id, "action" : self.action, "reasons" : self.reasons}
+
+# Stored corpus, by symbol (share classes of one fund have the same fund_id)
+def load_records(CorpusDir):
+    records = {}
+    for path in sorted(Path(CorpusDir).glob("*.json")):
+        try:
+            record = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print("Could not read [{}]: {}".format(path.name, e))
+            continue
+        if record.get("fund_id"):
+            records[record.get("symbol") or path.stem] = (path, record)
+    return records
+
+# Signals
+def fetch_fund_lists(counter):
+    from function.FundFactsheet import fund_factsheet_amc, fund_factsheet_fund
+
+    listings = {}
+    for amc in counter(fund_factsheet_amc) or []:
+        for entry in counter(fund_factsheet_fund, amc["unique_id"]) or []:
+            if entry.get("proj_id"):
+                listings[entry["proj_id"]] = entry
+    return listings
+
+def find_nav_date(counter, proj_id, today, lookback):
+    # Latest date with a published NAV, probed on one fund instead of every fund
+    from function.FundDailyInfo import fund_dailyinfo_dailynav
+
+    for day in previous_weekdays(today, lookback):
+        if counter(fund_dailyinfo_dailynav, proj_id, day.isoformat()):
+            return day
+    return None
+
+def fetch_daily_nav(counter, proj_id, nav_date):
+    # One call per fund; the rows cover all of its share classes
+    from function.FundDailyInfo import fund_dailyinfo_dailynav
+
+    return counter(fund_dailyinfo_dailynav, proj_id, nav_date.isoformat()) or []
+
+def class_row(rows, symbol):
+    for row in rows:
+        if row.get("class_abbr_name") == symbol:
+            return row
+    return rows[0] if len(rows) == 1 else None
+
+# Planning
+def is_rmf(entry):
+    return "RMF" in str(entry.get("proj_abbr_name") or "").upper()
+
+def plan_fund(record, listing, nav, now, ttl):
+    plan = FundPlan(symbol=record.get("symbol"), fund_id=record.get("fund_id"))
+    fetched_at = parse_timestamp(record.get("data_fetched_at"))
+
+    if listing is not None and listing.get("fund_status") not in (None, "RG"):
+        plan.action = "cancelled"
+        plan.reasons.append("fund_status {}".format(listing.get("fund_status")))
+        return plan
+
+    if fetched_at is None:
+        plan.reasons.append("never fetched")
+    elif ttl is not None and now - fetched_at > ttl:
+        plan.reasons.append("ttl expired")
+    if listing is not None:
+        listed_at = parse_timestamp(listing.get("last_upd_date"))
+        if listed_at is not None and fetched_at is not None and listed_at > fetched_at:
+            plan.reasons.append("fund list updated {}".format(listing.get("last_upd_date")))
+    if plan.reasons:
+        plan.action = "full"
+
+    stored = record.get("latest_nav") or {}
+    if nav is not None:
+        if (nav.get("nav_date") or "") > (stored.get("nav_date") or ""):
+            plan.reasons.append("new nav {}".format(nav.get("nav_date")))
+            plan.nav = nav
+        elif nav.get("nav_date") == stored.get("nav_date") and \
+                (nav.get("last_upd_date") or "") > (stored.get("last_upd_date") or ""):
+            plan.reasons.append("nav restated {}".format(nav.get("nav_date")))
+            plan.nav = nav
+        if plan.nav is not None and plan.action == "skip":
+            plan.action = "nav"
+    return plan
+
+def build_plan(records, listings, navs, now, ttl):
+    plans = []
+    for symbol, (path, record) in records.items():
+        fund_id = record.get("fund_id")
+        plans.append(plan_fund(record, listings.get(fund_id), class_row(navs.get(fund_id) or [], symbol), now, ttl))
+    known = {record.get("fund_id") for path, record in records.values()}
+    for proj_id, entry in listings.items():
+        if proj_id not in known and is_rmf(entry) and entry.get("fund_status") == "RG":
+            plans.append(FundPlan(symbol=entry.get("proj_abbr_name"), fund_id=proj_id, action="new", reasons=["not in corpus"]))
+    return plans
+
+# Applying NAV patches
+def apply_nav(record, nav, window_days=NAV_HISTORY_DAYS):
+    last_val = nav.get("last_val")
+    previous_val = nav.get("previous_val")
+    change = (last_val or 0) - (previous_val or 0)
+    record["latest_nav"] = {
+        "nav_date" : nav.get("nav_date"),
+        "last_val" : last_val,
+        "previous_val" : previous_val,
+        "net_asset" : nav.get("net_asset"),
+        "buy_price" : nav.get("buy_price"),
+        "sell_price" : nav.get("sell_price"),
+        "change" : change,
+        "change_percent" : (change / previous_val * 100) if previous_val else 0,
+        "last_upd_date" : nav.get("last_upd_date"),
+    }
+
+    entry = {key : nav.get(key) for key in ("nav_date", "last_val", "previous_val", "net_asset", "buy_price", "sell_price")}
+    history = [h for h in record.get("nav_history_30d") or [] if h.get("nav_date") != entry["nav_date"]]
+    history.append(entry)
+    oldest = (date.fromisoformat(entry["nav_date"][:10]) - timedelta(days=window_days)).isoformat()
+    record["nav_history_30d"] = sorted((h for h in history if h["nav_date"] >= oldest), key=lambda h: h["nav_date"])
+    return record
+
+def write_record(path, record):
+    # Same layout as the TypeScript crawler (JSON.stringify(data, null, 2))
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(record, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+def reprocess_report(plans, records):
+    # Shape read by reprocess-incomplete-funds.ts
+    targets = [p for p in plans if p.action in ("full", "new")]
+    total = len(records)
+    return {
+        "generated_at" : datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "summary" : {
+            "total_funds" : total,
+            "complete_funds" : total - len(targets),
+            "incomplete_funds" : len(targets),
+            "completion_rate" : round((total - len(targets)) / total * 100, 2) if total else 100,
+        },
+        "incomplete_funds" : [
+            {"symbol" : p.symbol, "fund_id" : p.fund_id,
+             "file_path" : str(records[p.symbol][0]) if p.symbol in records else None}
+            for p in targets
+        ],
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Plan (and optionally apply) a delta sync of the RMF corpus")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS_DIR))
+    parser.add_argument("--ttl-days", type=float, default=30, help="full refetch when data_fetched_at is older (0 = never)")
+    parser.add_argument("--nav-date", default=None, help="NAV date to check (default: probe for the latest published)")
+    parser.add_argument("--lookback", type=int, default=10, help="days to search back for the latest NAV date")
+    parser.add_argument("--skip-fund-lists", action="store_true", help="only check NAVs and TTL")
+    parser.add_argument("--apply", action="store_true", help="write NAV patches into the corpus")
+    parser.add_argument("--reprocess-report", default=None, help="write funds needing a full fetch here")
+    parser.add_argument("--output", default=None)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    CorpusDir = Path(args.corpus).resolve()
+
+    # The client reads .env and writes log/ relative to this folder
+    os.chdir(Path(__file__).resolve().parent)
+
+    now = datetime.now(timezone.utc)
+    ttl = timedelta(days=args.ttl_days) if args.ttl_days > 0 else None
+    records = load_records(CorpusDir)
+    counter = CallCounter(priority="refresh")
+
+    listings = {} if args.skip_fund_lists else fetch_fund_lists(counter)
+
+    navs = {}
+    if args.nav_date:
+        nav_date = date.fromisoformat(args.nav_date)
+    else:
+        # Probe with the fund that has the most recent stored NAV
+        latest = max(records.values(), key=lambda pr: (pr[1].get("latest_nav") or {}).get("nav_date") or "", default=None)
+        nav_date = find_nav_date(counter, latest[1]["fund_id"], now.astimezone(BANGKOK_TZ).date(), args.lookback) if latest else None
+    if nav_date is not None:
+        for path, record in records.values():
+            fund_id = record["fund_id"]
+            stored = (record.get("latest_nav") or {}).get("nav_date") or ""
+            if fund_id in navs or stored > nav_date.isoformat():
+                continue
+            navs[fund_id] = fetch_daily_nav(counter, fund_id, nav_date)
+
+    plans = build_plan(records, listings, navs, now, ttl)
+
+    patched = 0
+    if args.apply:
+        for plan in plans:
+            if plan.nav is not None and plan.symbol in records:
+                path, record = records[plan.symbol]
+                write_record(path, apply_nav(record, plan.nav))
+                patched += 1
+
+    if args.reprocess_report:
+        Path(args.reprocess_report).write_text(
+            json.dumps(reprocess_report(plans, records), indent=2, ensure_ascii=False), encoding="utf-8"
+        )
+
+    actions = {}
+    for plan in plans:
+        actions[plan.action] = actions.get(plan.action, 0) + 1
+    refetch = actions.get("full", 0) + actions.get("new", 0)
+    crawl_calls = (len(records) + actions.get("new", 0)) * FULL_FETCH_CALLS
+    sync_calls = counter.calls + refetch * FULL_FETCH_CALLS
+
+    report = {
+        "corpus" : str(CorpusDir),
+        "nav_date" : nav_date.isoformat() if nav_date else None,
+        "funds" : len(records),
+        "actions" : actions,
+        "calls" : {
+            "signals" : counter.calls,
+            "signals_empty" : counter.failed,
+            "full_refetch_estimate" : refetch * FULL_FETCH_CALLS,
+            "delta_sync_total" : sync_calls,
+            "full_crawl_estimate" : crawl_calls,
+            "fraction_of_full_crawl" : round(sync_calls / crawl_calls, 4) if crawl_calls else None,
+        },
+        "patched" : patched,
+        "plans" : [p.to_dict() for p in plans if p.action != "skip"],
+    }
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+        print("Delta sync report written to [{}]".format(args.output))
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+# Incremental ingestion of the DigitalAsset daily / weekly / monthly feeds
+#
+# Every feed is keyed by trade_date, so it is kept as a date-partitioned dataset
+# (corpus/PartitionStore.py, data/digitalasset/{feed}/{YYYY}/{date}.json). A run
+# lists the partitions already stored, fetches only the missing trade dates of
+# each feed with --workers calls in flight, and writes each partition as soon as
+# it arrives. Re-running a range that is already stored makes no call.
+#
+# trade_date of the weekly feeds is the Monday of the week and of the monthly feeds
+# the first day of the month. Dates the API has nothing for (204, or an empty
+# list) are stored as .empty once they are older than --settle-days (so today's
+# not-yet-published data is asked for again), and are retried with --retry-empty.
+# Failed calls (401, 429, 5xx, every key refused) store nothing, so the next run
+# asks again.
+#
+# python DigitalAssetSync.py --start 2025-01-01
+# python DigitalAssetSync.py --feed daily_surv_trade_summary --start 2024-01-01 --end 2024-12-31 --workers 8
+# python DigitalAssetSync.py --query daily_investor_type_summary --start 2025-10-01
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import time
+
+from DeltaSync import CallCounter
+from function.AllFunction import LastStatus
+from corpus.PartitionStore import DEFAULT_DATASET_DIR, PartitionStore
+
+# feed -> (cadence, client function in function/DigitalAsset.py)
+FEEDS = {
+    "daily_surv_trade_summary" : ("daily", "digitalasset_daily_surv_trade_summary"),
+    "daily_investor_type_summary" : ("daily", "digitalasset_daily_investor_type_summary"),
+    "daily_dtw_daily_summary" : ("daily", "digitalasset_daily_dtw_daily_summary"),
+    "weekly_asset" : ("weekly", "digitalasset_weekly_asset"),
+    "monthly_customer" : ("monthly", "digitalasset_monthly_customer"),
+    "monthly_asset" : ("monthly", "digitalasset_monthly_asset"),
+    "monthly_active_account" : ("monthly", "digitalasset_monthly_active_account"),
+}
+
+def trade_dates(cadence, start, end):
+    # trade_date keys of one cadence between start and end
+    if cadence == "weekly":
+        day = start - timedelta(days=start.weekday())
+        step = lambda d: d + timedelta(days=7)
+    elif cadence == "monthly":
+        day = start.replace(day=1)
+        step = lambda d: date(d.year + d.month // 12, d.month % 12 + 1, 1)
+    else:
+        day = start
+        step = lambda d: d + timedelta(days=1)
+    days = []
+    while day <= end:
+        days.append(day)
+        day = step(day)
+    return days
+
+def sync_feed(counter, feed, start, end, workers, DatasetDir, settle_days, retry_empty):
+    import function.DigitalAsset as DigitalAsset
+
+    cadence, name = FEEDS[feed]
+    function = getattr(DigitalAsset, name)
+    store = PartitionStore(feed, DatasetDir)
+    days = trade_dates(cadence, start, end)
+    missing = store.missing(days, retry_empty)
+    settled = date.today() - timedelta(days=settle_days)
+
+    def fetch(day):
+        # (rows, answered): None is "no data" only when the API said 204
+        rows = counter(function, day.isoformat())
+        return rows, rows is not None or LastStatus() == 204
+
+    written = empty = failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch, day) : day for day in missing}
+        for future in as_completed(futures):
+            day, (rows, answered) = futures[future], future.result()
+            if rows:
+                store.write(day, rows)
+                written += 1
+            elif not answered:
+                failed += 1
+            elif day <= settled:
+                store.write(day, None)
+                empty += 1
+    return {"cadence" : cadence, "dates" : len(days), "fetched" : len(missing), "written" : written, "empty" : empty, "failed" : failed}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch missing DigitalAsset partitions, or query the local dataset")
+    parser.add_argument("--feed", action="append", choices=sorted(FEEDS), default=None, help="feed to sync (repeatable, default all)")
+    parser.add_argument("--start", default=None, help="first trade date (default: 30 days before --end)")
+    parser.add_argument("--end", default=None, help="last trade date (default: yesterday)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--settle-days", type=int, default=7, help="store empty answers only for dates older than this")
+    parser.add_argument("--retry-empty", action="store_true", help="ask again for dates stored as empty")
+    parser.add_argument("--dataset", default=str(DEFAULT_DATASET_DIR))
+    parser.add_argument("--query", choices=sorted(FEEDS), default=None, help="print rows of a feed in the range instead of syncing")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    DatasetDir = Path(args.dataset).resolve()
+    end = date.fromisoformat(args.end) if args.end else date.today() - timedelta(days=1)
+    start = date.fromisoformat(args.start) if args.start else end - timedelta(days=30)
+
+    if args.query:
+        rows = list(PartitionStore(args.query, DatasetDir).rows(start, end))
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+        return
+
+    # The client reads .env and writes log/ relative to this folder
+    os.chdir(Path(__file__).resolve().parent)
+
+    started = time.perf_counter()
+    counter = CallCounter(priority="refresh")
+    feeds = {}
+    # Redirected once around the pools: per call redirects from several threads
+    # could restore each other's stdout
+    with redirect_stdout(sys.stderr):
+        for feed in args.feed or FEEDS:
+            feeds[feed] = sync_feed(counter, feed, start, end, args.workers, DatasetDir, args.settle_days, args.retry_empty)
+
+    report = {
+        "dataset" : str(DatasetDir),
+        "range" : [start.isoformat(), end.isoformat()],
+        "feeds" : feeds,
+        "calls" : counter.calls,
+        "calls_empty" : counter.failed,
+        "elapsed_s" : round(time.perf_counter() - started, 2),
+    }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,684 @@
+# Local stand-in for the SEC API gateway (api.sec.or.th)
+#
+# Serves the FundFactsheet, FundDailyInfo, bond, pvd and common/ref routes (and a
+# generic answer for the other products) so that the client in function/*.py can
+# be benchmarked without live subscription keys.
+#
+# Responses come from, in order:
+#   1. recorded fixtures in --fixtures DIR, mirroring the URL path
+#      (e.g. DIR/FundFactsheet/fund/M0774_2554/performance.json)
+#   2. the RMF corpus in data/rmf-funds/*.json and data/fund-mapping.json
+#   3. the response examples in utility/fund-factsheet-open-api.json
+#   4. deterministic synthetic records (bond, pvd, common/ref, ...)
+#
+# Gateway behaviour that matters for benchmarking is configurable:
+#   --latency      const:MS | uniform:MIN,MAX | exp:MEAN | lognormal:MEDIAN_MS,SIGMA
+#   --quota        CALLS/SECONDS per Ocp-Apim-Subscription-Key, 429 + Retry-After when exceeded
+#   --keys         comma separated list of accepted keys (401 for anything else)
+#   --error-rate   probability of a random 500/502/503/504
+#
+# python FakeGateway.py --port 8089 --latency lognormal:40,0.6 --quota 3000/300 --error-rate 0.01
+# then set Url=http://127.0.0.1:8089 in .env
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import urlsplit, unquote
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_DATA_DIR = REPO_ROOT / "data"
+OPENAPI_SPEC = REPO_ROOT / "utility" / "fund-factsheet-open-api.json"
+
+# Securities for synthetic FundPort rows (issue_code, isin_code, issuer)
+SECURITIES = (
+    ("NVDA", "US67066G1040", "NVIDIA CORPORATION"),
+    ("MSFT", "US5949181045", "MICROSOFT CORPORATION"),
+    ("AAPL", "US0378331005", "APPLE INC"),
+    ("TSM", "US8740391003", "TAIWAN SEMICONDUCTOR MANUFACTURING CO LTD"),
+    ("ASML", "NL0010273215", "ASML HOLDING NV"),
+    ("PTT", "TH0646010Z00", "PTT PUBLIC COMPANY LIMITED"),
+    ("ADVANC", "TH0268010Z03", "ADVANCED INFO SERVICE PUBLIC COMPANY LIMITED"),
+    ("CPALL", "TH0737010Z08", "CP ALL PUBLIC COMPANY LIMITED"),
+    ("KBANK", "TH0016010Z06", "KASIKORNBANK PUBLIC COMPANY LIMITED"),
+    ("LB266A", "TH0623033300", "MINISTRY OF FINANCE"),
+    ("CB25D11", "TH0055037C00", "BANK OF THAILAND"),
+)
+
+# Master funds for synthetic feeder_fund answers
+MASTER_FUNDS = (
+    ("abrdn SICAV I - Asia Pacific Equity Fund", "Luxembourg"),
+    ("Baillie Gifford Worldwide Long Term Global Growth Fund", "Ireland"),
+    ("Fidelity Funds - Global Technology Fund", "Luxembourg"),
+    ("iShares Core S&P 500 UCITS ETF", "Ireland"),
+)
+
+# Investment policies of the synthetic provident funds
+PVD_POLICIES = ("ตราสารหนี้", "ผสม", "ตราสารทุน", "ตลาดเงิน", "Life path")
+
+PERIOD_NAMES = {
+    "ytd" : "year to date",
+    "3m" : "3 months",
+    "6m" : "6 months",
+    "1y" : "1 year",
+    "3y" : "3 years",
+    "5y" : "5 years",
+    "10y" : "10 years",
+    "since_inception" : "inception date",
+}
+
+# Latency model
+class LatencyModel:
+
+    def __init__(self, spec):
+        self.spec = spec or "const:0"
+        kind, _, params = self.spec.partition(":")
+        values = [float(v) for v in params.split(",") if v != ""]
+        self.kind = kind
+        self.values = values
+        if kind not in ("const", "uniform", "exp", "lognormal"):
+            raise ValueError("Unknown latency model [{}]".format(self.spec))
+
+    # Return one latency sample in seconds
+    def sample(self, rng):
+        v = self.values
+        if self.kind == "const":
+            ms = v[0] if v else 0
+        elif self.kind == "uniform":
+            ms = rng.uniform(v[0], v[1])
+        elif self.kind == "exp":
+            ms = rng.expovariate(1.0 / v[0]) if v[0] > 0 else 0
+        else:
+            ms = rng.lognormvariate(math.log(v[0]), v[1] if len(v) > 1 else 0.5)
+        return max(ms, 0) / 1000.0
+
+# Fixed-window quota per subscription key (like APIM rate-limit-by-key)
+class QuotaTracker:
+
+    def __init__(self, spec):
+        self.calls = None
+        self.period = None
+        if spec:
+            calls, _, period = spec.partition("/")
+            self.calls = int(calls)
+            self.period = float(period or 1)
+        self.windows = {}
+        self.lock = threading.Lock()
+
+    # Return seconds to wait when the key is over quota, otherwise 0
+    def check(self, key, now):
+        if self.calls is None:
+            return 0
+        with self.lock:
+            start, count = self.windows.get(key, (now, 0))
+            if now - start >= self.period:
+                start, count = now, 0
+            if count >= self.calls:
+                self.windows[key] = (start, count)
+                return max(self.period - (now - start), 0.001)
+            self.windows[key] = (start, count + 1)
+            return 0
+
+# Corpus-backed fixtures
+class FixtureStore:
+
+    def __init__(self, DataDir, FixtureDir=None):
+        self.fixture_dir = Path(FixtureDir) if FixtureDir else None
+        self.funds = {}
+
+        mapping = json.loads((Path(DataDir) / "fund-mapping.json").read_text(encoding="utf-8"))["mapping"]
+        self.mapping = mapping
+
+        for path in sorted((Path(DataDir) / "rmf-funds").glob("*.json")):
+            record = json.loads(path.read_text(encoding="utf-8"))
+            if record.get("fund_id"):
+                self.funds[record["fund_id"]] = record
+
+        self.amcs = {}
+        for symbol, entry in mapping.items():
+            self.amcs.setdefault(entry["amc_id"], entry["amc_name"])
+
+        self.spec_examples = {}
+        if OPENAPI_SPEC.exists():
+            spec = json.loads(OPENAPI_SPEC.read_text(encoding="utf-8"))
+            for template, methods in spec.get("paths", {}).items():
+                for method, operation in methods.items():
+                    content = operation.get("responses", {}).get("200", {}).get("content", {})
+                    example = content.get("application/json", {}).get("example")
+                    if example is not None:
+                        self.spec_examples[(method.upper(), template)] = example
+
+    def recorded(self, path):
+        if self.fixture_dir is None:
+            return None
+        candidate = (self.fixture_dir / (path.strip("/") + ".json")).resolve()
+        if self.fixture_dir.resolve() in candidate.parents and candidate.exists():
+            return json.loads(candidate.read_text(encoding="utf-8"))
+        return None
+
+    def fund_list_entry(self, symbol, entry):
+        return {
+            "last_upd_date" : "2025-11-11T00:00:00",
+            "proj_id" : entry["proj_id"],
+            "regis_id" : entry["proj_id"],
+            "regis_date" : entry.get("regis_date"),
+            "cancel_date" : entry.get("cancel_date"),
+            "proj_name_th" : entry.get("fund_name_th"),
+            "proj_name_en" : entry.get("fund_name_en"),
+            "proj_abbr_name" : symbol,
+            "fund_status" : entry.get("fund_status"),
+            "unique_id" : entry["amc_id"],
+            "permit_us_investment" : "N",
+            "invest_country_flage" : "1",
+        }
+
+# Deterministic pseudo-random generator for synthetic records
+def seeded(*parts):
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+def synthetic_records(path, count=None):
+    rng = seeded(path)
+    count = count if count is not None else rng.randint(1, 5)
+    leaf = path.rstrip("/").rsplit("/", 1)[-1]
+    return [
+        {
+            "seq" : i + 1,
+            "code" : "{}{:03d}".format(leaf[:3].upper(), rng.randint(1, 999)),
+            "desc_th" : "{} {}".format(leaf, i + 1),
+            "desc_en" : "{} {}".format(leaf, i + 1),
+            "value" : round(rng.uniform(0, 1_000_000), 2),
+            "last_upd_date" : "2025-11-11T00:00:00",
+        }
+        for i in range(count)
+    ]
+
+# Route handlers: return (status, payload); payload None means 204
+class Routes:
+
+    def __init__(self, store):
+        self.store = store
+
+    def resolve(self, method, path, body):
+        recorded = self.store.recorded(path)
+        if recorded is not None:
+            return 200, recorded
+
+        parts = [p for p in path.split("/") if p]
+        if not parts:
+            return 404, {"statusCode" : 404, "message" : "Resource not found"}
+
+        product = parts[0]
+        if product == "FundFactsheet":
+            return self.fund_factsheet(method, parts[1:], body)
+        if product == "FundDailyInfo":
+            return self.fund_dailyinfo(parts[1:])
+        if product == "bond":
+            return self.bond(method, parts[1:], body)
+        if product == "pvd":
+            return self.pvd(method, parts[2:], body)
+        if product == "LicenseCheck":
+            return self.license_check(method, parts[2:], body)
+        if product in ("common", "DigitalAsset", "onereport"):
+            return 200, synthetic_records(path)
+        return 404, {"statusCode" : 404, "message" : "Resource not found"}
+
+    ## FundFactsheet
+    def fund_factsheet(self, method, parts, body):
+        store = self.store
+        if parts[:2] == ["fund", "amc"]:
+            if len(parts) == 2:
+                return 200, [
+                    {"last_upd_date" : "2025-11-11T00:00:00", "unique_id" : uid, "name_th" : name, "name_en" : name}
+                    for uid, name in sorted(store.amcs.items())
+                ]
+            funds = [store.fund_list_entry(s, e) for s, e in store.mapping.items() if e["amc_id"] == parts[2]]
+            return (200, funds) if funds else (204, None)
+
+        if method == "POST" and parts == ["fund"]:
+            name = str((body or {}).get("name", "")).upper()
+            funds = [store.fund_list_entry(s, e) for s, e in store.mapping.items() if name and name in s.upper()]
+            return (200, funds) if funds else (204, None)
+
+        if method == "POST" and parts == ["fund", "class_fund"]:
+            name = str((body or {}).get("name", "")).upper()
+            entry = store.mapping.get(name)
+            if entry is None:
+                return 204, None
+            return 200, [self.class_fund(name, entry["proj_id"])]
+
+        if len(parts) < 3 or parts[0] != "fund":
+            return 404, {"statusCode" : 404, "message" : "Resource not found"}
+
+        proj_id, endpoint = parts[1], parts[2]
+        record = store.funds.get(proj_id)
+        known = record is not None or any(e["proj_id"] == proj_id for e in store.mapping.values())
+        if not known:
+            return 204, None
+
+        builder = getattr(self, "ff_" + endpoint.lower(), None)
+        if builder is not None:
+            payload = builder(proj_id, record or {}, parts[3:])
+            return (200, payload) if payload else (204, None)
+
+        template = "/fund/{proj_id}/" + endpoint + ("/{period}" if len(parts) > 3 else "")
+        example = store.spec_examples.get(("GET", template))
+        if example is None:
+            return 404, {"statusCode" : 404, "message" : "Resource not found"}
+        return 200, example
+
+    def class_fund(self, symbol, proj_id):
+        return {
+            "proj_id" : proj_id,
+            "last_upd_date" : "2025-11-11T00:00:00",
+            "proj_abbr_name" : symbol,
+            "class_abbr_name" : symbol,
+            "class_name" : "main",
+            "class_additional_desc" : "-",
+        }
+
+    def ff_performance(self, proj_id, record, extra):
+        rows = []
+        sections = (
+            ("ผลตอบแทนกองทุนรวม", record.get("performance") or {}),
+            ("ผลตอบแทนตัวชี้วัด", (record.get("benchmark") or {}).get("returns") or {}),
+        )
+        for desc, values in sections:
+            for key, value in values.items():
+                if value is None or key not in PERIOD_NAMES:
+                    continue
+                rows.append({
+                    "last_upd_date" : record.get("data_fetched_at"),
+                    "class_abbr_name" : record.get("symbol"),
+                    "performance_type_desc" : desc,
+                    "reference_period" : PERIOD_NAMES[key],
+                    "performance_val" : str(value),
+                    "as_of_date" : (record.get("latest_nav") or {}).get("nav_date"),
+                })
+        return rows
+
+    def ff_benchmark(self, proj_id, record, extra):
+        name = (record.get("benchmark") or {}).get("name")
+        if not name:
+            return None
+        return [{"last_upd_date" : record.get("data_fetched_at"), "group_seq" : "1", "benchmark" : name, "benchmark_ratio" : "100"}]
+
+    def ff_asset(self, proj_id, record, extra):
+        return [
+            {"last_upd_date" : record.get("data_fetched_at"), "asset_seq" : str(i + 1),
+             "asset_name" : a.get("asset_class"), "asset_ratio" : str(a.get("percentage"))}
+            for i, a in enumerate(record.get("asset_allocation") or [])
+        ]
+
+    def ff_fee(self, proj_id, record, extra):
+        return [
+            {"last_upd_date" : record.get("data_fetched_at"), "class_abbr_name" : record.get("symbol"),
+             "fee_type_desc" : f.get("fee_desc"), "rate" : f.get("fee_value"), "rate_unit" : "%",
+             "actual_value" : f.get("fee_value"), "actual_value_unit" : "%", "fee_other_desc" : f.get("fee_remark")}
+            for f in record.get("fees") or []
+        ]
+
+    def ff_involveparty(self, proj_id, record, extra):
+        return [
+            {"last_upd_date" : record.get("data_fetched_at"), "entity_type" : p.get("party_role"),
+             "seq" : str(i + 1), "entity_name" : p.get("party_name"), "addr" : "-", "position" : p.get("party_role"),
+             "effective_date" : "2020-01-01"}
+            for i, p in enumerate(record.get("involved_parties") or [])
+        ]
+
+    def ff_urls(self, proj_id, record, extra):
+        urls = record.get("document_urls") or {}
+        return {
+            "last_upd_date" : record.get("data_fetched_at"),
+            "url_halfyear_report" : urls.get("halfyear_report_url"),
+            "url_annual_report" : urls.get("annual_report_url"),
+            "url_factsheet" : urls.get("factsheet_url"),
+        }
+
+    def ff_suitability(self, proj_id, record, extra):
+        suitability = record.get("suitability") or {}
+        return {
+            "last_upd_date" : record.get("data_fetched_at"),
+            "risk_spectrum_desc" : suitability.get("risk_level"),
+            "risk_spectrum" : str((record.get("metadata") or {}).get("risk_level")),
+        }
+
+    def ff_dividend(self, proj_id, record, extra):
+        return record.get("dividends") or None
+
+    def ff_class_fund(self, proj_id, record, extra):
+        return [self.class_fund(record.get("symbol"), proj_id)] if record else None
+
+    def ff_fundfullport(self, proj_id, record, extra):
+        period = extra[0] if extra else ""
+        rng = seeded(proj_id, period, "port")
+        rows, remaining = [], 100.0
+        for i in range(rng.randint(5, 25)):
+            weight = round(remaining * rng.uniform(0.05, 0.3), 4)
+            remaining -= weight
+            rows.append({
+                "proj_id" : proj_id,
+                "assetliab_code" : "SEC{:05d}".format(rng.randint(1, 400)),
+                "period" : period,
+                "market_value" : str(round(weight * 1_000_000, 2)),
+                "percent_nav" : str(weight),
+            })
+        return rows
+
+    def ff_fundport(self, proj_id, record, extra):
+        period = extra[0] if extra else ""
+        rng = seeded(proj_id, period, "fundport")
+        feeder = self.ff_feeder_fund(proj_id, record, extra)
+        rows = []
+        if feeder is not None:
+            # A feeder holds (almost) only its master fund
+            rows.append(("-", "-", feeder["main_feeder_fund"], round(rng.uniform(95, 99), 5)))
+        else:
+            # A few funds of funds hold other RMFs in the corpus
+            if rng.random() < 0.1 and self.store.mapping:
+                rows.append((rng.choice(sorted(self.store.mapping)), "-", None, round(rng.uniform(10, 40), 5)))
+            for code, isin, issuer in rng.sample(SECURITIES, rng.randint(3, 7)):
+                rows.append((code, isin, issuer, round(rng.uniform(1, 12), 5)))
+        return [
+            {"last_upd_date" : "2025-11-11T00:00:00", "as_of_date" : "{}-{}-28".format(period[:4], period[4:]),
+             "assetliab_id" : "101", "issue_code" : code, "isin_code" : isin, "issuer" : issuer or code,
+             "assetliab_value" : str(round(weight * 1_000_000, 2)), "percent_nav" : str(weight)}
+            for code, isin, issuer, weight in rows
+        ]
+
+    def ff_feeder_fund(self, proj_id, record, extra):
+        rng = seeded(proj_id, "feeder")
+        if rng.random() >= 0.3:
+            return None
+        name, country = rng.choice(MASTER_FUNDS)
+        return {"last_upd_date" : "2025-11-11T00:00:00", "main_feeder_fund" : name,
+                "feeder_fund_link" : "-", "feeder_fund_country" : country}
+
+    def ff_fundtrackingerror(self, proj_id, record, extra):
+        symbol = record.get("symbol")
+        if not symbol:
+            return None
+        rng = seeded(proj_id, "trackingerror")
+        return [{"proj_id" : proj_id, "class_abbr_name" : symbol,
+                 "tracking_error_percent" : str(round(rng.uniform(0.5, 8), 2)), "last_upd_date" : "2025-11-11T00:00:00"}]
+
+    def ff_fundtop5(self, proj_id, record, extra):
+        return [
+            {"proj_id" : proj_id, "assetseq" : str(i + 1), "secur_name" : r["assetliab_code"],
+             "period" : r["period"], "secur_Invest_size" : r["percent_nav"]}
+            for i, r in enumerate(sorted(self.ff_fundfullport(proj_id, record, extra),
+                                         key=lambda r: -float(r["percent_nav"]))[:5])
+        ]
+
+    ## FundDailyInfo
+    def fund_dailyinfo(self, parts):
+        store = self.store
+        if parts == ["amc"]:
+            return 200, [{"unique_id" : uid, "name_th" : name, "name_en" : name} for uid, name in sorted(store.amcs.items())]
+        if len(parts) < 2:
+            return 404, {"statusCode" : 404, "message" : "Resource not found"}
+
+        record = store.funds.get(parts[0])
+        if record is None:
+            return 204, None
+
+        if parts[1] == "dividend":
+            dividends = record.get("dividends") or []
+            return (200, dividends) if dividends else (204, None)
+
+        if parts[1] == "dailynav" and len(parts) > 2:
+            nav_date = parts[2]
+            history = list(record.get("nav_history_30d") or [])
+            if record.get("latest_nav"):
+                history.append(record["latest_nav"])
+            for nav in history:
+                if nav.get("nav_date") == nav_date:
+                    return 200, [{
+                        "nav_date" : nav_date,
+                        "unique_id" : store.mapping.get(record["symbol"], {}).get("amc_id"),
+                        "class_abbr_name" : record["symbol"],
+                        "net_asset" : nav.get("net_asset"),
+                        "last_val" : nav.get("last_val"),
+                        "previous_val" : nav.get("previous_val"),
+                        "sell_price" : nav.get("sell_price"),
+                        "buy_price" : nav.get("buy_price"),
+                        "sell_swap_price" : nav.get("sell_price"),
+                        "buy_swap_price" : nav.get("buy_price"),
+                        "remark_th" : "",
+                        "remark_en" : "",
+                        "last_upd_date" : (record.get("latest_nav") or {}).get("last_upd_date"),
+                    }]
+            return 204, None
+
+        return 404, {"statusCode" : 404, "message" : "Resource not found"}
+
+    ## bond
+    def bond(self, method, parts, body):
+        if method == "POST":
+            key = json.dumps(body or {}, sort_keys=True)
+            rng = seeded("bond", key)
+            return 200, [
+                {"issued_ref_id" : "B{:08d}".format(rng.randint(1, 99_999_999)), "issuer_name" : (body or {}).get("IssuerName"),
+                 "security_code" : (body or {}).get("SecurityCode") or "BOND{:04d}".format(rng.randint(1, 9999)),
+                 "last_upd_date" : "2025-11-11T00:00:00"}
+                for _ in range(rng.randint(1, 4))
+            ]
+        if len(parts) >= 4 and parts[2] == "outstanding_value":
+            rng = seeded("bond", parts[1], parts[3])
+            return 200, [{"issued_ref_id" : parts[1], "outstanding_date" : parts[3],
+                          "outstanding_value" : round(rng.uniform(1e6, 5e9), 2), "outstanding_unit" : rng.randint(1_000, 5_000_000)}]
+        return 200, synthetic_records("/bond/" + "/".join(parts))
+
+    ## LicenseCheck/licensee
+    def license_check(self, method, parts, body):
+        if parts == ["person"] and method == "POST":
+            name = str((body or {}).get("Name") or "")
+            rng = seeded("person", name)
+            if not name or rng.random() < 0.2:
+                return 204, None
+            return 200, [{"unique_id" : "P{:09d}".format(rng.randint(1, 999_999_999)), "name_th" : name,
+                          "name_en" : name, "regis_sale_no" : (body or {}).get("regis_sale_no") or "-"}]
+        if parts == ["company"]:
+            # Licensed companies: the AMCs of the corpus
+            return 200, [{"unique_id" : uid, "comp_name_th" : name, "comp_name_en" : name}
+                         for uid, name in sorted(self.store.amcs.items())]
+        return 200, synthetic_records("/LicenseCheck/licensee/" + "/".join(parts))
+
+    ## pvd/factsheet
+    def pvd(self, method, parts, body):
+        # Provident funds: a few per AMC, with policy / return / fee / PVDFullPort
+        # shaped like their FundFactsheet counterparts
+        if parts == ["amc"]:
+            return 200, [{"last_upd_date" : "2025-11-11T00:00:00", "unique_id" : uid, "name_th" : name, "name_en" : name}
+                         for uid, name in sorted(self.store.amcs.items())]
+        if method == "POST":
+            return 200, synthetic_records("/pvd/factsheet/fund/" + str((body or {}).get("FundName")), 3)
+        if len(parts) == 2 and parts[1] == "fund":
+            funds = self.pvd_funds(parts[0])
+            return (200, funds) if funds else (204, None)
+        if len(parts) >= 2 and parts[0].startswith("PVD"):
+            proj_id, endpoint = parts[0], parts[1]
+            rng = seeded(proj_id, endpoint, *parts[2:])
+            if endpoint == "policy":
+                return 200, {"last_upd_date" : "2025-11-11T00:00:00", "policy_desc" : rng.choice(PVD_POLICIES),
+                             "investment_policy_desc" : "-", "management_style" : rng.choice(("AN", "PN"))}
+            if endpoint == "return":
+                return 200, [
+                    {"last_upd_date" : "2025-11-11T00:00:00", "proj_id" : proj_id, "performance_type_desc" : desc,
+                     "reference_period" : period, "performance_val" : str(round(rng.uniform(-8, 15), 2)),
+                     "as_of_date" : "2025-10-31"}
+                    for desc in ("ผลตอบแทนกองทุนรวม", "ผลตอบแทนตัวชี้วัด") for period in PERIOD_NAMES.values()
+                ]
+            if endpoint == "fee":
+                return 200, [
+                    {"last_upd_date" : "2025-11-11T00:00:00", "proj_id" : proj_id, "fee_type_desc" : desc,
+                     "rate" : str(round(rng.uniform(0.01, 1), 4)), "rate_unit" : "%", "actual_value" : None,
+                     "actual_value_unit" : "%", "fee_other_desc" : "-"}
+                    for desc in ("ค่าธรรมเนียมการจัดการ", "ค่าธรรมเนียมผู้ดูแลผลประโยชน์", "ค่าธรรมเนียมนายทะเบียน")
+                ]
+            if endpoint == "PVDFullPort":
+                # Published for month ends only, up to two months back
+                if rng.random() < 0.5:
+                    return 204, None
+                return 200, self.ff_fundfullport(proj_id, None, parts[2:])
+        return 200, synthetic_records("/pvd/factsheet/" + "/".join(parts))
+
+    def pvd_funds(self, amc_id):
+        if amc_id not in self.store.amcs:
+            return []
+        rng = seeded(amc_id, "pvd")
+        return [
+            {"last_upd_date" : "2025-11-11T00:00:00", "proj_id" : "PVD{}{:02d}".format(amc_id[-4:], i),
+             "proj_abbr_name" : "{}-PVD{}".format(amc_id[-4:], i), "proj_name_th" : "กองทุนสำรองเลี้ยงชีพ {} {}".format(amc_id, i),
+             "proj_name_en" : "PROVIDENT FUND {} {}".format(amc_id, i), "unique_id" : amc_id, "fund_status" : "RG"}
+            for i in range(1, rng.randint(2, 6))
+        ]
+
+# HTTP layer
+class GatewayState:
+
+    def __init__(self, routes, latency, quota, keys, error_rate, seed):
+        self.routes = routes
+        self.latency = latency
+        self.quota = quota
+        self.keys = set(keys) if keys else None
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.stats = {}
+        self.stats_lock = threading.Lock()
+
+    def count(self, name):
+        with self.stats_lock:
+            self.stats[name] = self.stats.get(name, 0) + 1
+
+    def draw(self):
+        with self.rng_lock:
+            return self.latency.sample(self.rng), self.rng.random(), self.rng.choice((500, 502, 503, 504))
+
+class GatewayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeSecGateway/1.0"
+
+    def log_message(self, format, *args):
+        return
+
+    def do_GET(self):
+        self.handle_call("GET")
+
+    def do_POST(self):
+        self.handle_call("POST")
+
+    def send_json(self, status, payload, extra_headers=None):
+        body = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def handle_call(self, method):
+        state = self.server.state
+        path = unquote(urlsplit(self.path).path)
+
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+
+        if path == "/__stats":
+            with state.stats_lock:
+                return self.send_json(200, dict(state.stats))
+
+        state.count("requests")
+        latency, roll, fault_status = state.draw()
+        time.sleep(latency)
+
+        key = self.headers.get("Ocp-Apim-Subscription-Key")
+        if state.keys is not None and key not in state.keys:
+            state.count("401")
+            return self.send_json(401, {"statusCode" : 401, "message" : "Access denied due to invalid subscription key."})
+
+        retry_after = state.quota.check(key, time.monotonic())
+        if retry_after:
+            state.count("429")
+            return self.send_json(
+                429,
+                {"statusCode" : 429, "message" : "Rate limit is exceeded. Try again in {} seconds.".format(math.ceil(retry_after))},
+                {"Retry-After" : str(math.ceil(retry_after))},
+            )
+
+        if roll < state.error_rate:
+            state.count(str(fault_status))
+            return self.send_json(fault_status, {"statusCode" : fault_status, "message" : "Injected fault"})
+
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            state.count("400")
+            return self.send_json(400, {"statusCode" : 400, "message" : "Invalid JSON body"})
+
+        status, payload = state.routes.resolve(method, path, body)
+        state.count(str(status))
+        self.send_json(status, payload)
+
+def build_server(host="127.0.0.1", port=8089, DataDir=DEFAULT_DATA_DIR, FixtureDir=None,
+                 latency="const:0", quota=None, keys=None, error_rate=0.0, seed=1):
+    state = GatewayState(
+        routes=Routes(FixtureStore(DataDir, FixtureDir)),
+        latency=LatencyModel(latency),
+        quota=QuotaTracker(quota),
+        keys=keys,
+        error_rate=error_rate,
+        seed=seed,
+    )
+    server = ThreadingHTTPServer((host, port), GatewayHandler)
+    server.daemon_threads = True
+    server.state = state
+    return server
+
+# Start the gateway on a background thread; returns (server, base_url)
+def start_in_background(**kwargs):
+    server = build_server(**kwargs)
+    thread = threading.Thread(target=server.serve_forever, name="fake-sec-gateway", daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    return server, "http://{}:{}".format(host, port)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Local SEC API stand-in for benchmarking")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR))
+    parser.add_argument("--fixtures", default=None, help="directory of recorded responses mirroring URL paths")
+    parser.add_argument("--latency", default="const:0", help="const:MS | uniform:MIN,MAX | exp:MEAN | lognormal:MEDIAN_MS,SIGMA")
+    parser.add_argument("--quota", default=None, help="CALLS/SECONDS per subscription key, e.g. 3000/300")
+    parser.add_argument("--keys", default=None, help="comma separated accepted subscription keys")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of a random 5xx")
+    parser.add_argument("--seed", type=int, default=1)
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    server = build_server(
+        host=args.host,
+        port=args.port,
+        DataDir=args.data_dir,
+        FixtureDir=args.fixtures,
+        latency=args.latency,
+        quota=args.quota,
+        keys=[k for k in args.keys.split(",") if k] if args.keys else None,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    print("Fake SEC gateway listening on http://{}:{}".format(args.host, args.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,123 @@
+# Holdings ingestion for the RMF corpus -> data/holdings-index.json of this folder
+# (ignored by git: the index is derived, not corpus data)
+#
+# FundFullPort only gives asset class codes, so security level portfolios come from
+#   FundFactsheet/fund/{proj_id}/FundPort/{YYYYMM}   every security, quarterly
+#                                                    (published ~60 days after the quarter)
+#   FundFactsheet/fund/{proj_id}/FundTop5/{YYYYMM}   top 5 only, when FundPort is empty
+#   FundFactsheet/fund/{proj_id}/feeder_fund         master fund of a feeder
+# One set of calls per fund (share classes have the same portfolio) for every
+# fund in data/rmf-funds/*.json, then corpus/HoldingsIndex.py answers queries from
+# the saved index without calling the API.
+#
+# --master-holdings takes portfolios of master funds outside the corpus
+# ({"master fund name" : [{"issuer", "isin_code", "percent_nav"}, ...]}) so feeder
+# funds are looked through as well.
+#
+# python Holdings.py                                   # crawl and save the index
+# python Holdings.py --query NVIDIA                    # answer from the saved index
+# python Holdings.py --master-holdings masters.json --workers 8
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from datetime import date
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import time
+
+from DeltaSync import DEFAULT_CORPUS_DIR, CallCounter, load_records
+from corpus.HoldingsIndex import DEFAULT_INDEX_PATH, HoldingsIndex, holding_from_row, month_periods, quarter_periods
+
+def fetch_portfolio(counter, proj_id, today):
+    # (period, source, holdings, feeder) of one fund
+    from function.FundFactsheet import fund_factsheet_FundPort, fund_factsheet_FundTop5, fund_factsheet_feeder_fund
+
+    feeder = counter(fund_factsheet_feeder_fund, proj_id)
+    for source, function, periods in (
+        ("FundPort", fund_factsheet_FundPort, quarter_periods(today)),
+        ("FundTop5", fund_factsheet_FundTop5, month_periods(today)),
+    ):
+        for period in periods:
+            rows = counter(function, proj_id, period) or []
+            holdings = [h for h in map(holding_from_row, rows) if h is not None]
+            if holdings:
+                return period, source, holdings, feeder
+    return None, None, [], feeder
+
+def crawl(records, today, workers, masters=None):
+    counter = CallCounter(priority="backfill")
+    by_fund = {}
+    for symbol, (path, record) in records.items():
+        by_fund.setdefault(record["fund_id"], []).append((symbol, record))
+
+    index = HoldingsIndex(masters=masters)
+    # Redirected once around the pool: per call redirects from several threads
+    # could restore each other's stdout
+    with redirect_stdout(sys.stderr), ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(lambda proj_id: (proj_id, fetch_portfolio(counter, proj_id, today)), by_fund)
+        for proj_id, (period, source, holdings, feeder) in results:
+            for symbol, record in by_fund[proj_id]:
+                name = record.get("fund_name")
+                index.add_fund(symbol, proj_id, period, holdings, source, feeder, name)
+    index.build()
+    return index, counter
+
+def print_holders(index, query, direct_only):
+    keys = index.search(query)
+    report = {
+        "query" : query,
+        "securities" : [{"key" : k, "name" : index.name(k)} for k in keys],
+        "holders" : index.holders(query, direct_only),
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Crawl RMF portfolios into a look-through holdings index, or query it")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS_DIR))
+    parser.add_argument("--index", default=str(DEFAULT_INDEX_PATH))
+    parser.add_argument("--master-holdings", default=None, help="JSON of master fund portfolios for feeder look-through")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--query", default=None, help="security name, code or ISIN; answer from the saved index")
+    parser.add_argument("--direct-only", action="store_true", help="ignore look-through exposure in --query")
+    return parser.parse_args(argv)
+
+def load_masters(path):
+    masters = json.loads(Path(path).read_text(encoding="utf-8"))
+    return {name : [h for h in map(holding_from_row, rows) if h is not None] for name, rows in masters.items()}
+
+def main(argv=None):
+    args = parse_args(argv)
+    IndexPath = Path(args.index).resolve()
+    masters = load_masters(args.master_holdings) if args.master_holdings else None
+
+    if args.query:
+        print_holders(HoldingsIndex.load(IndexPath, masters), args.query, args.direct_only)
+        return
+
+    CorpusDir = Path(args.corpus).resolve()
+    # The client reads .env and writes log/ relative to this folder
+    os.chdir(Path(__file__).resolve().parent)
+
+    start = time.perf_counter()
+    index, counter = crawl(load_records(CorpusDir), date.today(), args.workers, masters)
+    index.save(IndexPath)
+
+    funds = index.funds.values()
+    report = {
+        "index" : str(IndexPath),
+        "funds" : len(index.funds),
+        "with_holdings" : sum(1 for f in funds if f["holdings"]),
+        "sources" : {s : sum(1 for f in funds if f["source"] == s) for s in ("FundPort", "FundTop5")},
+        "feeders" : sum(1 for f in funds if f["feeder"]),
+        "securities" : len(index),
+        "calls" : counter.calls,
+        "calls_empty" : counter.failed,
+        "elapsed_s" : round(time.perf_counter() - start, 2),
+    }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    sys.exit(main())
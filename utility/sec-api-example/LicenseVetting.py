@@ -0,0 +1,95 @@
+# Vet many licensees at once through function/LicenseBatch.py
+#
+# Persons (--person "name" or "name|regis_sale_no") and companies (--company name
+# or unique_id, --corpus-amcs for every AMC in data/fund-mapping.json) are looked
+# up in one batch: searches and the license / work_info / personnel / business_act
+# sub-resources of every match run on --workers threads, and every answer is
+# cached for --ttl-days in data/licensecheck-cache.json, so vetting the same list
+# again only calls the API for what is new or expired.
+#
+# python LicenseVetting.py --corpus-amcs
+# python LicenseVetting.py --person "Somchai Jaidee" --person "Somsri Rakdee|012345" --ttl-days 1
+# python LicenseVetting.py --input vetting.json --output result.json    # {"persons" : [...], "companies" : [...]}
+
+from contextlib import redirect_stdout
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import time
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_MAPPING = REPO_ROOT / "data" / "fund-mapping.json"
+
+def corpus_amcs(MappingPath=DEFAULT_MAPPING):
+    mapping = json.loads(Path(MappingPath).read_text(encoding="utf-8")).get("mapping") or {}
+    return sorted({entry["amc_name"] for entry in mapping.values() if entry.get("amc_name")})
+
+def parse_person(spec):
+    name, _, regis_sale_no = spec.partition("|")
+    return (name.strip(), regis_sale_no.strip())
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Batch LicenseCheck lookups with a local cache")
+    parser.add_argument("--person", action="append", default=[], help='"name" or "name|regis_sale_no" (repeatable)')
+    parser.add_argument("--company", action="append", default=[], help="company name or unique_id (repeatable)")
+    parser.add_argument("--corpus-amcs", action="store_true", help="add every AMC of data/fund-mapping.json")
+    parser.add_argument("--input", default=None, help='JSON file {"persons" : [...], "companies" : [...]}')
+    parser.add_argument("--no-expand", action="store_true", help="search only, skip the sub-resources of matches")
+    parser.add_argument("--ttl-days", type=float, default=7)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--cache", default=None, help="cache file (default: LicenseCheckCache or data/licensecheck-cache.json)")
+    parser.add_argument("--output", default=None, help="write the results here instead of stdout")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    OutputPath = Path(args.output).resolve() if args.output else None
+    CachePath = str(Path(args.cache).resolve()) if args.cache else None
+
+    persons = [parse_person(p) for p in args.person]
+    companies = list(args.company)
+    if args.input:
+        batch = json.loads(Path(args.input).read_text(encoding="utf-8"))
+        persons += [parse_person(p) if isinstance(p, str) else tuple(p) for p in batch.get("persons") or []]
+        companies += batch.get("companies") or []
+    if args.corpus_amcs:
+        companies += corpus_amcs()
+
+    # The client reads .env and writes log/ relative to this folder
+    os.chdir(Path(__file__).resolve().parent)
+    from function.LicenseBatch import LicenseBatch
+
+    started = time.perf_counter()
+    batch = LicenseBatch(CachePath=CachePath, TtlDays=args.ttl_days, Workers=args.workers, priority="refresh")
+    # Redirected once around the pools: per call redirects from several threads
+    # could restore each other's stdout
+    with redirect_stdout(sys.stderr):
+        results = {
+            "persons" : batch.persons(persons, expand=not args.no_expand) if persons else {},
+            "companies" : batch.companies(companies, expand=not args.no_expand) if companies else {},
+        }
+    batch.save()
+
+    if OutputPath:
+        OutputPath.parent.mkdir(parents=True, exist_ok=True)
+        OutputPath.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    report = {
+        "persons" : len(results["persons"]),
+        "persons_matched" : sum(1 for r in results["persons"].values() if r["matches"]),
+        "companies" : len(results["companies"]),
+        "companies_matched" : sum(1 for r in results["companies"].values() if r["matches"]),
+        "companies_unmatched" : [name for name, r in results["companies"].items() if not r["matches"]],
+        "calls" : batch.calls,
+        "cache_hits" : batch.hits,
+        "cache" : str(batch.CachePath) if batch.CachePath else None,
+        "elapsed_s" : round(time.perf_counter() - started, 2),
+    }
+    if not OutputPath:
+        report["results"] = results
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+# Memory benchmark: RMF corpus as JSON dicts vs corpus/FundModel.py
+#
+# Loads data/rmf-funds/*.json (optionally --scale times, each copy parsed again so
+# nothing is shared) into
+#   dict   json.loads() trees, as every consumer does today
+#   model  FundRecord (slots sections, NAV history arrays, interned strings)
+# and reports retained memory (tracemalloc, after gc) and load time as JSON.
+#
+# python MemoryBenchmark.py
+# python MemoryBenchmark.py --scale 35          # ~14k funds, the size of the whole fund universe
+# python MemoryBenchmark.py --output data/memory.json
+
+from pathlib import Path
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from corpus.FundModel import DEFAULT_CORPUS_DIR, FundRecord
+
+def load_dicts(texts):
+    return [json.loads(text) for text in texts]
+
+def load_models(texts):
+    return [FundRecord.from_dict(json.loads(text)) for text in texts]
+
+FORMS = {
+    "dict" : load_dicts,
+    "model" : load_models,
+}
+
+def measure(loader, texts):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    funds = loader(texts)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return funds, {
+        "funds" : len(funds),
+        "retained_bytes" : current,
+        "peak_bytes" : peak,
+        "bytes_per_fund" : round(current / len(funds)) if funds else None,
+        "load_s" : round(elapsed, 3),
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare memory use of the RMF corpus as dicts and as FundRecord")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS_DIR))
+    parser.add_argument("--scale", type=int, default=1, help="load every file this many times")
+    parser.add_argument("--output", default=None)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    texts = [path.read_text(encoding="utf-8") for path in sorted(Path(args.corpus).glob("*.json"))]
+    texts = texts * args.scale
+
+    results = {}
+    for name, loader in FORMS.items():
+        funds, results[name] = measure(loader, texts)
+        del funds
+
+    # The model must hold the same data as the dict form
+    sample = json.loads(texts[0]) if texts else None
+    roundtrip = sample is None or FundRecord.from_dict(sample).to_dict() == sample
+
+    dict_bytes = results["dict"]["retained_bytes"]
+    report = {
+        "corpus" : args.corpus,
+        "files" : len(texts) // args.scale if args.scale else 0,
+        "scale" : args.scale,
+        "forms" : results,
+        "model_vs_dict" : round(results["model"]["retained_bytes"] / dict_bytes, 3) if dict_bytes else None,
+        "roundtrip_ok" : roundtrip,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+        print("Memory report written to [{}]".format(args.output))
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+# Bulk One Report extraction: report years x companies x endpoints
+#
+# Every One Report endpoint takes (report_year, unique_id). This script plans the
+# whole cross product, drops what data/onereport.sqlite already holds (also the
+# answers that were empty, unless --retry-empty; failed calls are asked again),
+# runs the rest on --workers threads paced to the client's rate budget
+# (RateLimiter allows 3000 calls per 300 s per process and raises beyond that),
+# and then rebuilds one table per endpoint from the stored responses
+# (corpus/OneReportStore.py).
+#
+# Companies come from --company ids, or --companies amc (the AMC unique_ids in
+# data/fund-mapping.json) / sbo (onereport_sbo_info of each report year).
+#
+# python OneReportExtract.py --years 2021-2024 --companies amc
+# python OneReportExtract.py --years 2023,2024 --company C0000000239 --endpoint cgp_director --endpoint cgs_board
+# python OneReportExtract.py --years 2024 --companies amc --export ../../data/onereport   # CSV per endpoint
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import time
+
+from ratelimit import RateLimitException
+
+from DeltaSync import CallCounter
+from function.AllFunction import LastStatus
+from corpus.CrawlEngine import CALL_BUDGET, Pacer
+from corpus.OneReportStore import DEFAULT_STORE_PATH, OneReportStore
+from function.Profiling import phase
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_MAPPING = REPO_ROOT / "data" / "fund-mapping.json"
+
+# endpoint -> client function in function/Onereport.py, all (report_year, unique_id)
+ENDPOINTS = {
+    "sbo_product_income" : "onereport_sbo_product_income",
+    "sbo_risk" : "onereport_sbo_risk",
+    "sustainability_detail" : "onereport_sustainability_detail",
+    "sustainability_humanrights_issue" : "onereport_sustainability_humanrights_issue",
+    "scp_labor_dispute" : "onereport_scp_labor_dispute",
+    "scp_csr_activity" : "onereport_scp_csr_activity",
+    "cgp_governance" : "onereport_cgp_governance",
+    "cgp_director" : "onereport_cgp_director",
+    "cgp_code_of_conduct" : "onereport_cgp_code_of_conduct",
+    "cgs_board" : "onereport_cgs_board",
+    "cgs_auditor_company" : "onereport_cgs_auditor_company",
+    "cgs_director_performance" : "onereport_cgs_director_performance",
+}
+
+def parse_years(spec):
+    years = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if "-" in part:
+            first, last = part.split("-", 1)
+            years.update(range(int(first), int(last) + 1))
+        elif part:
+            years.add(int(part))
+    return sorted(years)
+
+def amc_companies(MappingPath=DEFAULT_MAPPING):
+    mapping = json.loads(Path(MappingPath).read_text(encoding="utf-8")).get("mapping") or {}
+    return sorted({entry["amc_id"] for entry in mapping.values() if entry.get("amc_id")})
+
+def sbo_companies(counter, years, language="TH"):
+    from function.Onereport import onereport_sbo_info
+
+    companies = set()
+    for year in years:
+        for row in counter(onereport_sbo_info, year, language) or []:
+            if row.get("unique_id"):
+                companies.add(row["unique_id"])
+    return sorted(companies)
+
+def plan(years, companies, endpoints, stored):
+    return [
+        (endpoint, year, company)
+        for endpoint in endpoints for year in years for company in companies
+        if (endpoint, year, company) not in stored
+    ]
+
+def extract(counter, store, tasks, workers, pacer):
+    import function.Onereport as Onereport
+
+    def fetch(task):
+        endpoint, year, company = task
+        function = getattr(Onereport, ENDPOINTS[endpoint])
+        while True:
+            pacer.wait(function.__name__)
+            try:
+                response = counter(function, year, company)
+                break
+            except RateLimitException as e:
+                # Another caller in this process used the budget; wait it out
+                with phase("rate_backoff", function.__name__):
+                    time.sleep(e.period_remaining)
+        # None is "no data" only when the API said 204
+        store.put(endpoint, year, company, response, failed=response is None and LastStatus() != 204)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for done, _ in enumerate(pool.map(fetch, tasks), 1):
+            if done % 200 == 0:
+                store.commit()
+    store.commit()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract One Report data for many years and companies")
+    parser.add_argument("--years", required=True, help="e.g. 2021-2024 or 2022,2024")
+    parser.add_argument("--company", action="append", default=[], help="company unique_id (repeatable)")
+    parser.add_argument("--companies", choices=("amc", "sbo"), default=None, help="add every AMC, or every company in sbo_info")
+    parser.add_argument("--endpoint", action="append", choices=sorted(ENDPOINTS), default=None, help="default: all")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=None, help="calls per second (default: 90%% of the budget of each Onereport key)")
+    parser.add_argument("--retry-empty", action="store_true", help="ask again where the API had nothing")
+    parser.add_argument("--store", default=str(DEFAULT_STORE_PATH))
+    parser.add_argument("--export", default=None, help="also write each endpoint table as CSV into this folder")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    StorePath = Path(args.store).resolve()
+    ExportDir = Path(args.export).resolve() if args.export else None
+    years = parse_years(args.years)
+    endpoints = args.endpoint or list(ENDPOINTS)
+
+    # The client reads .env and writes log/ relative to this folder
+    os.chdir(Path(__file__).resolve().parent)
+
+    started = time.perf_counter()
+    counter = CallCounter(priority="backfill")
+    if args.rate is None:
+        from function.Client import Client
+
+        args.rate = CALL_BUDGET[0] / CALL_BUDGET[1] * 0.9 * max(len(Client.default().keys("Onereport")), 1)
+    pacer = Pacer(args.rate, 1.0)
+    store = OneReportStore(StorePath)
+    # Redirected once around the pool: per call redirects from several threads
+    # could restore each other's stdout
+    with redirect_stdout(sys.stderr):
+        companies = set(args.company)
+        if args.companies == "amc":
+            companies.update(amc_companies())
+        elif args.companies == "sbo":
+            companies.update(sbo_companies(counter, years))
+        companies = sorted(companies)
+
+        tasks = plan(years, companies, endpoints, store.stored(args.retry_empty))
+        extract(counter, store, tasks, args.workers, pacer)
+        tables = store.normalize(endpoints)
+
+    if ExportDir:
+        ExportDir.mkdir(parents=True, exist_ok=True)
+        for endpoint, rows in tables.items():
+            if rows:
+                store.table(endpoint).to_csv(ExportDir / "onereport_{}.csv".format(endpoint), index=False)
+    store.close()
+
+    report = {
+        "store" : str(StorePath),
+        "years" : years,
+        "companies" : len(companies),
+        "endpoints" : len(endpoints),
+        "planned" : len(years) * len(companies) * len(endpoints),
+        "fetched" : len(tasks),
+        "calls" : counter.calls,
+        "calls_empty" : counter.failed,
+        "tables" : tables,
+        "elapsed_s" : round(time.perf_counter() - started, 2),
+    }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+# Provident fund (PVD) crawl -> data/pvd-funds/*.json
+#
+# function/PVDFactSheet.py has the same shape as the mutual fund factsheet: an AMC
+# list, the funds of each AMC, then policy / return / fee / PVDFullPort per fund.
+# This script runs those calls on the shared crawl machinery
+# (corpus/CrawlEngine.py): --workers funds in flight, calls paced to the client's
+# rate budget, every answer cached so an interrupted run repeats no call, and
+# funds already written within --ttl-days skipped on the next run.
+#
+# Each fund is written in the layout of the RMF records (data/rmf-funds/*.json):
+#   metadata.fund_classification    policy.policy_desc, fund_type "PVD"
+#   performance / benchmark         return rows, as FundFactsheet performance
+#   fees                            fee rows, as FundFactsheet fee
+#   asset_allocation                PVDFullPort of the latest published month,
+#                                   percent_nav summed per assetliab_code
+# so corpus.FundModel.load_corpus(DEFAULT_PVD_DIR) and the RMF tooling read both.
+#
+# python PVDCrawl.py
+# python PVDCrawl.py --amc C0000000239 --workers 8
+# python PVDCrawl.py --ttl-days 0                      # refetch every fund
+
+from contextlib import redirect_stdout
+from datetime import date, datetime, timezone
+from pathlib import Path
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+from DeltaSync import CallCounter, write_record
+from corpus.CrawlEngine import DEFAULT_STATE_DIR, CrawlEngine
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_PVD_DIR = REPO_ROOT / "data" / "pvd-funds"
+
+# performance_type_desc of the return rows, as in FundFactsheet performance
+FUND_RETURN = "ผลตอบแทนกองทุนรวม"
+BENCHMARK_RETURN = "ผลตอบแทนตัวชี้วัด"
+
+# reference_period -> key of the performance / benchmark sections
+PERIODS = {
+    "year to date" : "ytd",
+    "3 months" : "3m",
+    "6 months" : "6m",
+    "1 year" : "1y",
+    "3 years" : "3y",
+    "5 years" : "5y",
+    "10 years" : "10y",
+    "inception date" : "since_inception",
+}
+
+def number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def port_periods(today, count=3):
+    # Month ends before today, newest first: ["202510", "202509", "202508"]
+    year, month = today.year, today.month
+    periods = []
+    for _ in range(count):
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+        periods.append("{:04d}{:02d}".format(year, month))
+    return periods
+
+def sanitize(symbol):
+    # Same file names as the TypeScript crawler (KT25/75RMF -> KT25-75RMF)
+    return re.sub(r'[/\\:*?"<>|]', "-", symbol)
+
+# Record sections
+def returns_section(rows, desc, inception=True):
+    values = {}
+    for row in rows or []:
+        key = PERIODS.get(row.get("reference_period"))
+        if row.get("performance_type_desc") == desc and key is not None:
+            values[key] = number(row.get("performance_val"))
+    if not values:
+        return None
+    keys = [k for k in PERIODS.values() if inception or k != "since_inception"]
+    return {key : values.get(key) for key in keys}
+
+def fee_section(rows):
+    if not rows:
+        return None
+    return [
+        {"fee_type" : row.get("fee_type_desc") or "Unknown", "fee_desc" : row.get("fee_type_desc") or "",
+         "fee_value" : row.get("actual_value") or row.get("rate"), "fee_remark" : row.get("fee_other_desc")}
+        for row in rows
+    ]
+
+def allocation_section(rows):
+    if not rows:
+        return None
+    totals = {}
+    for row in rows:
+        code = row.get("assetliab_code") or "Unknown"
+        totals[code] = totals.get(code, 0.0) + (number(row.get("percent_nav")) or 0.0)
+    return [{"asset_class" : code, "percentage" : round(pct, 4)} for code, pct in sorted(totals.items(), key=lambda kv: -kv[1])]
+
+def pvd_record(fund, amc_name, policy, returns, fees, port, period):
+    policy = (policy[0] if isinstance(policy, list) and policy else policy) or {}
+    errors = []
+    if not policy:
+        errors.append("No policy data available")
+    performance = returns_section(returns, FUND_RETURN)
+    if performance is None:
+        errors.append("No performance data available")
+    benchmark = returns_section(returns, BENCHMARK_RETURN, inception=False)
+    fee_rows = fee_section(fees)
+    if fee_rows is None:
+        errors.append("No fee data available")
+    allocation = allocation_section(port)
+    if allocation is None:
+        errors.append("No PVDFullPort data available")
+
+    return {
+        "fund_id" : fund["proj_id"],
+        "symbol" : fund.get("proj_abbr_name") or fund["proj_id"],
+        "fund_name" : fund.get("proj_name_en") or fund.get("proj_name_th"),
+        "amc" : amc_name,
+        "metadata" : {
+            "fund_classification" : policy.get("policy_desc"),
+            "management_style" : policy.get("management_style"),
+            "dividend_policy" : None,
+            "risk_level" : None,
+            "fund_type" : "PVD",
+        },
+        "latest_nav" : None,
+        "nav_history_30d" : None,
+        "dividends" : None,
+        "performance" : performance,
+        "benchmark" : None if benchmark is None else {"name" : None, "returns" : benchmark},
+        "risk_metrics" : None,
+        "asset_allocation" : allocation,
+        "category" : None,
+        "fees" : fee_rows,
+        "involved_parties" : None,
+        "top_holdings" : None,
+        "risk_factors" : None,
+        "suitability" : None,
+        "document_urls" : None,
+        "investment_minimums" : None,
+        "data_fetched_at" : datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "errors" : errors,
+        "portfolio_period" : period,
+    }
+
+# Crawl
+def list_funds(engine, amc_ids=None):
+    # {proj_id: (fund list row, AMC name)} of the registered funds
+    from function.PVDFactSheet import pvd_factsheet_amc, pvd_factsheet_fund
+
+    amcs = {row["unique_id"] : row.get("name_en") or row.get("name_th")
+            for row in engine.call(pvd_factsheet_amc) or [] if row.get("unique_id")}
+    if amc_ids:
+        amcs = {uid : name for uid, name in amcs.items() if uid in amc_ids}
+    funds = {}
+    for (uid, name), rows in zip(amcs.items(), engine.map(lambda uid: engine.call(pvd_factsheet_fund, uid), list(amcs))):
+        for row in rows or []:
+            if row.get("proj_id") and row.get("fund_status") in (None, "RG"):
+                funds[row["proj_id"]] = (row, name)
+    return funds
+
+def crawl_fund(engine, fund, amc_name, periods, PvdDir):
+    from function.PVDFactSheet import (
+        pvd_factsheet_fee, pvd_factsheet_policy, pvd_factsheet_pvdFullPort, pvd_factsheet_return,
+    )
+
+    proj_id = fund["proj_id"]
+    policy = engine.call(pvd_factsheet_policy, proj_id)
+    returns = engine.call(pvd_factsheet_return, proj_id)
+    fees = engine.call(pvd_factsheet_fee, proj_id)
+    port, period = None, None
+    for candidate in periods:
+        port = engine.call(pvd_factsheet_pvdFullPort, proj_id, candidate)
+        if port:
+            period = candidate
+            break
+
+    record = pvd_record(fund, amc_name, policy, returns, fees, port, period)
+    if len(record["errors"]) == 4:
+        # Nothing at all: leave it failed so the next run asks again
+        return False
+    PvdDir.mkdir(parents=True, exist_ok=True)
+    write_record(PvdDir / "{}.json".format(sanitize(record["symbol"])), record)
+    return True
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Crawl provident fund factsheets into data/pvd-funds")
+    parser.add_argument("--amc", action="append", default=None, help="AMC unique_id (repeatable, default all)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--ttl-days", type=float, default=7, help="refetch funds and cached answers older than this")
+    parser.add_argument("--port-months", type=int, default=3, help="months to search back for a published PVDFullPort")
+    parser.add_argument("--output", default=str(DEFAULT_PVD_DIR))
+    parser.add_argument("--state", default=str(DEFAULT_STATE_DIR), help="progress and call cache folder")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    PvdDir = Path(args.output).resolve()
+    StateDir = Path(args.state).resolve()
+
+    # The client reads .env and writes log/ relative to this folder
+    os.chdir(Path(__file__).resolve().parent)
+
+    started = time.perf_counter()
+    counter = CallCounter(priority="backfill")
+    engine = CrawlEngine("pvd", StateDir, Workers=args.workers, TtlDays=args.ttl_days, counter=counter)
+    periods = port_periods(date.today(), args.port_months)
+    # Redirected once around the pools: per call redirects from several threads
+    # could restore each other's stdout
+    with redirect_stdout(sys.stderr):
+        funds = list_funds(engine, set(args.amc) if args.amc else None)
+        summary = engine.run(sorted(funds), lambda proj_id: crawl_fund(engine, *funds[proj_id], periods, PvdDir))
+
+    report = {
+        "output" : str(PvdDir),
+        "amcs" : len({name for _, name in funds.values()}),
+        "funds" : summary,
+        "calls" : engine.calls,
+        "calls_empty" : counter.failed,
+        "cache_hits" : engine.hits,
+        "elapsed_s" : round(time.perf_counter() - started, 2),
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    sys.exit(main())
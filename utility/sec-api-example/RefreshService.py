@@ -0,0 +1,344 @@
+# Long-running refresh of the RMF corpus (data/rmf-funds/*.json)
+#
+# Keeps the corpus current without a full crawl or a manual DeltaSync run. Three
+# jobs, on Thai time (corpus/Refresh.py has the sections of each):
+#   daily     trading days at --nav-at (default 08:30, the NAV of the previous
+#             trading day is out by then): fetches every trading day from each
+#             fund's stored nav_date up to the previous trading day
+#             (fund_dailyinfo_dailynav, one call per fund and day), patches
+#             latest_nav / nav_history_30d, then refreshes dividends
+#             (fund_dailyinfo_dividend, one call per fund). While some funds have
+#             not published that day yet, the job runs again every --retry-minutes
+#             until --nav-until; the funds already current cost no call then.
+#             Funds with no NAV in the last --lookback days are left to the crawl
+#   weekly    --weekly-on (default sat) at --factsheet-at: performance, benchmark
+#   monthly   day --monthly-on (default 5) at --factsheet-at: the slower factsheet
+#             sections (fees, holdings, parties, risk, ...)
+# Trading days are weekdays that are not in --holidays (JSON list of dates, or one
+# date per line).
+#
+# Calls go through corpus/CrawlEngine.py (paced to the budget of each product's
+# subscription keys, answers cached in data/crawl/refresh-{job}-cache.sqlite of
+# this folder for half a day so a job that is run again repeats no call) as the
+# "refresh" scheduling class (function/Scheduler.py). Changed records of a run
+# are swapped in together by corpus/Refresh.py StoreUpdate: each version is a
+# complete folder (data/rmf-funds.versions/vN) named by
+# data/rmf-funds.snapshot.json, and data/rmf-funds is updated after it;
+# --archive also rebuilds data/corpus.secz.
+# The time each job last completed is kept in --state, so a restarted service runs
+# a job it missed once and then waits for the next slot.
+#
+# python RefreshService.py                          # run forever
+# python RefreshService.py --once                   # the jobs that are due now, then exit (cron)
+# python RefreshService.py --run daily --dry-run    # one job now, print what would change
+# python RefreshService.py --holidays ../../data/set-holidays.txt --archive
+
+from contextlib import redirect_stdout
+from copy import deepcopy
+from datetime import date, datetime, time as clock, timedelta
+from pathlib import Path
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+
+from DeltaSync import CallCounter, apply_nav, class_row, load_records
+from corpus.CrawlEngine import DEFAULT_STATE_DIR, CrawlEngine
+from corpus.Refresh import (BANGKOK_TZ, CADENCES, DEFAULT_CORPUS_DIR, DEFAULT_SNAPSHOT_PATH, StoreUpdate,
+                            TradingCalendar, call_args, endpoints_for, rebuild)
+
+DEFAULT_STATE_PATH = DEFAULT_STATE_DIR / "refresh-state.json"
+
+JOBS = tuple(CADENCES)
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+# Answers cached by CrawlEngine, in days
+CACHE_DAYS = 0.5
+
+def client_function(name):
+    import function.FundDailyInfo as FundDailyInfo
+    import function.FundFactsheet as FundFactsheet
+
+    return getattr(FundDailyInfo if name.startswith("fund_dailyinfo_") else FundFactsheet, name)
+
+def parse_clock(value):
+    hours, _, minutes = value.partition(":")
+    return clock(int(hours), int(minutes or 0))
+
+# When jobs are due
+class Schedule:
+
+    def __init__(self, args, calendar):
+        self.args = args
+        self.calendar = calendar
+
+    def at(self, job):
+        return parse_clock(self.args.nav_at if job == "daily" else self.args.factsheet_at)
+
+    def is_slot(self, job, day):
+        if job == "daily":
+            return self.calendar.is_trading_day(day)
+        if job == "weekly":
+            return day.weekday() == WEEKDAYS.index(self.args.weekly_on)
+        return day.day == self.args.monthly_on
+
+    def last_slot(self, job, now):
+        # Latest day whose slot has passed (a missed slot is run once), or None
+        for back in range(40):
+            day = now.date() - timedelta(days=back)
+            if self.is_slot(job, day) and datetime.combine(day, self.at(job), BANGKOK_TZ) <= now:
+                return day
+        return None
+
+    def next_slot(self, job, now):
+        for ahead in range(40):
+            day = now.date() + timedelta(days=ahead)
+            start = datetime.combine(day, self.at(job), BANGKOK_TZ)
+            if self.is_slot(job, day) and start > now:
+                return start
+        return None
+
+    def due(self, job, state, now):
+        slot = self.last_slot(job, now)
+        entry = state.get(job) or {}
+        if slot is None or (entry.get("done_for") or "") >= slot.isoformat():
+            return None
+        retry_at = entry.get("retry_at")
+        if entry.get("retry_for") == slot.isoformat() and retry_at and now < datetime.fromisoformat(retry_at):
+            return None
+        return slot
+
+    def wake(self, state, now):
+        # Next time anything can become due
+        times = [self.next_slot(job, now) for job in JOBS]
+        for entry in state.values():
+            if entry.get("retry_at") and datetime.fromisoformat(entry["retry_at"]) > now:
+                times.append(datetime.fromisoformat(entry["retry_at"]))
+        return min(t for t in times if t is not None)
+
+# Jobs
+def newer(nav, stored):
+    # NAV is later than the stored one, or the same day restated
+    nav_date, stored_date = nav.get("nav_date") or "", stored.get("nav_date") or ""
+    return nav_date > stored_date or (
+        nav_date == stored_date and (nav.get("last_upd_date") or "") > (stored.get("last_upd_date") or "")
+    )
+
+def by_fund(records):
+    funds = {}
+    for symbol, (path, record) in records.items():
+        funds.setdefault(record["fund_id"], []).append(symbol)
+    return funds
+
+def run_daily(engine, records, calendar, now, args):
+    from function.FundDailyInfo import fund_dailyinfo_dailynav, fund_dailyinfo_dividend
+
+    today = now.date()
+    target = calendar.previous(today)
+    oldest = (today - timedelta(days=args.lookback)).isoformat()
+    funds = by_fund(records)
+
+    def stored(symbol):
+        return ((records[symbol][1].get("latest_nav") or {}).get("nav_date") or "")[:10]
+
+    def fetch(fund_id):
+        # NAV rows of every trading day up to target the fund's classes are missing,
+        # and its dividends. A fund whose NAV stopped before the lookback is left to
+        # the full crawl instead of being asked for it every day
+        since = min(stored(s) for s in funds[fund_id])
+        days = calendar.between(date.fromisoformat(since), target) if since >= oldest else []
+        navs = [engine.call(fund_dailyinfo_dailynav, fund_id, day.isoformat()) or [] for day in days]
+        return fund_id, navs, engine.call(fund_dailyinfo_dividend, fund_id)
+
+    changed, patched = {}, 0
+    for fund_id, navs, dividends in engine.map(fetch, list(funds)):
+        for symbol in funds[fund_id]:
+            path, record = records[symbol]
+            updated = deepcopy(record)
+            for rows in navs:
+                nav = class_row(rows, symbol)
+                if nav is not None and newer(nav, updated.get("latest_nav") or {}):
+                    apply_nav(updated, nav)
+                    patched += 1
+            rebuild(updated, ["dividends"], {"fund_dailyinfo_dividend" : dividends})
+            if updated != record:
+                changed[symbol] = (path, updated)
+
+    dates = {symbol : (((changed.get(symbol) or records[symbol])[1].get("latest_nav") or {}).get("nav_date") or "")[:10] for symbol in records}
+    # Funds whose AMC has not published the target day yet
+    behind = sum(1 for symbol, nav_date in dates.items() if oldest <= stored(symbol) and nav_date < target.isoformat())
+    return changed, {
+        "nav_date" : max(dates.values(), default="") or None,
+        "expected_nav_date" : target.isoformat(),
+        "published" : behind == 0,
+        "nav_patches" : patched,
+        "funds_behind" : behind,
+        "funds_stale" : sum(1 for symbol in records if stored(symbol) < oldest),
+    }
+
+def run_factsheet(job, engine, records, now):
+    sections = CADENCES[job]
+    endpoints = endpoints_for(sections)
+    funds = by_fund(records)
+    today = now.date()
+
+    def answer(name, fund_id):
+        for args in call_args(name, fund_id, today):
+            response = engine.call(client_function(name), *args)
+            if response:
+                break
+        return response
+
+    def fetch(fund_id):
+        return fund_id, {name : answer(name, fund_id) for name in endpoints}
+
+    changed, sections_changed = {}, {}
+    for fund_id, answers in engine.map(fetch, list(funds)):
+        for symbol in funds[fund_id]:
+            path, record = records[symbol]
+            updated = deepcopy(record)
+            for section in rebuild(updated, sections, answers):
+                sections_changed[section] = sections_changed.get(section, 0) + 1
+            if updated != record:
+                changed[symbol] = (path, updated)
+    return changed, {"sections" : list(sections), "sections_changed" : sections_changed}
+
+def run_job(job, args, calendar, now):
+    records = load_records(args.CorpusDir)
+    counter = CallCounter(priority="refresh")
+    engine = CrawlEngine("refresh-{}".format(job), StateDir=args.StatePath.parent, Workers=args.workers,
+                         TtlDays=CACHE_DAYS, counter=counter)
+    started = time.perf_counter()
+    # Redirected once around the workers: per call redirects from several threads
+    # could restore each other's stdout
+    with redirect_stdout(sys.stderr):
+        if job == "daily":
+            changed, details = run_daily(engine, records, calendar, now, args)
+        else:
+            changed, details = run_factsheet(job, engine, records, now)
+    engine.save()
+
+    update = StoreUpdate(args.CorpusDir, args.SnapshotPath)
+    for symbol, (path, record) in sorted(changed.items()):
+        update.stage(path, record)
+    snapshot = None
+    if args.dry_run:
+        update.discard()
+    else:
+        snapshot = update.commit(job, **{k : v for k, v in details.items() if k == "nav_date"})
+        if snapshot is not None and args.archive:
+            from corpus.Archive import build_archive
+
+            build_archive()
+
+    return {
+        "job" : job,
+        "started_at" : now.isoformat(),
+        "funds" : len(records),
+        "calls" : counter.calls,
+        "calls_empty" : counter.failed,
+        "cached" : engine.hits,
+        "changed" : len(changed),
+        "snapshot_version" : snapshot["version"] if snapshot else None,
+        "dry_run" : args.dry_run,
+        "elapsed_s" : round(time.perf_counter() - started, 2),
+        **details,
+        **({"symbols" : sorted(changed)} if args.dry_run else {}),
+    }
+
+# State
+def read_state(StatePath):
+    try:
+        return json.loads(StatePath.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def write_state(StatePath, state):
+    StatePath.parent.mkdir(parents=True, exist_ok=True)
+    tmp = StatePath.with_suffix(StatePath.suffix + ".tmp")
+    tmp.write_text(json.dumps(state, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, StatePath)
+
+def record_run(state, job, slot, report, now, args):
+    entry = state.setdefault(job, {})
+    entry["last_run"] = report
+    entry.pop("retry_at", None)
+    entry.pop("retry_for", None)
+    if slot is None:
+        return
+    until = datetime.combine(slot, parse_clock(args.nav_until), BANGKOK_TZ)
+    if job == "daily" and not report["published"] and now + timedelta(minutes=args.retry_minutes) < until:
+        # Not out yet: again later today
+        entry["retry_for"] = slot.isoformat()
+        entry["retry_at"] = (now + timedelta(minutes=args.retry_minutes)).isoformat()
+    else:
+        entry["done_for"] = slot.isoformat()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh the RMF corpus on a daily / weekly / monthly schedule")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS_DIR))
+    parser.add_argument("--snapshot", default=str(DEFAULT_SNAPSHOT_PATH), help="version file bumped after every swap")
+    parser.add_argument("--state", default=str(DEFAULT_STATE_PATH))
+    parser.add_argument("--holidays", default=None, help="dates that are not trading days (JSON list or one per line)")
+    parser.add_argument("--nav-at", default="08:30", help="daily job, Thai time")
+    parser.add_argument("--nav-until", default="20:00", help="retry the daily job until then while the NAV is not out")
+    parser.add_argument("--retry-minutes", type=float, default=30)
+    parser.add_argument("--factsheet-at", default="06:00", help="weekly and monthly jobs, Thai time")
+    parser.add_argument("--weekly-on", choices=WEEKDAYS, default="sat")
+    parser.add_argument("--monthly-on", type=int, default=5, help="day of the month")
+    parser.add_argument("--lookback", type=int, default=10, help="days of missing NAVs the daily job catches up")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--archive", action="store_true", help="rebuild data/corpus.secz after every swap")
+    parser.add_argument("--once", action="store_true", help="run the jobs that are due, then exit")
+    parser.add_argument("--run", choices=JOBS, action="append", default=None, help="run this job now (repeatable), then exit")
+    parser.add_argument("--dry-run", action="store_true", help="fetch and report, do not write the corpus")
+    parser.add_argument("--now", default=None, help="act as if it were this Thai time (e.g. 2025-11-12T09:00), for replays")
+    args = parser.parse_args(argv)
+    if not 1 <= args.monthly_on <= 28:
+        parser.error("--monthly-on must be 1..28")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    args.CorpusDir = Path(args.corpus).resolve()
+    args.SnapshotPath = Path(args.snapshot).resolve()
+    args.StatePath = Path(args.state).resolve()
+    calendar = TradingCalendar.from_file(Path(args.holidays).resolve() if args.holidays else None)
+    schedule = Schedule(args, calendar)
+
+    # The client reads .env and writes log/ relative to this folder
+    os.chdir(Path(__file__).resolve().parent)
+
+    # A swap cut short by the last run is finished before anything else
+    StoreUpdate(args.CorpusDir, args.SnapshotPath)
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    while not stop.is_set():
+        now = datetime.fromisoformat(args.now).replace(tzinfo=BANGKOK_TZ) if args.now else datetime.now(BANGKOK_TZ)
+        state = read_state(args.StatePath)
+        if args.run:
+            todo = [(job, schedule.last_slot(job, now)) for job in args.run]
+        else:
+            todo = [(job, slot) for job in JOBS for slot in [schedule.due(job, state, now)] if slot is not None]
+        for job, slot in todo:
+            if stop.is_set():
+                break
+            report = run_job(job, args, calendar, now)
+            if not args.dry_run:
+                record_run(state, job, slot, report, now if args.now else datetime.now(BANGKOK_TZ), args)
+                write_state(args.StatePath, state)
+            print(json.dumps(report, indent=2, ensure_ascii=False), flush=True)
+        if args.run or args.once or args.now:
+            break
+        wake = schedule.wake(state, datetime.now(BANGKOK_TZ))
+        print("Next refresh at {}".format(wake.isoformat()), file=sys.stderr, flush=True)
+        stop.wait(max((wake - datetime.now(BANGKOK_TZ)).total_seconds(), 1))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+# Bulk tracking error / information ratio / excess return for the RMF corpus
+#
+# Computes corpus/ActiveReturns.py metrics for every fund with a benchmark series
+# over any windows, instead of FundTrackingError + benchmark calls per fund. The API
+# is only used to check the result (--validate N asks FundTrackingError for N funds
+# and compares with the local 1y figure); excess returns are also checked against
+# the stored performance - benchmark returns, without any call.
+#
+# --benchmarks    daily index levels: CSV (date, one column per series) or JSON
+#                 {series: [{"date", "value"}]}; a column named like a fund's
+#                 benchmark.name is used for that fund
+# --benchmark-map JSON {symbol or benchmark name : series | {series : weight}} for
+#                 composite benchmarks, feeders ("ผลการดำเนินงานของกองทุนรวมหลัก")
+#                 and funds without a benchmark
+#
+# python TrackingError.py --benchmarks benchmarks.csv
+# python TrackingError.py --benchmarks benchmarks.csv --benchmark-map map.json --windows 1m,3m,1y,2025-01-01:2025-06-30
+# python TrackingError.py --benchmarks benchmarks.csv --validate 20
+
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from DeltaSync import CallCounter
+from corpus.ActiveReturns import (
+    MIN_PERIODS, active_metrics, benchmark_returns, benchmark_weights, fund_returns, load_benchmark_levels,
+    parse_window, to_records,
+)
+from corpus.FundModel import DEFAULT_CORPUS_DIR, load_corpus
+from corpus.ReturnsMatrix import DEFAULT_STATE_PATH, ReturnsMatrix
+
+def check_excess(funds, records):
+    # Local excess return vs stored performance - benchmark returns, per named window
+    diffs = {}
+    for symbol, windows in records.items():
+        record = funds[symbol]
+        if record.performance is None or record.benchmark is None or record.benchmark.returns is None:
+            continue
+        stored = record.performance.to_dict()
+        bench = record.benchmark.returns.to_dict()
+        for name, values in windows.items():
+            if values["excess_return"] is None or stored.get(name) is None or bench.get(name) is None:
+                continue
+            diffs.setdefault(name, []).append(values["excess_return"] - (stored[name] - bench[name]))
+    return {
+        name : {"funds" : len(d), "mean_abs_diff" : round(float(np.mean(np.abs(d))), 4)}
+        for name, d in sorted(diffs.items())
+    }
+
+def check_api(funds, records, count, window="1y"):
+    # Local tracking error vs FundTrackingError for the first `count` funds with one
+    from function.FundFactsheet import fund_factsheet_FundTrackingError
+
+    counter = CallCounter(priority="refresh")
+    compared = []
+    for symbol, windows in records.items():
+        if len(compared) >= count:
+            break
+        local = (windows.get(window) or {}).get("tracking_error")
+        if local is None:
+            continue
+        rows = counter(fund_factsheet_FundTrackingError, funds[symbol].fund_id) or []
+        row = next((r for r in rows if r.get("class_abbr_name") == symbol), rows[0] if len(rows) == 1 else None)
+        try:
+            remote = float(row["tracking_error_percent"])
+        except (TypeError, KeyError, ValueError):
+            continue
+        compared.append({"symbol" : symbol, "local" : local, "api" : remote, "diff" : round(local - remote, 4)})
+    return {
+        "window" : window,
+        "calls" : counter.calls,
+        "funds" : len(compared),
+        "mean_abs_diff" : round(float(np.mean([abs(c["diff"]) for c in compared])), 4) if compared else None,
+        "funds_compared" : compared,
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compute tracking error, information ratio and excess return for all funds")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS_DIR))
+    parser.add_argument("--state", default=str(DEFAULT_STATE_PATH), help="ReturnsMatrix state with a longer return history, if present")
+    parser.add_argument("--benchmarks", required=True, help="benchmark levels, CSV or JSON")
+    parser.add_argument("--benchmark-map", default=None, help="JSON overrides: symbol or benchmark name -> series or {series: weight}")
+    parser.add_argument("--windows", default="1m,3m,6m,1y", help="named (1m,3m,6m,1y,3y), trading days, or FIRST:LAST dates")
+    parser.add_argument("--min-periods", type=int, default=MIN_PERIODS)
+    parser.add_argument("--validate", type=int, default=0, help="compare the 1y tracking error with the API for this many funds")
+    parser.add_argument("--output", default=None)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    StatePath = Path(args.state)
+    OutputPath = Path(args.output).resolve() if args.output else None
+
+    start = time.perf_counter()
+    funds = load_corpus(args.corpus)
+    matrix = ReturnsMatrix.load(StatePath) if StatePath.is_file() else None
+    returns = fund_returns(funds, matrix)
+    levels = load_benchmark_levels(args.benchmarks)
+    overrides = json.loads(Path(args.benchmark_map).read_text(encoding="utf-8")) if args.benchmark_map else None
+    weights = benchmark_weights(funds, levels.columns, overrides)
+    bench = benchmark_returns(levels, weights, returns.index)
+
+    windows = {spec.strip() : parse_window(spec) for spec in args.windows.split(",") if spec.strip()}
+    records = to_records(active_metrics(returns, bench, windows, args.min_periods))
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "funds" : len(funds),
+        "with_benchmark" : len(weights.columns),
+        "without_benchmark" : len(set(funds) - set(weights.columns)),
+        "return_days" : len(returns.index),
+        "windows" : list(windows),
+        "compute_s" : round(elapsed, 3),
+        "check_excess" : check_excess(funds, records),
+    }
+    if args.validate:
+        # The client reads .env and writes log/ relative to this folder
+        os.chdir(Path(__file__).resolve().parent)
+        report["check_api"] = check_api(funds, records, args.validate)
+    report["metrics"] = records
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if OutputPath:
+        OutputPath.write_text(text + "\n", encoding="utf-8")
+        print("Tracking error report written to [{}]".format(OutputPath))
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+# Tracking error, information ratio and excess return of every fund against its benchmark
+#
+# FundFactsheet FundTrackingError gives one 1-year number per class and benchmark
+# only names the index, so both cost a call per fund and allow no other window.
+# Here everything is computed locally from
+#   * daily fund returns     NAV history of the corpus (+ the rolling rows kept by
+#                            corpus/ReturnsMatrix.py, which reach further back)
+#   * benchmark levels       daily index levels, one column per series (CSV/JSON)
+#   * benchmark weights      fund -> {series: weight}; by default the series named
+#                            like the fund's benchmark.name, overridden per fund symbol
+#                            or benchmark name (composites, feeders' master funds,
+#                            funds the API has no benchmark for)
+# as dates x funds matrices, so each window is a handful of column-wise numpy ops
+# for all funds at once:
+#   fund_return / benchmark_return   compounded over the window, %
+#   excess_return                    fund_return - benchmark_return, %
+#   tracking_error                   std(fund - benchmark daily) * sqrt(252), %
+#   information_ratio                annualised mean active return / tracking error
+# Benchmark levels are carried forward onto the fund's NAV dates, so foreign index
+# holidays do not drop days.
+#
+# from corpus.ActiveReturns import active_metrics, benchmark_returns, benchmark_weights, fund_returns
+# funds = fund_returns(load_corpus())
+# bench = benchmark_returns(load_benchmark_levels("benchmarks.csv"), weights, funds.index)
+# active_metrics(funds, bench, {"3m" : 63, "1y" : 252})
+
+from datetime import date
+import json
+import math
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+# Named windows, in trading days
+WINDOWS = {
+    "1m" : 21,
+    "3m" : 63,
+    "6m" : 126,
+    "1y" : 252,
+    "3y" : 756,
+}
+
+# Fewer common return days than this give no result for a window
+MIN_PERIODS = 15
+
+METRICS = ("days", "fund_return", "benchmark_return", "excess_return", "tracking_error", "information_ratio")
+
+def parse_window(spec):
+    # "3m" / "63" -> trading days; "2025-01-01:2025-06-30" -> (first date, last date)
+    spec = spec.strip()
+    if spec in WINDOWS:
+        return WINDOWS[spec]
+    if ":" in spec:
+        first, last = spec.split(":", 1)
+        return (pd.Timestamp(first) if first else None, pd.Timestamp(last) if last else None)
+    return int(spec)
+
+# Inputs
+def fund_returns(funds, matrix=None):
+    # Daily returns, dates x symbols, from {symbol: FundRecord} (and a ReturnsMatrix)
+    columns = {}
+    for symbol, record in funds.items():
+        history = record.nav_history
+        if history is None or not len(history):
+            continue
+        navs = pd.Series(np.asarray(history.last_val), index=[date.fromordinal(d) for d in history.dates])
+        navs = navs[navs > 0]
+        columns[symbol] = navs.pct_change().iloc[1:]
+    returns = pd.DataFrame(columns)
+    if matrix is not None and len(matrix.dates):
+        rolling = pd.DataFrame(matrix.rows, index=matrix.window_dates(), columns=matrix.symbols)
+        returns = rolling.combine_first(returns)
+    returns.index = pd.DatetimeIndex(returns.index)
+    return returns.sort_index()
+
+def load_benchmark_levels(path):
+    # CSV (date column, then one column of levels per series) or
+    # JSON {series: [{"date", "value"}, ...]} -> dates x series levels
+    path = str(path)
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        levels = pd.DataFrame({
+            name : pd.Series({row["date"] : row["value"] for row in rows}, dtype=float)
+            for name, rows in data.items()
+        })
+    else:
+        levels = pd.read_csv(path, index_col=0)
+    levels.index = pd.DatetimeIndex(levels.index)
+    return levels.sort_index().apply(pd.to_numeric, errors="coerce")
+
+def benchmark_weights(funds, series, overrides=None):
+    # series x symbols weights (columns sum to 1); funds with no known series are left out.
+    # overrides: {symbol or benchmark name : series name | {series : weight}}
+    overrides = overrides or {}
+    series = list(series)
+    weights = {}
+    for symbol, record in funds.items():
+        name = record.benchmark.name if record.benchmark is not None else None
+        spec = overrides.get(symbol, overrides.get(name, name))
+        if isinstance(spec, str):
+            spec = {spec : 1.0}
+        if not spec or any(s not in series for s in spec):
+            continue
+        total = sum(spec.values())
+        if total > 0:
+            weights[symbol] = {s : w / total for s, w in spec.items()}
+    return pd.DataFrame(weights, index=series, dtype=float).fillna(0.0)
+
+def benchmark_returns(levels, weights, dates):
+    # Daily benchmark returns on the given (fund NAV) dates, dates x symbols.
+    # A composite has no return on a day any of its series has none.
+    on_dates = levels.reindex(levels.index.union(dates)).ffill().reindex(dates)
+    values = on_dates[weights.index].pct_change().to_numpy()
+    valid = ~np.isnan(values)
+    w = weights.to_numpy()
+    composite = np.where(valid, values, 0.0) @ w
+    missing = (~valid).astype(float) @ (w > 0).astype(float)
+    composite[missing > 0] = np.nan
+    return pd.DataFrame(composite, index=dates, columns=weights.columns)
+
+# Metrics
+def _window_rows(index, window):
+    if isinstance(window, tuple):
+        first, last = window
+        mask = np.ones(len(index), dtype=bool)
+        if first is not None:
+            mask &= index >= first
+        if last is not None:
+            mask &= index <= last
+        return mask
+    # A window longer than the history gives no result rather than a shorter one
+    mask = np.zeros(len(index), dtype=bool)
+    if window <= len(index):
+        mask[len(index) - window:] = True
+    return mask
+
+def window_metrics(fund, bench, min_periods=MIN_PERIODS):
+    # fund / bench: days x funds arrays of the window -> {metric: array per fund}
+    valid = ~np.isnan(fund) & ~np.isnan(bench)
+    days = valid.sum(axis=0)
+    f = np.where(valid, fund, 0.0)
+    b = np.where(valid, bench, 0.0)
+    active = f - b
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fund_return = np.expm1(np.log1p(f).sum(axis=0)) * 100
+        bench_return = np.expm1(np.log1p(b).sum(axis=0)) * 100
+        mean = active.sum(axis=0) / days
+        var = (np.where(valid, active - mean, 0.0) ** 2).sum(axis=0) / (days - 1)
+        te = np.sqrt(var * TRADING_DAYS)
+        ir = np.where(te > 0, mean * TRADING_DAYS / te, np.nan)
+    result = {
+        "days" : days,
+        "fund_return" : fund_return,
+        "benchmark_return" : bench_return,
+        "excess_return" : fund_return - bench_return,
+        "tracking_error" : te * 100,
+        "information_ratio" : ir,
+    }
+    short = days < max(min_periods, 2)
+    for name in METRICS[1:]:
+        result[name] = np.where(short, np.nan, result[name])
+    return result
+
+def active_metrics(funds, bench, windows, min_periods=MIN_PERIODS):
+    # {window name: DataFrame symbols x METRICS} for funds that have a benchmark
+    symbols = [s for s in bench.columns if s in funds.columns]
+    dates = funds.index.intersection(bench.index)
+    fund = funds.loc[dates, symbols].to_numpy()
+    benchmark = bench.loc[dates, symbols].to_numpy()
+    results = {}
+    for name, window in windows.items():
+        rows = _window_rows(dates, window)
+        metrics = window_metrics(fund[rows], benchmark[rows], min_periods)
+        results[name] = pd.DataFrame(metrics, index=symbols, columns=list(METRICS))
+    return results
+
+def to_records(results, digits=4):
+    # {symbol: {window: {metric: value}}} with NaN -> None
+    records = {}
+    for name, frame in results.items():
+        for symbol, row in frame.iterrows():
+            values = {k : (None if isinstance(v, float) and math.isnan(v) else round(float(v), digits)) for k, v in row.items()}
+            values["days"] = int(row["days"])
+            records.setdefault(symbol, {})[name] = values
+    return dict(sorted(records.items()))
@@ -0,0 +1,226 @@
+# Single-file, zstd-compressed archive of the data/ corpus (data/corpus.secz)
+#
+# Layout (integers little endian):
+#   b"SECZ\x01\0\0\0"        magic, format version
+#   dictionary              zstd dictionary trained on the members (may be empty)
+#   member frames           one zstd frame per file, compressed with the dictionary,
+#                           in name order; each holds the file's exact bytes
+#   index frame             zstd frame of JSON {"members" : {name : [offset,
+#                           length, size]}, "symbols" : {symbol : name}, ...}
+#   trailer (40 bytes)      dictionary offset, length, index offset, length (4 x Q)
+#                           and b"SECZIDX1"
+# Records are a few kB of JSON with the same keys, so the shared dictionary does
+# what one big stream would do (the keys cost almost nothing) while every member
+# stays its own frame: one fund is a seek into the mmap and one small decompress,
+# without touching the rest of the file. records() walks the frames in file order
+# for bulk loads, so a full load is one sequential read.
+#
+# Needs the zstandard package (pip install zstandard).
+#
+# from corpus.Archive import CorpusArchive, build_archive
+# build_archive()                                  # data/ -> data/corpus.secz
+# with CorpusArchive() as archive:
+#     archive.record("ABAPAC-RMF")                 # dict, as data/rmf-funds/ABAPAC-RMF.json
+#     funds = archive.load_corpus()                # {symbol: FundRecord}
+
+from datetime import datetime, timezone
+from pathlib import Path
+import json
+import mmap
+import os
+import struct
+import threading
+
+import zstandard
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+DEFAULT_DATA_DIR = REPO_ROOT / "data"
+DEFAULT_ARCHIVE_PATH = DEFAULT_DATA_DIR / "corpus.secz"
+
+# Files of data/ that make up the corpus (crawl state, caches and stores stay out)
+DEFAULT_MEMBERS = (
+    "rmf-funds/*.json",
+    "pvd-funds/*.json",
+    "fund-mapping.json",
+    "incomplete-funds-report.json",
+    "reprocess-progress.json",
+    "progress.json",
+)
+
+MAGIC = b"SECZ\x01\x00\x00\x00"
+TRAILER = struct.Struct("<QQQQ8s")
+TRAILER_MAGIC = b"SECZIDX1"
+
+DEFAULT_LEVEL = 19
+DEFAULT_DICT_SIZE = 64 * 1024
+
+def _symbol(name, data):
+    # Fund records (rmf-funds/, pvd-funds/) are also found by symbol
+    if "/" not in name:
+        return None
+    try:
+        record = json.loads(data)
+    except ValueError:
+        return None
+    if isinstance(record, dict) and record.get("fund_id"):
+        return record.get("symbol") or Path(name).stem
+    return None
+
+def collect(DataDir=DEFAULT_DATA_DIR, members=DEFAULT_MEMBERS):
+    # {relative name: bytes} of the files matching members
+    DataDir = Path(DataDir)
+    files = {}
+    for pattern in members:
+        for path in sorted(DataDir.glob(pattern)):
+            if path.is_file():
+                files[path.relative_to(DataDir).as_posix()] = path.read_bytes()
+    return dict(sorted(files.items()))
+
+def train(payloads, DictSize=DEFAULT_DICT_SIZE, level=DEFAULT_LEVEL):
+    # Dictionary bytes, or b"" when there is too little to train on
+    samples = [p for p in payloads if p]
+    if len(samples) < 8:
+        return b""
+    try:
+        return zstandard.train_dictionary(DictSize, samples, level=level).as_bytes()
+    except zstandard.ZstdError as e:
+        print("Archive without a dictionary: {}".format(e))
+        return b""
+
+def build_archive(DataDir=DEFAULT_DATA_DIR, ArchivePath=DEFAULT_ARCHIVE_PATH, members=DEFAULT_MEMBERS,
+                  level=DEFAULT_LEVEL, DictSize=DEFAULT_DICT_SIZE):
+    files = collect(DataDir, members)
+    dictionary = train(files.values(), DictSize, level)
+    compressor = zstandard.ZstdCompressor(
+        level=level, dict_data=zstandard.ZstdCompressionDict(dictionary) if dictionary else None,
+        write_content_size=True, write_checksum=True,
+    )
+
+    ArchivePath = Path(ArchivePath)
+    ArchivePath.parent.mkdir(parents=True, exist_ok=True)
+    tmp = ArchivePath.with_suffix(ArchivePath.suffix + ".tmp")
+    index = {"members" : {}, "symbols" : {}}
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        dict_offset = f.tell()
+        f.write(dictionary)
+        for name, data in files.items():
+            frame = compressor.compress(data)
+            index["members"][name] = [f.tell(), len(frame), len(data)]
+            f.write(frame)
+            symbol = _symbol(name, data)
+            if symbol is not None:
+                index["symbols"].setdefault(symbol, name)
+        index.update({
+            "created_at" : datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "level" : level,
+            "dictionary" : len(dictionary),
+        })
+        index_offset = f.tell()
+        frame = zstandard.ZstdCompressor(level=level).compress(json.dumps(index, ensure_ascii=False).encode("utf-8"))
+        f.write(frame)
+        f.write(TRAILER.pack(dict_offset, len(dictionary), index_offset, len(frame), TRAILER_MAGIC))
+    os.replace(tmp, ArchivePath)
+    return {
+        "archive" : str(ArchivePath),
+        "members" : len(files),
+        "symbols" : len(index["symbols"]),
+        "size" : sum(len(d) for d in files.values()),
+        "compressed" : ArchivePath.stat().st_size,
+        "dictionary" : len(dictionary),
+    }
+
+class CorpusArchive:
+
+    def __init__(self, ArchivePath=DEFAULT_ARCHIVE_PATH):
+        self.path = Path(ArchivePath)
+        self._file = open(self.path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._map[:len(MAGIC)] != MAGIC or len(self._map) < len(MAGIC) + TRAILER.size:
+                raise ValueError("Not a corpus archive: {}".format(self.path))
+            dict_offset, dict_len, index_offset, index_len, magic = TRAILER.unpack(self._map[-TRAILER.size:])
+            if magic != TRAILER_MAGIC:
+                raise ValueError("Corpus archive without an index (truncated?): {}".format(self.path))
+        except Exception:
+            self._file.close()
+            raise
+        dictionary = self._map[dict_offset:dict_offset + dict_len]
+        self._dictionary = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        index = json.loads(zstandard.ZstdDecompressor().decompress(self._map[index_offset:index_offset + index_len]))
+        self.members = {name : tuple(entry) for name, entry in index.pop("members").items()}
+        self.symbols = index.pop("symbols")
+        self.info = index
+        # Decompression contexts are not thread safe: one per thread
+        self._local = threading.local()
+
+    def _decompressor(self):
+        found = getattr(self._local, "decompressor", None)
+        if found is None:
+            found = self._local.decompressor = zstandard.ZstdDecompressor(dict_data=self._dictionary)
+        return found
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, name):
+        return name in self.members or name in self.symbols
+
+    def names(self):
+        return list(self.members)
+
+    # Random access
+    def read(self, name):
+        # Bytes of one member, by name ("rmf-funds/ABAPAC-RMF.json") or symbol
+        name = self.symbols.get(name, name)
+        offset, length, size = self.members[name]
+        return self._decompressor().decompress(self._map[offset:offset + length], max_output_size=size)
+
+    def record(self, name):
+        return json.loads(self.read(name))
+
+    # Bulk
+    def iter_bytes(self, prefix=""):
+        # (name, bytes) of every member under prefix, in file order
+        decompressor = self._decompressor()
+        for name, (offset, length, size) in sorted(self.members.items(), key=lambda kv: kv[1][0]):
+            if name.startswith(prefix):
+                yield name, decompressor.decompress(self._map[offset:offset + length], max_output_size=size)
+
+    def records(self, prefix="rmf-funds/"):
+        # (name, dict) of the fund records under prefix
+        for name, data in self.iter_bytes(prefix):
+            yield name, json.loads(data)
+
+    def load_corpus(self, prefix="rmf-funds/", DecodeText=False):
+        # As corpus.FundModel.load_corpus, from the archive: {symbol: FundRecord}
+        from corpus.FundModel import FundRecord
+
+        funds = {}
+        for name, data in self.records(prefix):
+            record = FundRecord.from_dict(data, DecodeText=DecodeText)
+            funds[record.symbol or Path(name).stem] = record
+        return funds
+
+    def extract(self, DataDir, prefix=""):
+        # Write the members back as loose files under DataDir, byte for byte
+        DataDir = Path(DataDir)
+        count = 0
+        for name, data in self.iter_bytes(prefix):
+            path = DataDir / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(path.suffix + ".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            count += 1
+        return count
@@ -0,0 +1,176 @@
+# Local stores for bond/outstanding data
+#
+# OutstandingStore  outstanding value history, one row per (issued_ref_id, date),
+#                   kept as columns (numpy arrays: ids, date ordinals, one float
+#                   column per numeric response field) in data/bond-outstanding.npz.
+#                   Backfills only ask for the (issue, date) pairs it does not have.
+# StaticCache       per-issue answers that do not change once an issue exists
+#                   (coupon, issue_rating, redemption, and the issue lookup by
+#                   security code) in data/bond-static.json. No expiry: an entry is
+#                   only ever fetched once. Failed calls (None) are not cached.
+# Both files are local caches and default to data/ of this folder, which git ignores.
+#
+# from corpus.BondStore import OutstandingStore
+# store = OutstandingStore.load()
+# store.frame("B00001234")        # DataFrame indexed by date
+
+from datetime import date
+from pathlib import Path
+import json
+import math
+import os
+import threading
+
+import numpy as np
+
+TOOL_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_OUTSTANDING_PATH = TOOL_DIR / "data" / "bond-outstanding.npz"
+DEFAULT_STATIC_PATH = TOOL_DIR / "data" / "bond-static.json"
+
+# Response fields that identify a row rather than measure anything
+KEY_FIELDS = ("issued_ref_id", "outstanding_date", "last_upd_date")
+
+def to_float(value):
+    try:
+        number = float(str(value).replace(",", ""))
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+class OutstandingStore:
+
+    def __init__(self):
+        self.ids = np.empty(0, dtype=str)
+        self.dates = np.empty(0, dtype=np.int64)
+        # field -> float64 column (NaN = not in the response)
+        self.values = {}
+        # Rows appended since the last compaction: [(id, ordinal, {field: value})]
+        self._pending = []
+        self._keys = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path=DEFAULT_OUTSTANDING_PATH):
+        store = cls()
+        if Path(path).is_file():
+            with np.load(path, allow_pickle=False) as data:
+                store.ids = data["ids"]
+                store.dates = data["dates"]
+                store.values = {name[len("value_"):] : data[name] for name in data.files if name.startswith("value_")}
+        return store
+
+    def save(self, path=DEFAULT_OUTSTANDING_PATH):
+        self.compact()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez_compressed(tmp, ids=self.ids, dates=self.dates, **{"value_" + k : v for k, v in self.values.items()})
+        os.replace(tmp, path)
+
+    def _key_set(self):
+        if self._keys is None:
+            self._keys = set(zip(self.ids.tolist(), self.dates.tolist()))
+        return self._keys
+
+    def has(self, issued_ref_id, day):
+        with self._lock:
+            return (issued_ref_id, day.toordinal()) in self._key_set()
+
+    def add(self, issued_ref_id, day, rows):
+        # Outstanding value response of one issue on one date (numeric fields of the
+        # first row that has them); an empty answer is stored as a row of NaN so the
+        # date is not asked for again
+        values = {}
+        for row in rows or []:
+            for field, value in row.items():
+                number = to_float(value) if field not in KEY_FIELDS else None
+                if number is not None:
+                    values.setdefault(field, number)
+        with self._lock:
+            key = (issued_ref_id, day.toordinal())
+            self._key_set().add(key)
+            self._pending.append((key[0], key[1], values))
+
+    def compact(self):
+        # Merge pending rows into the columns, sorted by (id, date); a later row for
+        # the same key replaces the earlier one
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            fields = sorted(set(self.values) | {f for _, _, v in pending for f in v})
+            size = len(self.ids)
+            ids = np.concatenate([self.ids, np.array([p[0] for p in pending], dtype=str)])
+            dates = np.concatenate([self.dates, np.array([p[1] for p in pending], dtype=np.int64)])
+            columns = {}
+            for field in fields:
+                old = self.values.get(field, np.full(size, np.nan))
+                new = np.array([p[2].get(field, np.nan) for p in pending], dtype=float)
+                columns[field] = np.concatenate([old, new])
+            # Last occurrence of each key wins
+            order = np.lexsort((np.arange(len(ids)), dates, ids))
+            ids, dates = ids[order], dates[order]
+            last = np.ones(len(ids), dtype=bool)
+            last[:-1] = (ids[1:] != ids[:-1]) | (dates[1:] != dates[:-1])
+            self.ids, self.dates = ids[last], dates[last]
+            self.values = {field : column[order][last] for field, column in columns.items()}
+
+    def frame(self, issued_ref_id=None):
+        # pandas DataFrame (issued_ref_id, date, fields...), one issue or all
+        import pandas as pd
+
+        self.compact()
+        mask = slice(None) if issued_ref_id is None else self.ids == issued_ref_id
+        frame = pd.DataFrame({"issued_ref_id" : self.ids[mask], "date" : [date.fromordinal(d) for d in self.dates[mask]]})
+        for field, column in self.values.items():
+            frame[field] = column[mask]
+        return frame if issued_ref_id is None else frame.drop(columns="issued_ref_id").set_index("date")
+
+    def issues(self):
+        self.compact()
+        return sorted(set(self.ids.tolist()))
+
+    def __len__(self):
+        return len(self.ids) + len(self._pending)
+
+class StaticCache:
+
+    def __init__(self, path=DEFAULT_STATIC_PATH):
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._dirty = False
+        # endpoint -> {key: response}
+        self.entries = {}
+        if self.path is not None and self.path.is_file():
+            self.entries = json.loads(self.path.read_text(encoding="utf-8")).get("entries") or {}
+
+    def get(self, endpoint, key):
+        return self.entries.get(endpoint, {}).get(key)
+
+    def has(self, endpoint, key):
+        return key in self.entries.get(endpoint, {})
+
+    def put(self, endpoint, key, response):
+        if response is None:
+            return
+        with self._lock:
+            self.entries.setdefault(endpoint, {})[key] = response
+            self._dirty = True
+
+    def fetch(self, endpoint, key, function, *args):
+        # Cached response, else call function(*args) once and keep the answer
+        if self.has(endpoint, key):
+            return self.get(endpoint, key), False
+        response = function(*args)
+        self.put(endpoint, key, response)
+        return response, True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty or self.path is None:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"entries" : self.entries}, indent=2, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.path)
+            self._dirty = False
@@ -0,0 +1,153 @@
+# Per-section completeness of the fund corpus and the calls that would fill it
+#
+# The records are flattened into one pandas frame (pd.json_normalize: nested dicts
+# become dotted columns, "benchmark.returns.1y", lists stay as cells), then every
+# question is a matrix product instead of a loop over funds:
+#   filled    funds x leaf columns   value is there (not null / empty list / "")
+#   present   funds x sections       filled @ leaves-of-section > 0
+#   refetch   fund_ids x endpoints   ~present @ SECTION_ENDPOINTS > 0, or-ed over
+#                                    the share classes of one fund_id
+# A section is missing when none of its leaves is filled, so {"ytd" : null, ...}
+# counts as missing just like null.
+#
+# SECTION_ENDPOINTS follows fetchCompleteFundData
+# (scripts/data-extraction/rmf/fetch-complete-fund-data.ts): the function/ client
+# functions (function/Endpoints.py names) each record section is built from. A
+# section filled from two endpoints (risk_metrics) asks for both; an endpoint
+# behind two sections (dailynav) is asked for once per fund.
+#
+# from corpus.Completeness import load_frame, present, refetch_list
+# frame = load_frame()                      # data/rmf-funds/*.json
+# present(frame).sum()                      # funds with each section
+# refetch_list(frame)                       # [{"fund_id", "endpoint", "symbols", "sections"}, ...]
+
+from pathlib import Path
+import json
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+DEFAULT_CORPUS_DIR = REPO_ROOT / "data" / "rmf-funds"
+
+SECTION_ENDPOINTS = {
+    "metadata" : ("fund_factsheet_policy",),
+    "latest_nav" : ("fund_dailyinfo_dailynav",),
+    "nav_history_30d" : ("fund_dailyinfo_dailynav",),
+    # An empty list is the answer for a fund that pays no dividend: reported, not refetched
+    "dividends" : (),
+    "performance" : ("fund_factsheet_performance",),
+    "benchmark" : ("fund_factsheet_benchmark",),
+    "risk_metrics" : ("fund_factsheet_5YearLost", "fund_factsheet_FundTrackingError"),
+    "asset_allocation" : ("fund_factsheet_asset",),
+    "category" : ("fund_factsheet_fund_compare",),
+    "fees" : ("fund_factsheet_fee",),
+    "involved_parties" : ("fund_factsheet_InvolveParty",),
+    "top_holdings" : ("fund_factsheet_FundTop5",),
+    "risk_factors" : ("fund_factsheet_risk",),
+    "suitability" : ("fund_factsheet_suitability",),
+    "document_urls" : ("fund_factsheet_urls",),
+    "investment_minimums" : ("fund_factsheet_investment",),
+}
+
+SECTIONS = tuple(SECTION_ENDPOINTS)
+ENDPOINTS = tuple(sorted({e for endpoints in SECTION_ENDPOINTS.values() for e in endpoints}))
+
+def load_frame(CorpusDir=DEFAULT_CORPUS_DIR):
+    # One row per record file, indexed by symbol, with its file_path
+    records, paths = [], []
+    for path in sorted(Path(CorpusDir).glob("*.json")):
+        try:
+            record = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print("Could not read [{}]: {}".format(path.name, e))
+            continue
+        if record.get("fund_id"):
+            records.append(record)
+            paths.append(str(path))
+    return frame(records, paths)
+
+def frame(records, paths=None):
+    import pandas as pd
+
+    flat = pd.json_normalize(records, sep=".") if records else pd.DataFrame(columns=["fund_id", "symbol"])
+    flat["file_path"] = paths if paths is not None else None
+    flat.index = flat["symbol"].fillna(flat["fund_id"]).rename("symbol")
+    return flat
+
+def _leaves(flat, section):
+    return [c for c in flat.columns if c == section or c.startswith(section + ".")]
+
+def filled(flat, columns):
+    # funds x columns bool: not null, and for object cells not an empty list / dict / string
+    values = flat[columns]
+    result = values.notna().to_numpy()
+    for i, column in enumerate(columns):
+        if values[column].dtype == object:
+            # numpy truth value per cell: [] / {} / "" are False (None is already out)
+            cells = values[column].to_numpy()
+            result[:, i] &= np.where(result[:, i], cells, False).astype(bool)
+    return result
+
+def present(flat, sections=SECTIONS):
+    # funds x sections bool DataFrame, True where the section holds any value
+    import pandas as pd
+
+    leaves = [_leaves(flat, s) for s in sections]
+    columns = [c for group in leaves for c in group]
+    incidence = np.zeros((len(columns), len(sections)), dtype=np.int32)
+    row = 0
+    for j, group in enumerate(leaves):
+        incidence[row:row + len(group), j] = 1
+        row += len(group)
+    counts = filled(flat, columns).astype(np.int32) @ incidence
+    return pd.DataFrame(counts > 0, index=flat.index, columns=list(sections))
+
+def endpoint_matrix(sections=SECTIONS, endpoints=ENDPOINTS):
+    # sections x endpoints 0/1: calls each section is built from
+    matrix = np.zeros((len(sections), len(endpoints)), dtype=np.int32)
+    position = {e : i for i, e in enumerate(endpoints)}
+    for j, section in enumerate(sections):
+        for name in SECTION_ENDPOINTS[section]:
+            matrix[j, position[name]] = 1
+    return matrix
+
+def refetch_matrix(flat, presence=None, by="fund_id"):
+    # fund_ids (or symbols, by=None) x endpoints bool DataFrame: calls needed to
+    # fill every missing section
+    import pandas as pd
+
+    presence = present(flat) if presence is None else presence
+    needed = (~presence.to_numpy()).astype(np.int32) @ endpoint_matrix(list(presence.columns)) > 0
+    by_symbol = pd.DataFrame(needed, index=flat.index, columns=list(ENDPOINTS))
+    if by is None:
+        return by_symbol
+    # Share classes of one fund_id are one set of calls
+    return by_symbol.groupby(flat[by].to_numpy()).any()
+
+def refetch_list(flat, presence=None):
+    # Exactly one entry per (fund_id, endpoint) to call, with the symbols and
+    # sections it fills, ordered by fund_id then endpoint
+    presence = present(flat) if presence is None else presence
+    sections = list(presence.columns)
+    fund_ids = flat["fund_id"].to_numpy()
+    by_symbol = refetch_matrix(flat, presence, by=None).to_numpy()
+    needed = refetch_matrix(flat, presence)
+    missing = (~presence).groupby(fund_ids).any().loc[needed.index].to_numpy()
+    fills = endpoint_matrix(sections).astype(bool)
+
+    rows_of = {}
+    for row, fund_id in enumerate(fund_ids):
+        rows_of.setdefault(fund_id, []).append(row)
+    symbols = flat.index.to_numpy()
+
+    queue = []
+    for row, col in zip(*np.nonzero(needed.to_numpy())):
+        fund_id = needed.index[row]
+        classes = rows_of[fund_id]
+        queue.append({
+            "fund_id" : fund_id,
+            "endpoint" : needed.columns[col],
+            "symbols" : sorted(symbols[classes][by_symbol[classes, col]].tolist()),
+            "sections" : [sections[j] for j in np.nonzero(missing[row] & fills[:, col])[0]],
+        })
+    return queue
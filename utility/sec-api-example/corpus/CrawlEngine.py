@@ -0,0 +1,204 @@
+# Concurrent, cached, resumable crawl of per-fund endpoints
+#
+# The crawlers here all make the same kind of run: a list of keys (funds), a few
+# calls per key, one output per key. CrawlEngine does the common part:
+#   * run(keys, work) calls work(key) on --workers threads; every call a worker
+#     makes through engine.call() is paced to the client's rate budget (RateLimiter
+#     allows 3000 calls per 300 s per process and raises beyond that), times the
+#     number of subscription keys of the product when it has several
+#     (function/KeyPool.py)
+#   * engine.call() answers are kept in {StateDir}/{name}-cache.sqlite for TtlDays,
+#     so a run that was interrupted half way through a fund repeats no call; one
+#     row per answer, inserted as it arrives (expired rows are dropped on open)
+#   * keys whose work returned truthy are recorded in {StateDir}/{name}-progress.json
+#     (completed / failed, as data/progress.json of the TypeScript crawler) and are
+#     skipped until they are TtlDays old; the progress file is written atomically
+#     and the cache committed every `checkpoint` keys
+# StateDir defaults to data/crawl of this folder, which git ignores: crawl state is
+# not corpus data.
+#
+# from corpus.CrawlEngine import CrawlEngine
+# engine = CrawlEngine("pvd", Workers=8)
+# engine.run(proj_ids, lambda proj_id: write(fetch(engine, proj_id)))
+# engine.save()
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from ratelimit import RateLimitException
+
+from function.Profiling import phase
+
+TOOL_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_STATE_DIR = TOOL_DIR / "data" / "crawl"
+
+# The client's budget (function/AllFunction.py RateLimiter)
+CALL_BUDGET = (3000, 300)
+
+class Pacer:
+    # Spaces calls evenly so all threads together stay under calls / period
+
+    def __init__(self, calls, period):
+        self.interval = period / calls
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self, endpoint=None):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            with phase("rate_wait", endpoint):
+                time.sleep(start - now)
+
+def _now():
+    return datetime.now(timezone.utc)
+
+def _write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+def _read_json(path, default):
+    if not path.is_file():
+        return default
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except ValueError as e:
+        print("Ignoring unreadable crawl state [{}]: {}".format(path, e))
+        return default
+
+class CrawlEngine:
+
+    def __init__(self, name, StateDir=DEFAULT_STATE_DIR, Workers=4, Rate=None, TtlDays=7, counter=None):
+        self.name = name
+        self.StateDir = Path(StateDir)
+        self.Workers = Workers
+        self.Ttl = timedelta(days=TtlDays)
+        # One pacer for all calls when Rate is given, else one per product with a
+        # KeyPool of several keys and one shared by the single-key products
+        self.pacer = Pacer(Rate, 1.0) if Rate else None
+        self._pacers = {}
+        self.counter = counter
+        self.calls = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+
+        self.ProgressPath = self.StateDir / "{}-progress.json".format(name)
+        self.CachePath = self.StateDir / "{}-cache.sqlite".format(name)
+        self.progress = _read_json(self.ProgressPath, {})
+        self.progress.setdefault("started_at", _now().isoformat())
+        self.progress.setdefault("completed", {})
+        self.progress.setdefault("failed", {})
+        # "function|args" -> fetched_at, response as JSON text
+        self.StateDir.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.CachePath), check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS calls (key TEXT PRIMARY KEY, fetched_at TEXT, response TEXT)")
+        self._db.execute("DELETE FROM calls WHERE fetched_at < ?", ((_now() - self.Ttl).isoformat(),))
+        self._db.commit()
+
+    def _fresh(self, stamp):
+        return stamp is not None and _now() - datetime.fromisoformat(stamp) < self.Ttl
+
+    # Calls
+    def pacer_for(self, function):
+        # Single-key products all go through RateLimiter's one per-process budget,
+        # so they share a pacer (as they share a Scheduler in function/Client.py)
+        if self.pacer is not None:
+            return self.pacer
+        module = function.__module__.rpartition(".")[2]
+        with self._lock:
+            pacer = self._pacers.get(module)
+        if pacer is None:
+            from function.Client import Client
+            from function.Endpoints import PRODUCTS
+
+            pool = Client.default().keys(module) if module in PRODUCTS else None
+            with self._lock:
+                if pool is not None and len(pool) > 1:
+                    pacer = Pacer(pool.limit / pool.period * 0.9 * len(pool), 1.0)
+                else:
+                    pacer = self._pacers.setdefault(None, Pacer(CALL_BUDGET[0] / CALL_BUDGET[1] * 0.9, 1.0))
+                pacer = self._pacers.setdefault(module, pacer)
+        return pacer
+
+    def call(self, function, *args):
+        # Cached answer if fresh, else one paced call (None answers are not cached)
+        key = "|".join([function.__name__] + [str(a) for a in args])
+        with self._lock:
+            entry = self._db.execute("SELECT fetched_at, response FROM calls WHERE key = ?", (key,)).fetchone()
+        if entry is not None and self._fresh(entry[0]):
+            with self._lock:
+                self.hits += 1
+            return json.loads(entry[1])
+        while True:
+            self.pacer_for(function).wait(function.__name__)
+            try:
+                response = self.counter(function, *args) if self.counter else function(*args)
+                break
+            except RateLimitException as e:
+                # Another caller in this process used the budget; wait it out
+                with phase("rate_backoff", function.__name__):
+                    time.sleep(e.period_remaining)
+        with self._lock:
+            self.calls += 1
+            if response is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO calls VALUES (?, ?, ?)",
+                    (key, _now().isoformat(), json.dumps(response, ensure_ascii=False)),
+                )
+        return response
+
+    def map(self, function, items):
+        # function(item) for every item on the worker threads, results in order
+        with ThreadPoolExecutor(max_workers=self.Workers) as pool:
+            return list(pool.map(function, items))
+
+    # Keys
+    def pending(self, keys, retry_failed=True):
+        # Keys not completed within the TTL (and, unless retry_failed, not failed)
+        completed, failed = self.progress["completed"], self.progress["failed"]
+        return [
+            key for key in keys
+            if not self._fresh(completed.get(key)) and (retry_failed or key not in failed)
+        ]
+
+    def run(self, keys, work, retry_failed=True, checkpoint=20):
+        # work(key) -> truthy when the key is done; exceptions mark it failed
+        todo = self.pending(keys, retry_failed)
+
+        def task(key):
+            try:
+                ok, error = bool(work(key)), "no data"
+            except Exception as e:
+                ok, error = False, "{}: {}".format(type(e).__name__, e)
+            with self._lock:
+                if ok:
+                    self.progress["completed"][key] = _now().isoformat()
+                    self.progress["failed"].pop(key, None)
+                else:
+                    self.progress["failed"][key] = {"error" : error, "timestamp" : _now().isoformat()}
+            return ok
+
+        done = failed = 0
+        with ThreadPoolExecutor(max_workers=self.Workers) as pool:
+            for count, ok in enumerate(pool.map(task, todo), 1):
+                done, failed = done + ok, failed + (not ok)
+                if count % checkpoint == 0:
+                    self.save()
+        self.save()
+        return {"keys" : len(keys), "pending" : len(todo), "done" : done, "failed" : failed, "skipped" : len(keys) - len(todo)}
+
+    def save(self):
+        with self._lock:
+            self.progress["last_updated"] = _now().isoformat()
+            _write_json(self.ProgressPath, self.progress)
+            self._db.commit()
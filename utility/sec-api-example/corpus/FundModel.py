@@ -0,0 +1,430 @@
+# Compact in-memory model of one RMF fund record (data/rmf-funds/*.json)
+#
+# The JSON form is a tree of dicts: every fund carries ~30 NAV history dicts with
+# six keys each, plus fees, asset allocation, performance, benchmark returns, ...
+# FundRecord keeps the same information with much less per-object overhead:
+#   * scalar sections are __slots__ dataclasses (no per-instance __dict__)
+#   * nav_history_30d is column arrays (array('l') date ordinals, array('d') values)
+#   * values repeated across funds (AMC names, fee descriptions, asset classes,
+#     roles, classification codes, ...) are interned so all funds share one copy
+#
+# FundRecord.from_dict(record).to_dict() gives back the JSON layout; NAV history
+# numbers come back as float (0 -> 0.0) and keys the model does not know about are
+# kept in FundRecord.extra.
+#
+# Some text fields arrive base64-encoded (suitability.risk_level holds base64 of a
+# Thai sentence). They stay encoded in memory and are decoded on first attribute
+# access, once per record. Pass DecodeText=True to decode them at load instead, and
+# to_dict(DecodeText=True) to write them out as plain UTF-8.
+#
+# from corpus.FundModel import load_corpus
+# funds = load_corpus()              # {symbol: FundRecord}
+# funds["ABAPAC-RMF"].nav_history.last_val[-1]
+# funds["ABAPAC-RMF"].suitability.risk_level       # decoded Thai text
+
+from array import array
+from dataclasses import dataclass, fields
+from datetime import date
+from pathlib import Path
+import base64
+import binascii
+import json
+import math
+import re
+import sys
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+DEFAULT_CORPUS_DIR = REPO_ROOT / "data" / "rmf-funds"
+
+# Fields whose values the API delivers as base64-encoded UTF-8
+ENCODED_FIELDS = {
+    "suitability" : ("risk_level",),
+}
+
+# ENCODED_FIELDS, _BASE64 and decode_text are copied in the MCP server example
+# (docs/openai-apps-sdk-examples/examples/fund_store.py), which does not import from this
+# tool; change both together.
+_BASE64 = re.compile(r"[A-Za-z0-9+/]+={0,2}")
+
+def decode_text(value):
+    # base64 UTF-8 -> str; anything that is not (already plain, None, ...) is returned as is
+    if not isinstance(value, str) or len(value) % 4 or not _BASE64.fullmatch(value):
+        return value
+    try:
+        text = base64.b64decode(value, validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError):
+        return value
+    # Short plain words can happen to be valid base64 ("High"); their "decoding" is binary junk
+    return text if text.replace("\n", "").replace("\r", "").replace("\t", "").isprintable() else value
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+def _tuple_or_none(items, cls):
+    if items is None:
+        return None
+    return tuple(cls.from_dict(item) for item in items)
+
+def _list_or_none(items):
+    if items is None:
+        return None
+    return [item.to_dict() for item in items]
+
+# Scalar sections
+#
+# KEYS maps attribute name -> JSON key where they differ ("3m" is not an identifier).
+# INTERN lists the attributes whose values repeat across funds.
+class Section:
+    __slots__ = ()
+    KEYS = {}
+    INTERN = ()
+
+    @classmethod
+    def from_dict(cls, data):
+        if data is None:
+            return None
+        values = {}
+        for field in fields(cls):
+            value = data.get(cls.KEYS.get(field.name, field.name))
+            values[field.name] = _intern(value) if field.name in cls.INTERN else value
+        return cls(**values)
+
+    def to_dict(self):
+        return {self.KEYS.get(field.name, field.name) : getattr(self, field.name) for field in fields(self)}
+
+@dataclass(slots=True)
+class Metadata(Section):
+    fund_classification: str = None
+    management_style: str = None
+    dividend_policy: str = None
+    risk_level: int = None
+    fund_type: str = None
+
+    INTERN = ("fund_classification", "management_style", "dividend_policy", "fund_type")
+
+@dataclass(slots=True)
+class LatestNav(Section):
+    nav_date: str = None
+    last_val: float = None
+    previous_val: float = None
+    net_asset: float = None
+    buy_price: float = None
+    sell_price: float = None
+    change: float = None
+    change_percent: float = None
+    last_upd_date: str = None
+
+    # Most funds share the same few NAV dates
+    INTERN = ("nav_date",)
+
+@dataclass(slots=True)
+class Returns(Section):
+    ytd: float = None
+    m3: float = None
+    m6: float = None
+    y1: float = None
+    y3: float = None
+    y5: float = None
+    y10: float = None
+
+    KEYS = {"m3" : "3m", "m6" : "6m", "y1" : "1y", "y3" : "3y", "y5" : "5y", "y10" : "10y"}
+
+@dataclass(slots=True)
+class Performance(Section):
+    ytd: float = None
+    m3: float = None
+    m6: float = None
+    y1: float = None
+    y3: float = None
+    y5: float = None
+    y10: float = None
+    since_inception: float = None
+
+    KEYS = Returns.KEYS
+
+@dataclass(slots=True)
+class Benchmark:
+    name: str = None
+    returns: Returns = None
+
+    @classmethod
+    def from_dict(cls, data):
+        if data is None:
+            return None
+        return cls(name=_intern(data.get("name")), returns=Returns.from_dict(data.get("returns")))
+
+    def to_dict(self):
+        return {"name" : self.name, "returns" : None if self.returns is None else self.returns.to_dict()}
+
+@dataclass(slots=True)
+class Fee(Section):
+    fee_type: str = None
+    fee_desc: str = None
+    fee_value: str = None
+    fee_remark: str = None
+
+    INTERN = ("fee_type", "fee_desc", "fee_remark")
+
+@dataclass(slots=True)
+class AssetAllocation(Section):
+    asset_class: str = None
+    percentage: float = None
+
+    INTERN = ("asset_class",)
+
+@dataclass(slots=True)
+class InvolvedParty(Section):
+    party_role: str = None
+    party_name: str = None
+
+    INTERN = ("party_role", "party_name")
+
+@dataclass(slots=True)
+class RiskFactor(Section):
+    risk_type: str = None
+    risk_desc: str = None
+
+    INTERN = ("risk_type", "risk_desc")
+
+# Encoded text is kept as delivered; the decoded string is cached on the record the
+# first time the attribute is read.
+_UNDECODED = object()
+
+def _lazy_text(name):
+    raw, text = "_" + name, "_" + name + "_text"
+
+    def get(self):
+        value = getattr(self, text)
+        if value is _UNDECODED:
+            value = decode_text(getattr(self, raw))
+            setattr(self, text, value)
+        return value
+
+    def set(self, value):
+        setattr(self, raw, value)
+        setattr(self, text, _UNDECODED)
+
+    return property(get, set)
+
+class Suitability:
+    __slots__ = ("investment_horizon", "target_investor", "_risk_level", "_risk_level_text")
+
+    KEYS = ("investment_horizon", "risk_level", "target_investor")
+
+    risk_level = _lazy_text("risk_level")
+
+    def __init__(self, investment_horizon=None, risk_level=None, target_investor=None):
+        self.investment_horizon = investment_horizon
+        self.risk_level = risk_level
+        self.target_investor = target_investor
+
+    @classmethod
+    def from_dict(cls, data, DecodeText=False):
+        if data is None:
+            return None
+        section = cls(data.get("investment_horizon"), data.get("risk_level"), data.get("target_investor"))
+        if DecodeText:
+            section.normalize_text()
+        return section
+
+    def raw(self, name):
+        # Value as stored, without decoding
+        return getattr(self, "_" + name) if name in ENCODED_FIELDS["suitability"] else getattr(self, name)
+
+    def normalize_text(self):
+        # Replace the encoded values with their decoded text
+        for name in ENCODED_FIELDS["suitability"]:
+            setattr(self, name, getattr(self, name))
+
+    def to_dict(self, DecodeText=False):
+        get = getattr if DecodeText else Suitability.raw
+        return {key : get(self, key) for key in self.KEYS}
+
+    def __eq__(self, other):
+        if not isinstance(other, Suitability):
+            return NotImplemented
+        return self.to_dict(DecodeText=True) == other.to_dict(DecodeText=True)
+
+    def __repr__(self):
+        return "Suitability(investment_horizon={!r}, risk_level={!r}, target_investor={!r})".format(
+            self.investment_horizon, self.raw("risk_level"), self.target_investor,
+        )
+
+@dataclass(slots=True)
+class DocumentUrls(Section):
+    factsheet_url: str = None
+    annual_report_url: str = None
+    halfyear_report_url: str = None
+
+    # "-" placeholders
+    INTERN = ("annual_report_url", "halfyear_report_url")
+
+@dataclass(slots=True)
+class InvestmentMinimums(Section):
+    minimum_initial: str = None
+    minimum_additional: str = None
+    minimum_redemption: str = None
+    minimum_balance: str = None
+
+    INTERN = ("minimum_initial", "minimum_additional", "minimum_redemption", "minimum_balance")
+
+# NAV history as columns
+#
+# One array per field instead of one dict per day. Missing numbers are stored as
+# NaN and come back as None.
+class NavHistory:
+    __slots__ = ("dates", "last_val", "previous_val", "net_asset", "buy_price", "sell_price")
+
+    VALUE_FIELDS = ("last_val", "previous_val", "net_asset", "buy_price", "sell_price")
+
+    def __init__(self):
+        self.dates = array("l")
+        for name in self.VALUE_FIELDS:
+            setattr(self, name, array("d"))
+
+    @classmethod
+    def from_list(cls, rows):
+        if rows is None:
+            return None
+        history = cls()
+        for row in rows:
+            history.append(row)
+        return history
+
+    def append(self, row):
+        self.dates.append(date.fromisoformat(row["nav_date"]).toordinal())
+        for name in self.VALUE_FIELDS:
+            value = row.get(name)
+            getattr(self, name).append(math.nan if value is None else value)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __getitem__(self, index):
+        row = {"nav_date" : date.fromordinal(self.dates[index]).isoformat()}
+        for name in self.VALUE_FIELDS:
+            value = getattr(self, name)[index]
+            row[name] = None if math.isnan(value) else value
+        return row
+
+    def __iter__(self):
+        for index in range(len(self.dates)):
+            yield self[index]
+
+    def date_at(self, index):
+        return date.fromordinal(self.dates[index])
+
+    def to_list(self):
+        return list(self)
+
+# Fund record
+SECTIONS = {
+    "metadata" : Metadata,
+    "latest_nav" : LatestNav,
+    "performance" : Performance,
+    "benchmark" : Benchmark,
+    "suitability" : Suitability,
+    "document_urls" : DocumentUrls,
+    "investment_minimums" : InvestmentMinimums,
+}
+
+LIST_SECTIONS = {
+    "fees" : Fee,
+    "asset_allocation" : AssetAllocation,
+    "involved_parties" : InvolvedParty,
+    "risk_factors" : RiskFactor,
+}
+
+# Sections that are still free-form (empty or null in the current corpus)
+RAW_SECTIONS = ("dividends", "risk_metrics", "category", "top_holdings")
+
+@dataclass(slots=True)
+class FundRecord:
+    fund_id: str = None
+    symbol: str = None
+    fund_name: str = None
+    amc: str = None
+    metadata: Metadata = None
+    latest_nav: LatestNav = None
+    nav_history: NavHistory = None
+    dividends: list = None
+    performance: Performance = None
+    benchmark: Benchmark = None
+    risk_metrics: dict = None
+    asset_allocation: tuple = None
+    category: dict = None
+    fees: tuple = None
+    involved_parties: tuple = None
+    top_holdings: list = None
+    risk_factors: tuple = None
+    suitability: Suitability = None
+    document_urls: DocumentUrls = None
+    investment_minimums: InvestmentMinimums = None
+    data_fetched_at: str = None
+    errors: tuple = None
+    extra: dict = None
+
+    @classmethod
+    def from_dict(cls, data, DecodeText=False):
+        record = cls(
+            fund_id=data.get("fund_id"),
+            symbol=data.get("symbol"),
+            fund_name=data.get("fund_name"),
+            amc=_intern(data.get("amc")),
+            nav_history=NavHistory.from_list(data.get("nav_history_30d")),
+            data_fetched_at=data.get("data_fetched_at"),
+            errors=None if data.get("errors") is None else tuple(_intern(e) for e in data["errors"]),
+        )
+        for key, section in SECTIONS.items():
+            setattr(record, key, section.from_dict(data.get(key)))
+        for key, section in LIST_SECTIONS.items():
+            setattr(record, key, _tuple_or_none(data.get(key), section))
+        for key in RAW_SECTIONS:
+            setattr(record, key, data.get(key))
+        if DecodeText and record.suitability is not None:
+            record.suitability.normalize_text()
+
+        extra = {k : v for k, v in data.items() if k not in FIELD_ORDER}
+        record.extra = extra or None
+        return record
+
+    @classmethod
+    def from_json(cls, path, DecodeText=False):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f), DecodeText=DecodeText)
+
+    def to_dict(self, DecodeText=False):
+        result = {}
+        for key in FIELD_ORDER:
+            if key == "nav_history_30d":
+                result[key] = None if self.nav_history is None else self.nav_history.to_list()
+            elif key == "suitability":
+                result[key] = None if self.suitability is None else self.suitability.to_dict(DecodeText=DecodeText)
+            elif key in SECTIONS:
+                value = getattr(self, key)
+                result[key] = None if value is None else value.to_dict()
+            elif key in LIST_SECTIONS:
+                result[key] = _list_or_none(getattr(self, key))
+            elif key == "errors":
+                result[key] = None if self.errors is None else list(self.errors)
+            else:
+                result[key] = getattr(self, key)
+        if self.extra:
+            result.update(self.extra)
+        return result
+
+# Key order of the JSON files
+FIELD_ORDER = (
+    "fund_id", "symbol", "fund_name", "amc", "metadata", "latest_nav", "nav_history_30d",
+    "dividends", "performance", "benchmark", "risk_metrics", "asset_allocation", "category",
+    "fees", "involved_parties", "top_holdings", "risk_factors", "suitability", "document_urls",
+    "investment_minimums", "data_fetched_at", "errors",
+)
+
+def load_corpus(CorpusDir=None, DecodeText=False):
+    CorpusDir = Path(CorpusDir) if CorpusDir else DEFAULT_CORPUS_DIR
+    funds = {}
+    for path in sorted(CorpusDir.glob("*.json")):
+        record = FundRecord.from_json(path, DecodeText=DecodeText)
+        funds[record.symbol or path.stem] = record
+    return funds
@@ -0,0 +1,224 @@
+# Look-through holdings index: which funds hold a given security, and how much
+#
+# Per-fund portfolios (FundFactsheet FundPort / FundTop5 rows, see Holdings.py) are
+# stored as they were crawled, and an inverted index is built from them on load:
+#   security key -> [Holding(symbol, weight, period, via)]
+# weight is % of the fund's NAV. A security key is the ISIN when there is one,
+# otherwise the issue code or name, upper-cased.
+#
+# Feeder funds and funds of funds are looked through: when a fund's holding is
+# another fund in the index (matched by symbol or name), or its feeder_fund master
+# has a portfolio (another fund in the index or --master-holdings), the master's
+# holdings are added for the feeder with weight = feeder weight x master weight / 100
+# and via = the master.
+#
+# from corpus.HoldingsIndex import HoldingsIndex
+# index = HoldingsIndex.load()
+# index.holders("NVIDIA")        # [{"symbol", "weight", "direct", "look_through", "period", "via"}, ...]
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import json
+import os
+import re
+
+TOOL_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_INDEX_PATH = TOOL_DIR / "data" / "holdings-index.json"
+
+# Look-through stops here (master of a master of a ...)
+MAX_DEPTH = 3
+
+# FundPort of a quarter is not published before this many days after it ends
+PUBLISH_LAG_DAYS = 60
+
+def quarter_periods(today, count=2):
+    # Latest published quarters, newest first: ["202506", "202503"]
+    day = today - timedelta(days=PUBLISH_LAG_DAYS)
+    year, month = day.year, (day.month - 1) // 3 * 3
+    periods = []
+    while len(periods) < count:
+        if month == 0:
+            year, month = year - 1, 12
+        periods.append("{}{:02d}".format(year, month))
+        month -= 3
+    return periods
+
+def month_periods(today, count=3):
+    # Month ends before today, newest first (FundTop5 is published monthly)
+    year, month = today.year, today.month
+    periods = []
+    for _ in range(count):
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+        periods.append("{}{:02d}".format(year, month))
+    return periods
+
+_ISIN = re.compile(r"[A-Z]{2}[A-Z0-9]{9}[0-9]")
+
+def normalize(text):
+    return re.sub(r"\s+", " ", str(text or "")).strip().upper()
+
+def to_float(value):
+    try:
+        return float(str(value).replace(",", ""))
+    except (TypeError, ValueError):
+        return None
+
+def holding_from_row(row):
+    # FundPort row (issue_code, isin_code, issuer, percent_nav) or FundTop5 row
+    # (secur_name, secur_Invest_size) -> {"key", "name", "code", "weight"}
+    isin = normalize(row.get("isin_code"))
+    code = normalize(row.get("issue_code"))
+    name = row.get("issuer") or row.get("secur_name") or row.get("issue_code")
+    weight = to_float(row.get("percent_nav") if row.get("percent_nav") is not None else
+                      row.get("secur_Invest_size", row.get("secur_invest_size")))
+    key = isin if _ISIN.fullmatch(isin) else (code if code and code != "-" else normalize(name))
+    if not key or weight is None:
+        return None
+    return {"key" : key, "name" : name, "code" : row.get("issue_code"), "weight" : weight}
+
+@dataclass(frozen=True, slots=True)
+class Holding:
+    symbol: str
+    weight: float
+    period: str
+    via: str = None
+
+class HoldingsIndex:
+
+    def __init__(self, funds=None, masters=None):
+        # symbol -> {"proj_id", "name", "period", "source", "holdings" : [...], "feeder" : {...} | None}
+        self.funds = funds or {}
+        # master fund name -> [{"key", "name", "weight"}] for masters outside the corpus
+        self.masters = {normalize(k) : v for k, v in (masters or {}).items()}
+        self._postings = {}
+        self._names = {}
+        self.build()
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_PATH, masters=None):
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(data.get("funds"), masters if masters is not None else data.get("masters"))
+
+    def save(self, path=DEFAULT_INDEX_PATH):
+        path = Path(path)
+        data = {
+            "generated_at" : datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "funds" : dict(sorted(self.funds.items())),
+            "masters" : self.masters,
+        }
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def add_fund(self, symbol, proj_id, period, holdings, source, feeder=None, name=None):
+        self.funds[symbol] = {
+            "proj_id" : proj_id, "name" : name, "period" : period, "source" : source,
+            "holdings" : holdings, "feeder" : feeder,
+        }
+
+    # Building
+    def build(self):
+        postings, names = {}, {}
+        lookup = self._fund_lookup()
+        for symbol in self.funds:
+            for key, name, weight, period, via in self._look_through(symbol, lookup):
+                postings.setdefault(key, []).append(Holding(symbol, weight, period, via))
+                names.setdefault(key, name)
+        for holders in postings.values():
+            holders.sort(key=lambda h: -h.weight)
+        self._postings = postings
+        self._names = names
+
+    def _fund_lookup(self):
+        # Holding key / name -> symbol of a fund in the index
+        lookup = {}
+        for symbol, fund in self.funds.items():
+            lookup[normalize(symbol)] = symbol
+            if fund.get("name"):
+                lookup[normalize(fund["name"])] = symbol
+        return lookup
+
+    def _master_of(self, fund, lookup):
+        # (feeder's weight in the master, master holdings, master label, key of that position) or None
+        feeder = fund.get("feeder") or {}
+        master = normalize(feeder.get("main_feeder_fund"))
+        if not master or master == "-":
+            return None
+        holdings = fund.get("holdings") or []
+        if master in lookup:
+            portfolio, label = self.funds[lookup[master]].get("holdings") or [], lookup[master]
+        elif master in self.masters:
+            portfolio, label = self.masters[master], feeder.get("main_feeder_fund")
+        else:
+            return None
+        # The feeder's position in the master: the holding named like it, else its
+        # largest (a nameless holding is not "named like" anything)
+        names = [(h, normalize(h.get("name"))) for h in holdings]
+        matches = [h for h, name in names if name and (name in master or master in name)]
+        position = max(matches or holdings, key=lambda h: h["weight"], default=None)
+        weight = position["weight"] if position else 100.0
+        return weight, portfolio, label, (position or {}).get("key")
+
+    def _look_through(self, symbol, lookup, depth=0, scale=100.0, via=None, seen=()):
+        fund = self.funds[symbol]
+        period = fund.get("period")
+        master = self._master_of(fund, lookup) if depth < MAX_DEPTH else None
+        master_key = master[3] if master else None
+
+        for h in fund.get("holdings") or []:
+            weight = h["weight"] * scale / 100.0
+            yield h["key"], h.get("name"), weight, period, via
+            if depth >= MAX_DEPTH or h["key"] == master_key:
+                continue
+            # Fund of funds: the holding is another fund in the index
+            target = lookup.get(h["key"]) or lookup.get(normalize(h.get("name")))
+            if target and target != symbol and target not in seen:
+                yield from self._look_through(target, lookup, depth + 1, weight, target, seen + (symbol,))
+
+        if master is not None:
+            weight, portfolio, label, _ = master
+            scale_master = weight * scale / 100.0
+            if label in self.funds and label not in seen and label != symbol:
+                yield from self._look_through(label, lookup, depth + 1, scale_master, label, seen + (symbol,))
+            elif label not in self.funds:
+                for h in portfolio:
+                    yield h["key"], h.get("name"), h["weight"] * scale_master / 100.0, period, label
+
+    # Queries
+    def search(self, text):
+        # Security keys whose key or name contains text
+        needle = normalize(text)
+        if needle in self._postings:
+            return [needle]
+        return sorted(k for k, name in self._names.items() if needle in k or needle in normalize(name))
+
+    def holders(self, text, direct_only=False):
+        # Funds holding the security, largest exposure first:
+        # [{"symbol", "weight", "direct", "look_through", "period", "via"}]
+        totals = {}
+        for key in self.search(text):
+            for h in self._postings[key]:
+                if direct_only and h.via is not None:
+                    continue
+                total = totals.setdefault(h.symbol, {
+                    "symbol" : h.symbol, "weight" : 0.0, "direct" : 0.0, "look_through" : 0.0,
+                    "period" : h.period, "via" : [],
+                })
+                total["weight"] += h.weight
+                if h.via is None:
+                    total["direct"] += h.weight
+                else:
+                    total["look_through"] += h.weight
+                    if h.via not in total["via"]:
+                        total["via"].append(h.via)
+        for total in totals.values():
+            for field in ("weight", "direct", "look_through"):
+                total[field] = round(total[field], 4)
+        return sorted(totals.values(), key=lambda t: -t["weight"])
+
+    def name(self, key):
+        return self._names.get(key)
+
+    def __len__(self):
+        return len(self._postings)
@@ -0,0 +1,101 @@
+# One Report results in SQLite (data/onereport.sqlite of this folder, which git ignores)
+#
+#   raw                   one row per (endpoint, report_year, unique_id) asked for:
+#                         status and the response as JSON text; "ok", "empty" (the
+#                         API had nothing: 204 or an empty answer) or "failed" (any
+#                         other non-200 answer, asked again by the next run)
+#   {endpoint} tables     the rows of every "ok" response, flattened (nested objects
+#                         become parent_child columns, lists JSON text) with
+#                         report_year and unique_id in front; rebuilt by normalize()
+#
+# from corpus.OneReportStore import OneReportStore
+# store = OneReportStore()
+# store.table("cgp_director")          # pandas DataFrame
+
+from datetime import datetime, timezone
+from pathlib import Path
+import json
+import sqlite3
+import threading
+
+TOOL_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_STORE_PATH = TOOL_DIR / "data" / "onereport.sqlite"
+
+def flatten(row, prefix=""):
+    flat = {}
+    for key, value in (row or {}).items():
+        name = prefix + str(key)
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "_"))
+        elif isinstance(value, list):
+            flat[name] = json.dumps(value, ensure_ascii=False)
+        else:
+            flat[name] = value
+    return flat
+
+class OneReportStore:
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS raw ("
+            " endpoint TEXT, report_year INTEGER, unique_id TEXT, status TEXT, payload TEXT, fetched_at TEXT,"
+            " PRIMARY KEY (endpoint, report_year, unique_id))"
+        )
+        self._db.commit()
+
+    def stored(self, retry_empty=False):
+        # {(endpoint, report_year, unique_id)} already answered (failed calls are not)
+        query = "SELECT endpoint, report_year, unique_id FROM raw WHERE " + ("status = 'ok'" if retry_empty else "status != 'failed'")
+        with self._lock:
+            return set(self._db.execute(query).fetchall())
+
+    def put(self, endpoint, report_year, unique_id, response, failed=False):
+        status = "ok" if response else "failed" if failed else "empty"
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO raw VALUES (?, ?, ?, ?, ?, ?)",
+                (endpoint, int(report_year), str(unique_id), status, json.dumps(response, ensure_ascii=False),
+                 datetime.now(timezone.utc).isoformat()),
+            )
+
+    def commit(self):
+        with self._lock:
+            self._db.commit()
+
+    def normalize(self, endpoints=None):
+        # Rebuild the per-endpoint tables from raw; returns {endpoint: rows}
+        import pandas as pd
+
+        with self._lock:
+            self._db.commit()
+            if endpoints is None:
+                endpoints = [r[0] for r in self._db.execute("SELECT DISTINCT endpoint FROM raw")]
+            counts = {}
+            for endpoint in endpoints:
+                rows = []
+                query = "SELECT report_year, unique_id, payload FROM raw WHERE endpoint = ? AND status = 'ok' ORDER BY report_year, unique_id"
+                for year, unique_id, payload in self._db.execute(query, (endpoint,)):
+                    response = json.loads(payload)
+                    for row in response if isinstance(response, list) else [response]:
+                        rows.append({"report_year" : year, "unique_id" : unique_id, **flatten(row)})
+                frame = pd.DataFrame(rows)
+                if not frame.empty:
+                    frame.to_sql(endpoint, self._db, if_exists="replace", index=False)
+                counts[endpoint] = len(frame)
+            self._db.commit()
+        return counts
+
+    def table(self, endpoint):
+        import pandas as pd
+
+        with self._lock:
+            return pd.read_sql_query('SELECT * FROM "{}"'.format(endpoint.replace('"', '""')), self._db)
+
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
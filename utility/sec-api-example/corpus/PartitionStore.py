@@ -0,0 +1,89 @@
+# Date-partitioned local dataset: one JSON file per (feed, trade_date)
+#
+#   data/digitalasset/{feed}/{YYYY}/{YYYY-MM-DD}.json     rows as the API returned them
+#   data/digitalasset/{feed}/{YYYY}/{YYYY-MM-DD}.empty    the API had nothing for the date
+#
+# data/ is the one of this folder, which git ignores: a year of history is
+# thousands of files.
+#
+# Partitions are written to a temporary file and renamed into place, so a reader
+# (or a crashed run) never sees half a partition, and which partitions exist is a
+# directory listing per year, so finding the missing ones for a year of history
+# does not open any file. query() opens only the partitions inside the range.
+#
+# from corpus.PartitionStore import PartitionStore
+# store = PartitionStore("daily_surv_trade_summary")
+# store.query(date(2025, 1, 1), date(2025, 3, 31))     # DataFrame with a trade_date column
+
+from datetime import date
+from pathlib import Path
+import json
+import os
+
+TOOL_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_DATASET_DIR = TOOL_DIR / "data" / "digitalasset"
+
+class PartitionStore:
+
+    def __init__(self, feed, DatasetDir=DEFAULT_DATASET_DIR):
+        self.feed = feed
+        self.root = Path(DatasetDir) / feed
+
+    def _path(self, day, suffix=".json"):
+        return self.root / "{:04d}".format(day.year) / (day.isoformat() + suffix)
+
+    def _listing(self, years):
+        # {date: suffix} of the partitions stored for the given years
+        found = {}
+        for year in years:
+            folder = self.root / "{:04d}".format(year)
+            if not folder.is_dir():
+                continue
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    stem, dot, suffix = entry.name.rpartition(".")
+                    if dot and suffix in ("json", "empty"):
+                        try:
+                            found[date.fromisoformat(stem)] = suffix
+                        except ValueError:
+                            continue
+        return found
+
+    def missing(self, days, retry_empty=False):
+        # The days without a partition (and, with retry_empty, those stored as empty)
+        stored = self._listing({day.year for day in days})
+        return [d for d in days if d not in stored or (retry_empty and stored[d] == "empty")]
+
+    def write(self, day, rows):
+        # rows None -> an .empty marker; a list -> the partition (replacing any marker)
+        path = self._path(day, ".json" if rows is not None else ".empty")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(rows if rows is not None else [], ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+        if rows is not None:
+            self._path(day, ".empty").unlink(missing_ok=True)
+
+    def partitions(self, start=None, end=None):
+        # Dates with data in [start, end], oldest first
+        years = sorted(int(p.name) for p in self.root.iterdir() if p.name.isdigit()) if self.root.is_dir() else []
+        years = [y for y in years if (start is None or y >= start.year) and (end is None or y <= end.year)]
+        return sorted(
+            day for day, suffix in self._listing(years).items()
+            if suffix == "json" and (start is None or day >= start) and (end is None or day <= end)
+        )
+
+    def read(self, day):
+        path = self._path(day)
+        return json.loads(path.read_text(encoding="utf-8")) if path.is_file() else None
+
+    def rows(self, start=None, end=None):
+        # Rows of the partitions in the range, each with its trade_date
+        for day in self.partitions(start, end):
+            for row in self.read(day) or []:
+                yield dict(row, trade_date=row.get("trade_date") or day.isoformat())
+
+    def query(self, start=None, end=None):
+        import pandas as pd
+
+        return pd.DataFrame(list(self.rows(start, end)))
@@ -0,0 +1,387 @@
+# Scheduled refresh of the RMF corpus: what each cadence refetches, when it is
+# due, and how the result is swapped into data/rmf-funds
+#
+# Cadences (RefreshService.py runs them):
+#   daily     latest_nav, nav_history_30d, dividends   trading days, after the NAV
+#                                                      of the previous trading day
+#                                                      is published
+#   weekly    performance, benchmark                   factsheet returns
+#   monthly   asset_allocation, top_holdings, fees, involved_parties, risk_factors,
+#             suitability, document_urls, investment_minimums
+# The other sections (metadata, category, risk_metrics) are left to the full crawl.
+#
+# A section is rebuilt from the raw answers as fetchCompleteFundData
+# (scripts/data-extraction/rmf/fetch-complete-fund-data.ts) builds it. Where that
+# code reads a field the API does not send (fee_class_desc, party_type_desc,
+# port_pct, ...), the field of the API response (utility/fund-factsheet-open-api.json)
+# is read after it, so the crawler's "Unknown" placeholders get filled. An
+# endpoint with no answer leaves the stored section as it is.
+#
+# StoreUpdate applies one run to the corpus as a whole:
+#   1. changed records are written to {corpus}.staging/
+#   2. the staged files and the next version N go to {corpus}.staging/journal.json
+#   3. a complete copy of the corpus with the staged records in it is built and
+#      renamed to {corpus}.versions/v{N}/
+#   4. data/rmf-funds.snapshot.json is replaced by one naming that folder
+#      ("directory" : "rmf-funds.versions/vN"); this one rename is the swap
+#   5. the staged files are moved over their records in data/rmf-funds (one file
+#      at a time), for the tools that read the folder directly
+# Readers that load the folder the snapshot names (snapshot_directory) see the old
+# or the new corpus, never half of a run; a listing of data/rmf-funds during 5. can
+# mix the two. The version before the current one is kept for readers still
+# loading it, older ones are removed. A run interrupted after 2. is finished by
+# recover() (StoreUpdate(...) calls it); one interrupted before is thrown away.
+#
+# from corpus.Refresh import StoreUpdate, TradingCalendar
+# update = StoreUpdate()
+# update.stage(path, record)
+# update.commit("daily")             # {"version" : 12, "changed" : [...], ...}
+
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+import json
+import os
+import shutil
+
+from corpus.HoldingsIndex import month_periods
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+DEFAULT_CORPUS_DIR = REPO_ROOT / "data" / "rmf-funds"
+DEFAULT_SNAPSHOT_PATH = REPO_ROOT / "data" / "rmf-funds.snapshot.json"
+
+# Published versions kept: the current one and the one before it
+KEEP_VERSIONS = 2
+
+# SEC timestamps and NAV publication are Thai time
+BANGKOK_TZ = timezone(timedelta(hours=7))
+
+CADENCES = {
+    "daily" : ("latest_nav", "nav_history_30d", "dividends"),
+    "weekly" : ("performance", "benchmark"),
+    "monthly" : ("asset_allocation", "top_holdings", "fees", "involved_parties", "risk_factors",
+                 "suitability", "document_urls", "investment_minimums"),
+}
+
+# fetchPerformanceMetrics / fetchBenchmarkData: record key -> reference_period
+PERIODS = {
+    "ytd" : "year to date",
+    "3m" : "3 months",
+    "6m" : "6 months",
+    "1y" : "1 year",
+    "3y" : "3 years",
+    "5y" : "5 years",
+    "10y" : "10 years",
+}
+FUND_RETURN = "ผลตอบแทนกองทุนรวม"
+BENCHMARK_RETURN = "ผลตอบแทนตัวชี้วัด"
+
+# Trading days
+class TradingCalendar:
+    # Weekdays that are not in holidays (SET holidays, from --holidays)
+
+    def __init__(self, holidays=()):
+        self.holidays = {date.fromisoformat(str(d)[:10]) for d in holidays}
+
+    @classmethod
+    def from_file(cls, path):
+        # JSON list of dates, or one date per line (# comments)
+        if path is None:
+            return cls()
+        text = Path(path).read_text(encoding="utf-8")
+        if text.lstrip().startswith("["):
+            return cls(json.loads(text))
+        return cls(line.split("#")[0].strip() for line in text.splitlines() if line.split("#")[0].strip())
+
+    def is_trading_day(self, day):
+        return day.weekday() < 5 and day not in self.holidays
+
+    def previous(self, day):
+        day -= timedelta(days=1)
+        while not self.is_trading_day(day):
+            day -= timedelta(days=1)
+        return day
+
+    def between(self, after, last):
+        # Trading days in (after, last], oldest first
+        days, day = [], last
+        while day > after:
+            if self.is_trading_day(day):
+                days.append(day)
+            day -= timedelta(days=1)
+        return days[::-1]
+
+# Section builders: (answers by endpoint, symbol) -> section value, None when
+# the answers hold nothing for it
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _rows(answer):
+    if answer is None:
+        return []
+    return answer if isinstance(answer, list) else [answer]
+
+def for_class(rows, symbol):
+    # Rows of one share class when the answer is split by class_abbr_name
+    own = [row for row in rows if row.get("class_abbr_name") == symbol]
+    return own or [row for row in rows if not row.get("class_abbr_name")] or rows
+
+def _returns(rows, kind, keys):
+    values = {}
+    for key in keys:
+        row = next((r for r in rows if r.get("performance_type_desc") == kind and r.get("reference_period") == PERIODS.get(key, key)), None)
+        # parseFloat(...) || null: 0 is stored as null as well
+        values[key] = (_number(row.get("performance_val")) or None) if row else None
+    return values
+
+def build_performance(answers, symbol):
+    rows = for_class(_rows(answers.get("fund_factsheet_performance")), symbol)
+    if not rows:
+        return None
+    values = _returns(rows, FUND_RETURN, list(PERIODS) + ["inception date"])
+    values["since_inception"] = values.pop("inception date")
+    return values
+
+def build_benchmark(answers, symbol):
+    names = _rows(answers.get("fund_factsheet_benchmark"))
+    if not names:
+        return None
+    rows = for_class(_rows(answers.get("fund_factsheet_performance")), symbol)
+    return {"name" : names[0].get("benchmark") or None, "returns" : _returns(rows, BENCHMARK_RETURN, list(PERIODS))}
+
+def build_dividends(answers, symbol):
+    rows = _rows(answers.get("fund_dailyinfo_dividend"))
+    if not rows:
+        return None
+    return [{key : row.get(key) for key in ("dividend_date", "dividend_per_unit", "ex_dividend_date")} for row in rows]
+
+def build_asset_allocation(answers, symbol):
+    rows = _rows(answers.get("fund_factsheet_asset"))
+    if not rows:
+        return None
+    return [{"asset_class" : row.get("asset_name") or "Unknown", "percentage" : _number(row.get("asset_ratio")) or 0} for row in rows]
+
+def build_top_holdings(answers, symbol):
+    rows = _rows(answers.get("fund_factsheet_FundTop5"))
+    if not rows:
+        return None
+    return [
+        {"security_name" : row.get("asset_name") or row.get("secur_name") or "Unknown",
+         "percentage" : _number(row.get("port_pct") or row.get("secur_Invest_size")) or 0}
+        for row in rows[:5]
+    ]
+
+def build_fees(answers, symbol):
+    rows = for_class(_rows(answers.get("fund_factsheet_fee")), symbol)
+    if not rows:
+        return None
+    return [
+        {"fee_type" : row.get("fee_class_desc") or "Unknown", "fee_desc" : row.get("fee_type_desc") or "",
+         "fee_value" : row.get("actual_fee") or row.get("actual_value") or None,
+         "fee_remark" : row.get("fee_remark") or row.get("fee_other_desc") or None}
+        for row in rows
+    ]
+
+def build_involved_parties(answers, symbol):
+    rows = _rows(answers.get("fund_factsheet_InvolveParty"))
+    if not rows:
+        return None
+    return [
+        {"party_role" : row.get("party_type_desc") or row.get("entity_type") or "Unknown",
+         "party_name" : row.get("person_name") or row.get("comp_name_th") or row.get("entity_name") or "Unknown"}
+        for row in rows
+    ]
+
+def build_risk_factors(answers, symbol):
+    rows = _rows(answers.get("fund_factsheet_risk"))
+    if not rows:
+        return None
+    return [
+        {"risk_type" : row.get("risk_factor_type_th") or row.get("group_code_desc") or "Unknown",
+         "risk_desc" : row.get("risk_desc_th") or row.get("code_desc") or ""}
+        for row in rows
+    ]
+
+def build_suitability(answers, symbol):
+    answer = answers.get("fund_factsheet_suitability")
+    if not answer:
+        return None
+    return {"investment_horizon" : answer.get("invest_period_desc") or None,
+            "risk_level" : answer.get("risk_spectrum_desc") or None,
+            "target_investor" : answer.get("suitability_desc") or None}
+
+def build_document_urls(answers, symbol):
+    answer = answers.get("fund_factsheet_urls")
+    if not answer:
+        return None
+    return {"factsheet_url" : answer.get("url_factsheet") or None,
+            "annual_report_url" : answer.get("url_annual_report") or None,
+            "halfyear_report_url" : answer.get("url_halfyear_report") or None}
+
+def build_investment_minimums(answers, symbol):
+    rows = _rows(answers.get("fund_factsheet_investment"))
+    if not rows:
+        return None
+    return {"minimum_initial" : rows[0].get("minimum_sub_ipo") or None,
+            "minimum_additional" : rows[0].get("minimum_sub") or None,
+            "minimum_redemption" : rows[0].get("minimum_redempt") or None,
+            "minimum_balance" : rows[0].get("lowbal_val") or None}
+
+# section -> (client functions, function/Endpoints.py names, builder); the NAV
+# sections are patched by DeltaSync.apply_nav instead
+SECTION_BUILDERS = {
+    "dividends" : (("fund_dailyinfo_dividend",), build_dividends),
+    "performance" : (("fund_factsheet_performance",), build_performance),
+    "benchmark" : (("fund_factsheet_benchmark", "fund_factsheet_performance"), build_benchmark),
+    "asset_allocation" : (("fund_factsheet_asset",), build_asset_allocation),
+    "top_holdings" : (("fund_factsheet_FundTop5",), build_top_holdings),
+    "fees" : (("fund_factsheet_fee",), build_fees),
+    "involved_parties" : (("fund_factsheet_InvolveParty",), build_involved_parties),
+    "risk_factors" : (("fund_factsheet_risk",), build_risk_factors),
+    "suitability" : (("fund_factsheet_suitability",), build_suitability),
+    "document_urls" : (("fund_factsheet_urls",), build_document_urls),
+    "investment_minimums" : (("fund_factsheet_investment",), build_investment_minimums),
+}
+
+def endpoints_for(sections):
+    names = []
+    for section in sections:
+        for name in SECTION_BUILDERS.get(section, ((), None))[0]:
+            if name not in names:
+                names.append(name)
+    return names
+
+def call_args(endpoint, proj_id, today):
+    # Argument tuples to try in order; the first non-empty answer is used
+    if endpoint == "fund_factsheet_FundTop5":
+        # Same YYYYMM periods as Holdings.py: last month first, then older ones
+        return [(proj_id, period) for period in month_periods(today)]
+    return [(proj_id,)]
+
+def rebuild(record, sections, answers):
+    # Sections rebuilt from one fund's answers into record (in place); names changed
+    changed = []
+    for section in sections:
+        if section not in SECTION_BUILDERS:
+            continue
+        value = SECTION_BUILDERS[section][1](answers, record.get("symbol"))
+        if value is not None and value != record.get(section):
+            record[section] = value
+            changed.append(section)
+    return changed
+
+# Swapping a run into the corpus
+def _write_json(path, data, indent=2):
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data, indent=indent, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+def read_snapshot(SnapshotPath=DEFAULT_SNAPSHOT_PATH):
+    try:
+        return json.loads(Path(SnapshotPath).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"version" : 0}
+
+def snapshot_directory(SnapshotPath=DEFAULT_SNAPSHOT_PATH):
+    # Complete corpus folder of the current version, None before the first swap
+    directory = read_snapshot(SnapshotPath).get("directory")
+    return (Path(SnapshotPath).parent / directory).resolve() if directory else None
+
+class StoreUpdate:
+
+    def __init__(self, CorpusDir=DEFAULT_CORPUS_DIR, SnapshotPath=DEFAULT_SNAPSHOT_PATH):
+        self.CorpusDir = Path(CorpusDir)
+        self.SnapshotPath = Path(SnapshotPath)
+        self.StagingDir = self.CorpusDir.with_name(self.CorpusDir.name + ".staging")
+        self.VersionsDir = self.CorpusDir.with_name(self.CorpusDir.name + ".versions")
+        self.JournalPath = self.StagingDir / "journal.json"
+        self.staged = []
+        self.recovered = self.recover()
+
+    def recover(self):
+        # Finish a commit that got as far as its journal, drop anything staged before
+        if not self.StagingDir.exists():
+            return None
+        try:
+            journal = json.loads(self.JournalPath.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            journal = None
+        if journal is None:
+            shutil.rmtree(self.StagingDir)
+            return None
+        print("Finishing interrupted corpus update [{}]".format(journal.get("job")))
+        return self._swap(journal)
+
+    def stage(self, path, record):
+        # Same layout as the TypeScript crawler (JSON.stringify(data, null, 2))
+        self.StagingDir.mkdir(parents=True, exist_ok=True)
+        name = Path(path).name
+        (self.StagingDir / name).write_text(json.dumps(record, indent=2, ensure_ascii=False), encoding="utf-8")
+        if name not in self.staged:
+            self.staged.append(name)
+
+    def commit(self, job, **details):
+        # Swap everything staged into the corpus; the new snapshot, or None if nothing changed
+        if not self.staged:
+            return None
+        version = int(read_snapshot(self.SnapshotPath).get("version") or 0) + 1
+        journal = {"job" : job, "version" : version, "files" : sorted(self.staged), "details" : details}
+        _write_json(self.JournalPath, journal)
+        self.staged = []
+        return self._swap(journal)
+
+    def _publish(self, journal):
+        # {corpus}.versions/v{N}: every record of the corpus, the staged ones replaced
+        target = self.VersionsDir / "v{}".format(journal["version"])
+        if target.is_dir():
+            return target
+        building = target.with_name(target.name + ".tmp")
+        if building.exists():
+            shutil.rmtree(building)
+        building.mkdir(parents=True)
+        for path in self.CorpusDir.glob("*.json"):
+            shutil.copy2(path, building / path.name)
+        for name in journal["files"]:
+            staged = self.StagingDir / name
+            if staged.exists():
+                shutil.copy2(staged, building / name)
+        os.replace(building, target)
+        return target
+
+    def _swap(self, journal):
+        snapshot = read_snapshot(self.SnapshotPath)
+        # Recovering a run whose snapshot was already written: only 5. is left
+        if int(snapshot.get("version") or 0) < journal["version"]:
+            target = self._publish(journal)
+            snapshot = {
+                "version" : journal["version"],
+                "generated_at" : datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+                "corpus" : self.CorpusDir.name,
+                "directory" : Path(os.path.relpath(target, self.SnapshotPath.parent)).as_posix(),
+                "job" : journal.get("job"),
+                "changed" : journal["files"],
+            }
+            snapshot.update(journal.get("details") or {})
+            _write_json(self.SnapshotPath, snapshot)
+        for name in journal["files"]:
+            staged = self.StagingDir / name
+            if staged.exists():
+                os.replace(staged, self.CorpusDir / name)
+        shutil.rmtree(self.StagingDir)
+        self._prune(journal["version"])
+        return snapshot
+
+    def _prune(self, version):
+        if not self.VersionsDir.is_dir():
+            return
+        for path in self.VersionsDir.iterdir():
+            number = path.name[1:].split(".")[0]
+            if path.is_dir() and number.isdigit() and int(number) <= version - KEEP_VERSIONS:
+                shutil.rmtree(path)
+
+    def discard(self):
+        self.staged = []
+        if self.StagingDir.exists():
+            shutil.rmtree(self.StagingDir)
@@ -0,0 +1,223 @@
+# Rolling fund x fund correlation / covariance of daily NAV returns
+#
+# Daily returns (last_val / previous last_val - 1) of every fund are kept as rolling
+# sums over the last `window` trading days instead of the return history:
+#   n[i, j]    days where both i and j have a return
+#   sx[i, j]   sum of i's returns over those days
+#   sxx[i, j]  sum of i's squared returns over those days
+#   sxy[i, j]  sum of i * j over those days
+# A new trading day adds one outer product per sum and the day falling out of the
+# window subtracts its own, so an update is O(funds^2) whatever the window, and
+# correlation() / covariance() are derived from the sums on demand (pairwise
+# complete, like pandas DataFrame.corr). The window rows themselves are kept too,
+# to subtract on eviction and to recompute() the sums if they ever drift.
+# Memory is four funds x funds float64 matrices (~5 MB for 400 funds).
+#
+# cluster_linkage() / clusters() group funds by distance 1 - correlation (single
+# linkage), which finds near-duplicates: share classes of one fund, feeders of one
+# master fund, index funds on one index.
+#
+# from corpus.ReturnsMatrix import ReturnsMatrix
+# matrix = ReturnsMatrix.load()           # data/returns-matrix.npz of this folder
+# matrix.update(load_corpus())            # new NAV dates only
+# matrix.clusters(max_distance=0.002)     # [["TNASDAQRMF-A", "TNASDAQRMF-B", ...], ...]
+
+from datetime import date
+from pathlib import Path
+import math
+import os
+
+import numpy as np
+
+TOOL_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_STATE_PATH = TOOL_DIR / "data" / "returns-matrix.npz"
+
+# About one year of trading days
+DEFAULT_WINDOW = 250
+
+# Correlations over fewer common days than this are reported as NaN
+MIN_PERIODS = 10
+
+class ReturnsMatrix:
+
+    SUMS = ("n", "sx", "sxx", "sxy")
+
+    def __init__(self, symbols=(), window=DEFAULT_WINDOW):
+        self.window = window
+        self.symbols = list(symbols)
+        self._position = {s : i for i, s in enumerate(self.symbols)}
+        size = len(self.symbols)
+        for name in self.SUMS:
+            setattr(self, name, np.zeros((size, size)))
+        # Return rows in the window, oldest first
+        self.dates = []
+        self.rows = np.empty((0, size))
+        # Last NAV seen per fund (NaN = none yet) and the date of the last row
+        self.last_nav = np.full(size, np.nan)
+        self.last_date = None
+
+    # State
+    @classmethod
+    def load(cls, path=DEFAULT_STATE_PATH):
+        with np.load(path, allow_pickle=False) as state:
+            matrix = cls(state["symbols"].tolist(), int(state["window"]))
+            for name in cls.SUMS + ("rows", "last_nav"):
+                setattr(matrix, name, state[name])
+            matrix.dates = state["dates"].tolist()
+            matrix.last_date = int(state["last_date"]) or None
+        return matrix
+
+    def save(self, path=DEFAULT_STATE_PATH):
+        path = Path(path)
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez(
+            tmp, symbols=np.array(self.symbols, dtype=str), window=self.window,
+            dates=np.array(self.dates, dtype=np.int64), last_date=self.last_date or 0,
+            rows=self.rows, last_nav=self.last_nav, **{name : getattr(self, name) for name in self.SUMS},
+        )
+        os.replace(tmp, path)
+
+    def add_symbols(self, symbols):
+        # New funds start with no returns in the window: zero sums, NaN rows
+        new = [s for s in symbols if s not in self._position]
+        if not new:
+            return
+        size, grow = len(self.symbols), len(new)
+        for name in self.SUMS:
+            setattr(self, name, np.pad(getattr(self, name), ((0, grow), (0, grow))))
+        self.rows = np.pad(self.rows, ((0, 0), (0, grow)), constant_values=np.nan)
+        self.last_nav = np.concatenate([self.last_nav, np.full(grow, np.nan)])
+        for offset, symbol in enumerate(new):
+            self._position[symbol] = size + offset
+        self.symbols.extend(new)
+
+    # Updates
+    def _accumulate(self, row, sign):
+        valid = ~np.isnan(row)
+        x = np.where(valid, row, 0.0)
+        m = valid.astype(float)
+        self.n += sign * np.outer(m, m)
+        self.sx += sign * np.outer(x, m)
+        self.sxx += sign * np.outer(x * x, m)
+        self.sxy += sign * np.outer(x, x)
+
+    def push(self, day, returns):
+        # Add one trading day of returns (NaN = no return that day), evicting the oldest
+        self._accumulate(returns, 1.0)
+        self.dates.append(day)
+        self.rows = np.vstack([self.rows, returns[None, :]])
+        while len(self.dates) > self.window:
+            self._accumulate(self.rows[0], -1.0)
+            self.dates.pop(0)
+            self.rows = self.rows[1:]
+
+    def push_navs(self, day, navs):
+        # One day of NAVs (NaN = not published) -> returns against each fund's last NAV
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.where(self.last_nav > 0, navs / self.last_nav - 1.0, np.nan)
+        self.last_nav = np.where(np.isnan(navs), self.last_nav, navs)
+        self.last_date = day
+        if not np.all(np.isnan(returns)):
+            self.push(day, returns)
+
+    def update(self, funds):
+        # Push every NAV date after last_date from {symbol: FundRecord}; returns the days added
+        self.add_symbols(sorted(funds))
+        days = {}
+        for symbol, record in funds.items():
+            history = record.nav_history
+            if history is None:
+                continue
+            column = self._position[symbol]
+            for day, nav in zip(history.dates, history.last_val):
+                if (self.last_date is None or day > self.last_date) and not math.isnan(nav) and nav > 0:
+                    days.setdefault(day, {})[column] = nav
+        for day in sorted(days):
+            navs = np.full(len(self.symbols), np.nan)
+            for column, nav in days[day].items():
+                navs[column] = nav
+            self.push_navs(day, navs)
+        return len(days)
+
+    def recompute(self):
+        # Rebuild the sums from the rows in the window
+        for name in self.SUMS:
+            getattr(self, name)[:] = 0.0
+        for row in self.rows:
+            self._accumulate(row, 1.0)
+
+    # Results
+    def covariance(self, min_periods=MIN_PERIODS):
+        n, sx, sy = self.n, self.sx, self.sx.T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = (self.sxy - sx * sy / n) / (n - 1)
+        cov[n < max(min_periods, 2)] = np.nan
+        return cov
+
+    def correlation(self, min_periods=MIN_PERIODS):
+        n, sx, sy = self.n, self.sx, self.sx.T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            num = n * self.sxy - sx * sy
+            var_x = np.clip(n * self.sxx - sx * sx, 0.0, None)
+            var_y = var_x.T
+            corr = np.clip(num / np.sqrt(var_x * var_y), -1.0, 1.0)
+        corr[n < max(min_periods, 2)] = np.nan
+        return corr
+
+    def most_correlated(self, symbol, count=10, min_periods=MIN_PERIODS):
+        i = self._position[symbol]
+        corr = self.correlation(min_periods)[i]
+        order = [j for j in np.argsort(-np.nan_to_num(corr, nan=-2.0)) if j != i and not np.isnan(corr[j])]
+        return [(self.symbols[j], float(corr[j])) for j in order[:count]]
+
+    def cluster_linkage(self, min_periods=MIN_PERIODS):
+        # Single linkage merges [(a, b, distance, size)] in scipy's linkage layout:
+        # ids < len(symbols) are funds, id len(symbols) + k is the k-th merge.
+        # Pairs without enough common days are never merged.
+        size = len(self.symbols)
+        distance = 1.0 - self.correlation(min_periods)
+        i, j = np.triu_indices(size, k=1)
+        d = distance[i, j]
+        keep = ~np.isnan(d)
+        i, j, d = i[keep], j[keep], d[keep]
+        order = np.argsort(d, kind="stable")
+
+        parent = list(range(size))
+        cluster = list(range(size))
+        members = [1] * size
+
+        def root(a):
+            while parent[a] != a:
+                parent[a] = parent[parent[a]]
+                a = parent[a]
+            return a
+
+        merges = []
+        for k in order:
+            a, b = root(i[k]), root(j[k])
+            if a == b:
+                continue
+            merges.append((cluster[a], cluster[b], float(d[k]), members[a] + members[b]))
+            parent[b] = a
+            members[a] += members[b]
+            cluster[a] = size + len(merges) - 1
+            if len(merges) == size - 1:
+                break
+        return merges
+
+    def clusters(self, max_distance=0.002, min_periods=MIN_PERIODS):
+        # Groups of 2+ funds joined by merges at distance <= max_distance, largest first
+        size = len(self.symbols)
+        groups = {k : [k] for k in range(size)}
+        for merge, (a, b, distance, _) in enumerate(self.cluster_linkage(min_periods)):
+            if distance > max_distance:
+                break
+            groups[size + merge] = groups.pop(a) + groups.pop(b)
+        result = [sorted(self.symbols[k] for k in group) for group in groups.values() if len(group) > 1]
+        return sorted(result, key=lambda group: (-len(group), group))
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def window_dates(self):
+        return [date.fromordinal(day) for day in self.dates]
@@ -6,6 +6,10 @@ import pandas as pd
 import requests
 import json
 import os
+import threading
+import time
+
+from function.Profiling import note_response, phase
 
 
 
@@ -47,6 +51,33 @@ def WriteResponseLog(Message,ErrorCode):
     file.write('{}|{}|{}\n'.format(datetime.now(),ErrorCode,Message))
     file.close()
 
+def SendAPI(method, headers, url, data=None):
+    # One request, without the rate limit; the response as it came
+    started = time.perf_counter()
+    if method == "POST":
+        response = requests.post(url=url, data=json.dumps(data , ensure_ascii=False), headers=headers)
+    else:
+        response = requests.get(url, headers=headers)
+    note_response(response, time.perf_counter() - started)
+    return response
+
+# Status of the last answer read on each thread: a caller that got None can tell
+# "no data" (204) from a failed call
+_last = threading.local()
+
+def LastStatus():
+    return getattr(_last, "status", None)
+
+def ReadResponse(response, url):
+    _last.status = response.status_code
+    if response.status_code != 200 :
+        print('Cannot call API: {}'.format(response.status_code))
+        WriteResponseLog(url,response.status_code)
+        return None
+    else:
+        with phase("decode"):
+            return response.json()
+
 # rate limit class
 ## call 10 time in 1 second
 class RateLimiter:
@@ -56,22 +87,8 @@ class RateLimiter:
     
     @rate_limited(3000, 300)
     def CallGetAPI(self, headers, url):
-        response = requests.get(url, headers=headers)
-        if response.status_code != 200 :
-            print('Cannot call API: {}'.format(response.status_code))
-            WriteResponseLog(url,response.status_code)
-            return None
-        else:
-            return response.json()
+        return ReadResponse(SendAPI("GET", headers, url), url)
         
     @rate_limited(3000 , 300)
     def CallPostAPI(self, headers, data, url):
-        DataJson = json.dumps(data , ensure_ascii=False)
-        response = requests.post(url=url, data=DataJson, headers=headers)
-        if response.status_code != 200 :
-            print('Cannot call API: {}'.format(response.status_code))
-            WriteResponseLog(url,response.status_code)
-            return None
-        else:
-            return response.json()
-      
\ No newline at end of file
+        return ReadResponse(SendAPI("POST", headers, url, data), url)
@@ -0,0 +1,245 @@
+# Dispatcher behind the generated client functions (function/Endpoints.py)
+#
+# Every client function, generated or hand-written, ends in Client.call(endpoint,
+# values), so per-endpoint policies apply in one place:
+#   * base URL and subscription key(s) per product, read from .env on first call;
+#     a product with several keys spreads its requests over them, each key with
+#     its own quota, and fails over on 401 / 429 (function/KeyPool.py)
+#   * response cache for endpoints with a ttl, when POLICIES["cache"] is on
+#     (SecApiCache=1); None answers are never cached, cached answers are copies
+#   * retries of connection errors with backoff (SecApiRetries=n)
+#   * priority queueing of the calls that go out (SecApiSchedule=1,
+#     function/Scheduler.py)
+#   * middleware: callables (endpoint, url, data, proceed) -> response wrapped
+#     around the request, in the order added, for counting, tracing, ...
+# With one key the request still goes through RateLimiter (function/AllFunction.py),
+# so the per-process budget, the log/ file and the console line are unchanged.
+#
+# Client modules get their functions from generated(module, globals()): a module
+# __getattr__ that builds a function the first time its name is looked up.
+#
+# from function.Client import Client
+# Client.default().configure(cache=True)
+# Client.default().use(lambda endpoint, url, data, proceed: proceed())
+
+from functools import partial
+from pathlib import Path
+import copy
+import inspect
+import json
+import os
+import threading
+import time
+
+from function.Endpoints import POLICIES, endpoint, module_endpoints, product
+from function.KeyPool import KeyPool, mask
+from function.Profiling import phase
+
+def _flag(value):
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+def _retry_after(response):
+    # Retry-After in seconds; the HTTP date form is left to the pool's default
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+class Client:
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, **policies):
+        self.policies = dict(POLICIES)
+        if os.getenv("SecApiCache") is not None:
+            self.policies["cache"] = _flag(os.getenv("SecApiCache"))
+        if os.getenv("SecApiRetries"):
+            self.policies["retries"] = int(os.getenv("SecApiRetries"))
+        if os.getenv("SecApiSchedule") is not None:
+            self.policies["schedule"] = _flag(os.getenv("SecApiSchedule"))
+        self.policies.update(policies)
+        self.middleware = []
+        self._products = {}
+        self._schedulers = {}
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls):
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = cls()
+                    # SecApiProfile=... profiles the whole process (function/Profiling.py)
+                    from function.Profiling import start_from_env
+
+                    start_from_env()
+        return cls._default
+
+    def configure(self, **policies):
+        unknown = set(policies) - set(POLICIES)
+        if unknown:
+            raise ValueError("Unknown client policies: {}".format(", ".join(sorted(unknown))))
+        self.policies.update(policies)
+        if not self.policies["cache"]:
+            self.clear_cache()
+        return self
+
+    def use(self, middleware):
+        self.middleware.append(middleware)
+        return middleware
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def _product(self, module):
+        # (base URL, headers without the key, KeyPool) of a product, from the
+        # environment on first use
+        found = self._products.get(module)
+        if found is None:
+            from dotenv import load_dotenv
+
+            load_dotenv(Path(".env"))
+            base, key = product(module)
+            found = (os.getenv("Url") + base, {
+                "Content-type":"application/json",
+                "Accept":"application/json",
+                "cache-control" : "no-cache",
+            }, KeyPool.from_env(key))
+            with self._lock:
+                found = self._products.setdefault(module, found)
+        return found
+
+    def keys(self, module):
+        return self._product(module)[2]
+
+    def scheduler(self, module):
+        # Products with one key share RateLimiter's per-process budget, so they
+        # share one scheduler; a KeyPool of several keys has its own budget
+        from function.Scheduler import Scheduler
+
+        pool = self.keys(module)
+        name = module if len(pool) > 1 else None
+        with self._lock:
+            found = self._schedulers.get(name)
+            if found is None:
+                found = self._schedulers[name] = Scheduler(pool.limit / pool.period * 0.9 * max(len(pool), 1))
+        return found
+
+    def _send(self, endpoint, url, headers, data, pool):
+        from function.AllFunction import RateLimiter, ReadResponse, SendAPI
+
+        if len(pool) <= 1:
+            headers = dict(headers, **{"Ocp-Apim-Subscription-Key" : pool.primary})
+            if endpoint.method == "POST":
+                return RateLimiter.CallPostAPI(self=None, headers=headers, data=data, url=url)
+            return RateLimiter.CallGetAPI(self=None, headers=headers, url=url)
+
+        tried = []
+        while True:
+            key = pool.acquire(exclude=tried)
+            if key is None:
+                # Every key refused: answer as the last one did
+                return ReadResponse(response, url)
+            response = SendAPI(endpoint.method, dict(headers, **{"Ocp-Apim-Subscription-Key" : key}), url, data)
+            if response.status_code not in (401, 429):
+                return ReadResponse(response, url)
+            pool.failed(key, response.status_code, _retry_after(response))
+            print("Key [{}] answered {}, trying the next key".format(mask(key), response.status_code))
+            tried.append(key)
+
+    def _request(self, endpoint, url, headers, data, pool):
+        import requests
+
+        print("preparing to call the API [{}]".format(url))
+        attempt = 0
+        while True:
+            try:
+                return self._send(endpoint, url, headers, data, pool)
+            except requests.ConnectionError:
+                if attempt >= self.policies["retries"]:
+                    raise
+                with phase("retry_backoff"):
+                    time.sleep(self.policies["retry_backoff"] * 2 ** attempt)
+                attempt += 1
+
+    def call(self, endpoint, values):
+        # values: {parameter: value} of the endpoint
+        base, headers, pool = self._product(endpoint.module)
+        url = endpoint.url(base, values)
+        data = endpoint.data(values) if endpoint.method == "POST" else None
+
+        cached = self.policies["cache"] and endpoint.ttl > 0
+        if cached:
+            key = (url, json.dumps(data, sort_keys=True))
+            with self._lock:
+                entry = self._cache.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return copy.deepcopy(entry[1])
+
+        if self.policies["schedule"]:
+            # Named here: the profiling middleware sets the endpoint only below
+            with phase("queue_wait", endpoint.name):
+                self.scheduler(endpoint.module).acquire()
+
+        proceed = partial(self._request, endpoint, url, headers, data, pool)
+        for middleware in self.middleware:
+            proceed = partial(middleware, endpoint, url, data, proceed)
+        resp = proceed()
+
+        if cached and resp is not None:
+            with self._lock:
+                self._cache[key] = (time.monotonic() + endpoint.ttl, copy.deepcopy(resp))
+        return resp
+
+def call(name, *args, **kwargs):
+    # Call an endpoint of the table by name, with the function's arguments
+    found = endpoint(name)
+    return Client.default().call(found, _bind(found, args, kwargs))
+
+def _signature(found):
+    return inspect.Signature([inspect.Parameter(p, inspect.Parameter.POSITIONAL_OR_KEYWORD) for p in found.params])
+
+def _bind(found, args, kwargs):
+    bound = _signature(found).bind(*args, **kwargs)
+    return dict(bound.arguments)
+
+def build(found, module_name):
+    # The public function of one endpoint
+    signature = _signature(found)
+
+    def function(*args, **kwargs):
+        return Client.default().call(found, dict(signature.bind(*args, **kwargs).arguments))
+
+    function.__name__ = function.__qualname__ = found.name
+    function.__module__ = module_name
+    function.__signature__ = signature
+    function.__doc__ = "{} {}{}".format(found.method, product(found.module)[0], found.path)
+    return function
+
+def generated(module, namespace):
+    # __getattr__, __dir__ for a client module: functions of its public endpoints are
+    # built on first lookup and then kept in the module
+    module_name = namespace["__name__"]
+
+    def public():
+        return [e.name for e in module_endpoints(module) if not e.name.startswith("_")]
+
+    def __getattr__(name):
+        if name == "__all__":
+            written = [n for n, v in namespace.items()
+                       if inspect.isfunction(v) and v.__module__ == module_name and not n.startswith("_")]
+            return sorted(set(public()) | set(written))
+        found = endpoint(name)
+        if found is None or found.module != module or name.startswith("_"):
+            raise AttributeError("module {!r} has no attribute {!r}".format(module_name, name))
+        function = build(found, module_name)
+        namespace[name] = function
+        return function
+
+    def __dir__():
+        return sorted(set(namespace) | set(public()))
+
+    return __getattr__, __dir__
@@ -0,0 +1,216 @@
+# Declarative table of the SEC API endpoints the client functions are generated from
+#
+# One row per public function in function/*.py:
+#   GET(name, path, ttl, cardinality)            path under the product base URL, with
+#   POST(name, path, body, ttl, cardinality)     {placeholders} named like the parameters
+# The function's parameters are the path placeholders in order, then the body
+# parameters ({"json field" : "parameter"}); names are the ones the hand-written
+# functions had, so keyword calls keep working.
+#   ttl           seconds an answer may be reused when response caching is on
+#                 (0 = never cached: searches, anything that is asked to be fresh)
+#   cardinality   ONE object, ROWS for one key, or a whole TABLE (reference data,
+#                 fund lists), for callers that plan batches and storage
+#
+# Policies that apply to all endpoints (response cache on/off, retries, ...) are in
+# POLICIES; function/Client.py applies both. The table is turned into Endpoint
+# objects on first lookup, and a function only when it is first used.
+#
+# from function.Endpoints import endpoint
+# endpoint("fund_factsheet_fee")        # Endpoint(module='FundFactsheet', method='GET', ...)
+
+from dataclasses import dataclass
+import re
+import threading
+
+ONE, ROWS, TABLE = "one", "rows", "table"
+
+# TTL classes
+REFERENCE = 24 * 3600       # reference tables, AMC and fund lists
+FACTSHEET = 12 * 3600       # per-fund sections, updated at most daily
+DATED = 24 * 3600           # keyed by a date or period: published once
+
+# Central policies (env overrides in function/Client.py)
+POLICIES = {
+    "cache" : False,            # reuse answers for up to their ttl (SecApiCache=1)
+    "retries" : 0,              # retry connection errors this many times (SecApiRetries)
+    "retry_backoff" : 0.5,      # seconds, doubled per retry
+    "schedule" : False,         # queue calls by priority class (SecApiSchedule=1, function/Scheduler.py)
+}
+
+@dataclass(frozen=True)
+class Endpoint:
+    name: str
+    module: str
+    method: str
+    path: str
+    params: tuple
+    body: tuple = ()
+    ttl: int = 0
+    cardinality: str = ROWS
+
+    def url(self, base, values):
+        return base + self.path.format(**values)
+
+    def data(self, values):
+        # POST body; values are sent as strings, as the hand-written functions did
+        return {field : "{}".format(values[param]) for field, param in self.body}
+
+def GET(name, path, ttl=0, cardinality=ROWS):
+    return (name, "GET", path, {}, ttl, cardinality)
+
+def POST(name, path, body, ttl=0, cardinality=ROWS):
+    return (name, "POST", path, body, ttl, cardinality)
+
+# module -> (base path, env variable with the subscription key, endpoints)
+PRODUCTS = {
+    "FundFactsheet" : ("/FundFactsheet", "FundFactsheetKey", (
+        GET("fund_factsheet_amc", "/fund/amc", REFERENCE, TABLE),
+        # fund_factsheet_fund picks one of these two (function/FundFactsheet.py)
+        GET("_fund_factsheet_fund_amc", "/fund/amc/{FundParam}", REFERENCE, TABLE),
+        POST("_fund_factsheet_fund_search", "/fund", {"name" : "FundParam"}),
+        GET("fund_factsheet_urls", "/fund/{proj_fund}/URLs", FACTSHEET, ONE),
+        GET("fund_factsheet_ipo", "/fund/{proj_fund}/IPO", FACTSHEET, ONE),
+        GET("fund_factsheet_investment", "/fund/{proj_fund}/investment", FACTSHEET),
+        GET("fund_factsheet_project_type", "/fund/{proj_id}/project_type", FACTSHEET, ONE),
+        GET("fund_factsheet_policy", "/fund/{proj_id}/policy", FACTSHEET, ONE),
+        GET("fund_factsheet_specification", "/fund/{proj_id}/specification", FACTSHEET, ONE),
+        GET("fund_factsheet_feeder_fund", "/fund/{proj_id}/feeder_fund", FACTSHEET, ONE),
+        GET("fund_factsheet_redemption", "/fund/{proj_id}/redemption", FACTSHEET, ONE),
+        GET("fund_factsheet_suitability", "/fund/{proj_id}/suitability", FACTSHEET, ONE),
+        GET("fund_factsheet_risk", "/fund/{proj_id}/risk", FACTSHEET, ONE),
+        GET("fund_factsheet_asset", "/fund/{proj_id}/asset", FACTSHEET),
+        GET("fund_factsheet_turnover_ratio", "/fund/{proj_id}/turnover_ratio", FACTSHEET, ONE),
+        GET("fund_factsheet_return", "/fund/{proj_id}/return", FACTSHEET),
+        GET("fund_factsheet_buy_and_hold", "/fund/{proj_id}/buy_and_hold", FACTSHEET),
+        GET("fund_factsheet_benchmark", "/fund/{proj_id}/benchmark", FACTSHEET),
+        GET("fund_factsheet_fund_compare", "/fund/{proj_id}/fund_compare", FACTSHEET, ONE),
+        # fund_factsheet_class_fund picks one of these two (function/FundFactsheet.py)
+        GET("_fund_factsheet_class_fund_id", "/fund/{ClassParam}/class_fund", FACTSHEET),
+        POST("_fund_factsheet_class_fund_search", "/fund/class_fund", {"name" : "ClassParam"}),
+        GET("fund_factsheet_performance", "/fund/{proj_id}/performance", FACTSHEET),
+        GET("fund_factsheet_5YearLost", "/fund/{proj_id}/5YearLost", FACTSHEET),
+        GET("fund_factsheet_dividend", "/fund/{proj_id}/dividend", FACTSHEET),
+        GET("fund_factsheet_fee", "/fund/{proj_id}/fee", FACTSHEET),
+        GET("fund_factsheet_InvolveParty", "/fund/{proj_id}/InvolveParty", FACTSHEET),
+        GET("fund_factsheet_FundPort", "/fund/{proj_id}/FundPort/{period}", DATED),
+        GET("fund_factsheet_FundFullPort", "/fund/{proj_id}/FundFullPort/{period}", DATED),
+        GET("fund_factsheet_FundTop5", "/fund/{proj_id}/FundTop5/{period}", DATED),
+        GET("fund_factsheet_FundHist", "/fund/{proj_id}/FundHist", FACTSHEET),
+        GET("fund_factsheet_FundTrackingError", "/fund/{proj_id}/FundTrackingError", FACTSHEET),
+    )),
+    "FundDailyInfo" : ("/FundDailyInfo", "FundDailyInfoKey", (
+        GET("fund_dailyinfo_dailynav", "/{proj_fund}/dailynav/{nav_date}", DATED),
+        GET("fund_dailyinfo_dividend", "/{proj_fund}/dividend", FACTSHEET),
+        GET("fund_dailyinfo_amc", "/amc", REFERENCE, TABLE),
+    )),
+    "Bond" : ("/bond", "BondKey", (
+        POST("bond_outs_issuer", "/outstanding/issuer", {"IssuerName" : "IssuerName"}),
+        POST("bond_outs_issue", "/outstanding/issue", {"SecurityCode" : "SecurityCode"}),
+        GET("bond_outs_offer_type", "/outstanding/{issued_ref_id}/offer_type", REFERENCE),
+        GET("bond_outs_coupon", "/outstanding/{issued_ref_id}/coupon", REFERENCE),
+        GET("bond_outs_issue_age", "/outstanding/{issued_ref_id}/issue_age", FACTSHEET),
+        GET("bond_outs_offering_unit", "/outstanding/{issued_ref_id}/offering_unit", REFERENCE),
+        GET("bond_outs_issue_rating", "/outstanding/{issued_ref_id}/issue_rating", FACTSHEET),
+        GET("bond_outs_redemption", "/outstanding/{issued_ref_id}/redemption", REFERENCE),
+        GET("bond_outs_involve_party", "/outstanding/{issued_ref_id}/involve_party", REFERENCE),
+        GET("bond_outs_investor_type", "/outstanding/{issued_ref_id}/investor_type", REFERENCE),
+        GET("bond_outs_sector_type", "/outstanding/{issued_ref_id}/sector_type", REFERENCE),
+        GET("bond_outs_outstanding_value", "/outstanding/{issued_ref_id}/outstanding_value/{outstanding_date}", DATED),
+    )),
+    "Common" : ("/common/ref", "CommonKey", tuple(
+        GET("ref_" + path.strip("/").replace("/", "_"), path, REFERENCE, TABLE) for path in (
+            "/license_type/company", "/business_act/company", "/license_type/person", "/role/person",
+            "/fund/portfolio/asset_type", "/product/secu_type", "/product/offering_type", "/product/currency_code",
+            "/product/debenture/coupon_code", "/product/debenture/redemption_code",
+            "/product/debenture/embedded_code", "/product/debenture/secured_code",
+            "/investoralert/action_type", "/bond/function_type", "/bond/corporation_type",
+            "/digitalasset/customer_type", "/digitalasset/asset_type", "/pvd/policy_code",
+            "/onereport/financial_statement", "/onereport/social_performance_code", "/onereport/risk_code",
+            "/onereport/export_code", "/onereport/environment_code",
+        )
+    )),
+    "DigitalAsset" : ("/DigitalAsset", "DigitalAssetKey", (
+        POST("digitalasset_profile_intermediary", "/profile/intermediary", {"IntermediaryName" : "IntermediaryName"}),
+        GET("digitalasset_monthly_customer", "/monthly/{trade_date}/customer", DATED),
+        GET("digitalasset_monthly_asset", "/monthly/{trade_date}/asset", DATED),
+        GET("digitalasset_monthly_active_account", "/monthly/{trade_date}/active_account", DATED),
+        GET("digitalasset_weekly_asset", "/weekly/{trade_date}/asset", DATED),
+        GET("digitalasset_daily_surv_trade_summary", "/daily/{trade_date}/surv_trade_summary", DATED),
+        GET("digitalasset_daily_investor_type_summary", "/daily/{trade_date}/investor_type_summary", DATED),
+        GET("digitalasset_daily_dtw_daily_summary", "/daily/{trade_date}/dtw_daily_summary", DATED),
+    )),
+    "Onereport" : ("/onereport", "OnereportKey", (
+        GET("onereport_sbo_info", "/sbo/{report_year}/info/{language}", DATED, TABLE),
+    ) + tuple(
+        GET("onereport_{}_{}".format(group, name), "/{}/{{report_year}}/{}/{{unique_id}}".format(group, name), DATED)
+        for group, name in (
+            ("sbo", "product_income"), ("sbo", "risk"),
+            ("sustainability", "detail"), ("sustainability", "humanrights_issue"),
+            ("scp", "labor_dispute"), ("scp", "csr_activity"),
+            ("cgp", "governance"), ("cgp", "director"), ("cgp", "code_of_conduct"),
+            ("cgs", "board"), ("cgs", "auditor_company"), ("cgs", "director_performance"),
+        )
+    )),
+    "LicenseCheck" : ("/LicenseCheck/licensee", "LicenseCheckKey", (
+        POST("licensecheck_lcs_person", "/person", {"Name" : "person_name", "regis_sale_no" : "regis_sale_no"}),
+        # licensecheck_lcs_company picks one of these two (function/LicenseCheck.py)
+        GET("_licensecheck_lcs_company_list", "/company", REFERENCE, TABLE),
+        POST("_licensecheck_lcs_company_search", "/company", {"Name" : "CompName"}),
+        GET("licensecheck_lcs_person_license", "/person/{unique_id}/license", FACTSHEET),
+        GET("licensecheck_lcs_company_personnel", "/company/{unique_id}/personnel", FACTSHEET),
+        GET("licensecheck_lcs_person_workinfo", "/person/{unique_id}/work_info", FACTSHEET),
+        GET("licensecheck_lcs_company_license", "/company/{unique_id}/license", FACTSHEET),
+        GET("licensecheck_lcs_company_business_act", "/company/{unique_id}/business_act", FACTSHEET),
+        # licensecheck_lcs_enforcement picks one of these two (function/LicenseCheck.py)
+        GET("_licensecheck_lcs_enforcement_all", "/{unique_id}/enforcement", FACTSHEET),
+        GET("_licensecheck_lcs_enforcement_case", "/{unique_id}/enforcement/{case_id}", FACTSHEET),
+        GET("licensecheck_lcs_alertdetail", "/investoralert/alertdetail", FACTSHEET, TABLE),
+        GET("licensecheck_lcs_alertaction", "/investoralert/{case_id}/alertaction", FACTSHEET),
+    )),
+    "PVDFactSheet" : ("/pvd/factsheet", "PVDFactsheetKey", (
+        GET("pvd_factsheet_amc", "/amc", REFERENCE, TABLE),
+        # pvd_factsheet_fund picks one of these two (function/PVDFactSheet.py)
+        GET("_pvd_factsheet_fund_amc", "/{uniique_id}/fund", REFERENCE, TABLE),
+        POST("_pvd_factsheet_fund_search", "/fund", {"FundName" : "uniique_id"}),
+        GET("pvd_factsheet_policy", "/{proj_id}/policy", FACTSHEET, ONE),
+        GET("pvd_factsheet_return", "/{proj_id}/return", FACTSHEET),
+        GET("pvd_factsheet_fee", "/{proj_id}/fee", FACTSHEET),
+        GET("pvd_factsheet_pvdFullPort", "/{proj_id}/PVDFullPort/{period}", DATED),
+    )),
+}
+
+_PLACEHOLDER = re.compile(r"{(\w+)}")
+
+_index = None
+_index_lock = threading.Lock()
+
+def _build():
+    index = {}
+    for module, (base, key, rows) in PRODUCTS.items():
+        for name, method, path, body, ttl, cardinality in rows:
+            params = []
+            for param in _PLACEHOLDER.findall(path) + list(body.values()):
+                if param not in params:
+                    params.append(param)
+            index[name] = Endpoint(name, module, method, path, tuple(params), tuple(body.items()), ttl, cardinality)
+    return index
+
+def endpoints():
+    # {name: Endpoint}, built on first use
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = _build()
+    return _index
+
+def endpoint(name):
+    return endpoints().get(name)
+
+def module_endpoints(module):
+    return [e for e in endpoints().values() if e.module == module]
+
+def product(module):
+    # (base path, env variable of the key)
+    base, key, _ = PRODUCTS[module]
+    return base, key
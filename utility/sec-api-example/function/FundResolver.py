@@ -0,0 +1,181 @@
+# Offline fund symbol -> proj_id / AMC / share class resolution
+#
+# fund_factsheet_fund and fund_factsheet_class_fund used to guess from the shape of
+# the parameter whether it is an id (GET) or a name (POST search), and every name
+# cost a round trip. FundResolver answers from memory instead:
+#   * data/fund-mapping.json        symbol -> proj_id, amc_id (phase-0-build-mapping.ts)
+#   * fund-resolver-cache.json      what the API taught us since: symbols seen in fund
+#                                   list / class fund responses and the class fund
+#                                   rows of each proj_id (in data/ of this folder,
+#                                   which git ignores, not in the repo's data/)
+# Lookups are dict hits. On a miss the caller asks the API once and hands the
+# response to learn_funds() / learn_class_funds(); the cache file is rewritten when
+# the process exits (or on save()). Set FundResolverCache in .env to use another
+# cache file, or to an empty value to keep what is learned in memory only.
+#
+# from function.FundResolver import FundResolver
+# FundResolver.default().proj_id("ABAPAC-RMF")      # 'M0774_2554'
+
+from datetime import datetime, timezone
+from pathlib import Path
+import atexit
+import json
+import os
+import threading
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+DEFAULT_MAPPING = REPO_ROOT / "data" / "fund-mapping.json"
+TOOL_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_CACHE = TOOL_DIR / "data" / "fund-resolver-cache.json"
+
+# Share class suffixes tried when a class symbol is not known by itself
+# (same list as findMappingEntry in reprocess-incomplete-funds.ts)
+CLASS_SUFFIXES = ("(A)", "(B)", "(E)", "(P)", "-A", "-B", "-P", "-H", "-UH", "-F")
+
+def normalize(symbol):
+    return str(symbol).strip().upper()
+
+class FundResolver:
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, MappingPath=DEFAULT_MAPPING, CachePath=DEFAULT_CACHE):
+        self.MappingPath = Path(MappingPath) if MappingPath else None
+        self.CachePath = Path(CachePath) if CachePath else None
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        # SYMBOL -> {"symbol", "proj_id", "amc_id"}
+        self._symbols = {}
+        self._learned = {}
+        # proj_id -> class fund rows as returned by the API
+        self._classes = {}
+        self._proj_ids = set()
+        self._amc_ids = set()
+
+        self._load_mapping()
+        self._load_cache()
+
+    @classmethod
+    def default(cls):
+        # One resolver per process, saved on exit
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls(CachePath=os.getenv("FundResolverCache", str(DEFAULT_CACHE)))
+                atexit.register(cls._default.save)
+            return cls._default
+
+    def _load_mapping(self):
+        if self.MappingPath is None or not self.MappingPath.is_file():
+            return
+        mapping = json.loads(self.MappingPath.read_text(encoding="utf-8")).get("mapping") or {}
+        for symbol, entry in mapping.items():
+            self._add(symbol, entry.get("proj_id"), entry.get("amc_id"))
+
+    def _load_cache(self):
+        if self.CachePath is None or not self.CachePath.is_file():
+            return
+        try:
+            cache = json.loads(self.CachePath.read_text(encoding="utf-8"))
+        except ValueError as e:
+            print("Ignoring unreadable resolver cache [{}]: {}".format(self.CachePath, e))
+            return
+        for symbol, entry in (cache.get("symbols") or {}).items():
+            self._add(symbol, entry.get("proj_id"), entry.get("amc_id"))
+            self._learned[normalize(symbol)] = self._symbols[normalize(symbol)]
+        for proj_id, rows in (cache.get("class_funds") or {}).items():
+            self._classes[proj_id] = rows
+            self._proj_ids.add(proj_id)
+
+    def _add(self, symbol, proj_id, amc_id):
+        if not symbol or not proj_id:
+            return None
+        key = normalize(symbol)
+        current = self._symbols.get(key) or {}
+        entry = {"symbol" : symbol, "proj_id" : proj_id, "amc_id" : amc_id or current.get("amc_id")}
+        self._symbols[key] = entry
+        self._proj_ids.add(proj_id)
+        if entry["amc_id"]:
+            self._amc_ids.add(entry["amc_id"])
+        return entry
+
+    # Lookups
+    def resolve(self, symbol):
+        # {"symbol", "proj_id", "amc_id"} for a fund or class symbol, or None
+        key = normalize(symbol)
+        entry = self._symbols.get(key)
+        if entry is not None:
+            return entry
+        for suffix in CLASS_SUFFIXES:
+            if key.endswith(suffix) and len(key) > len(suffix):
+                entry = self._symbols.get(key[:-len(suffix)].rstrip("-"))
+                if entry is not None:
+                    return entry
+        return None
+
+    def proj_id(self, symbol):
+        entry = self.resolve(symbol)
+        return entry["proj_id"] if entry else None
+
+    def is_proj_id(self, value):
+        return value in self._proj_ids
+
+    def is_amc_id(self, value):
+        return value in self._amc_ids
+
+    def class_funds(self, proj_id):
+        # Cached class fund rows of a fund, or None if never fetched
+        return self._classes.get(proj_id)
+
+    def __len__(self):
+        return len(self._symbols)
+
+    # Write-back
+    def learn_funds(self, rows):
+        # Fund list rows (fund/amc/{unique_id}, POST fund)
+        with self._lock:
+            for row in rows or []:
+                entry = self._add(row.get("proj_abbr_name"), row.get("proj_id"), row.get("unique_id"))
+                if entry is not None:
+                    self._remember(entry)
+
+    def learn_class_funds(self, proj_id, rows):
+        # Class fund rows (fund/{proj_id}/class_fund, POST fund/class_fund)
+        with self._lock:
+            by_fund = {}
+            for row in rows or []:
+                fund = row.get("proj_id") or proj_id
+                if not fund:
+                    continue
+                by_fund.setdefault(fund, []).append(row)
+                for name in (row.get("proj_abbr_name"), row.get("class_abbr_name")):
+                    entry = self._add(name, fund, None)
+                    if entry is not None:
+                        self._remember(entry)
+            # A GET by proj_id returns every class; a name search may not
+            if proj_id and proj_id in by_fund:
+                self._classes[proj_id] = by_fund[proj_id]
+                self._dirty = True
+
+    def _remember(self, entry):
+        key = normalize(entry["symbol"])
+        if self._learned.get(key) != entry:
+            self._learned[key] = entry
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty or self.CachePath is None:
+                return
+            cache = {
+                "updated_at" : datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+                "symbols" : {e["symbol"] : {"proj_id" : e["proj_id"], "amc_id" : e["amc_id"]}
+                             for e in sorted(self._learned.values(), key=lambda e: e["symbol"])},
+                "class_funds" : dict(sorted(self._classes.items())),
+            }
+            self.CachePath.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.CachePath.with_suffix(".tmp")
+            tmp.write_text(json.dumps(cache, indent=2, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.CachePath)
+            self._dirty = False
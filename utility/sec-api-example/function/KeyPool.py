@@ -0,0 +1,141 @@
+# Pool of subscription keys for one product, each with its own quota
+#
+# The SEC API gateway counts the quota per subscription key, and a product can be
+# subscribed twice (primary and secondary key). A product's keys come from .env:
+#   FundFactsheetKey=primary                    one key: the client works as before,
+#                                               through RateLimiter (function/AllFunction.py)
+#   FundFactsheetKey=primary,secondary          or FundFactsheetSecondaryKey=secondary:
+#                                               requests are spread over the keys
+# With more than one key every key has its own bucket of SecApiKeyBudget calls
+# (default 3000/300 s, the RateLimiter budget) and acquire() picks keys by smooth
+# weighted round robin (as nginx upstreams), the weight being the calls left in
+# each bucket: equal buckets alternate, a key that has been used more is picked
+# less until the others catch up.
+#   401   the key is invalid or not subscribed: not used again in this process
+#   429   the gateway disagrees with our count: the key rests for Retry-After
+# The client then sends the request again with another key. When every key is
+# resting or spent, acquire() raises RateLimitException with the time until the
+# first one is back, like RateLimiter does, so callers that wait on that
+# (corpus/CrawlEngine.py) keep working.
+#
+# from function.Client import Client
+# Client.default().keys("FundFactsheet").stats()
+
+from collections import deque
+import os
+import threading
+import time
+
+from ratelimit import RateLimitException
+
+# calls / seconds per key, as RateLimiter
+KEY_BUDGET = (3000, 300)
+
+def budget():
+    value = os.getenv("SecApiKeyBudget")
+    if not value:
+        return KEY_BUDGET
+    calls, _, period = value.partition("/")
+    return (int(calls), float(period or 1))
+
+def env_keys(variable):
+    # Keys of a product: comma separated in {variable}, then {name}SecondaryKey
+    values = (os.getenv(variable) or "").split(",")
+    if variable.endswith("Key"):
+        values += (os.getenv(variable[:-3] + "SecondaryKey") or "").split(",")
+    keys = []
+    for value in values:
+        value = value.strip()
+        if value and value not in keys:
+            keys.append(value)
+    return keys
+
+def mask(key):
+    return "..." + key[-4:] if key and len(key) > 4 else "****"
+
+class _Key:
+
+    __slots__ = ("key", "calls", "sent", "current", "invalid", "resting_until", "failures")
+
+    def __init__(self, key):
+        self.key = key
+        self.calls = deque()        # monotonic times of the calls in the window
+        self.sent = 0
+        self.current = 0.0          # smooth weighted round robin score
+        self.invalid = False
+        self.resting_until = 0.0
+        self.failures = {}
+
+class KeyPool:
+
+    def __init__(self, keys, calls=None, period=None):
+        default_calls, default_period = budget()
+        self.limit = calls or default_calls
+        self.period = period or default_period
+        self._keys = [_Key(k) for k in keys]
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, variable):
+        return cls(env_keys(variable))
+
+    def __len__(self):
+        return len(self._keys)
+
+    @property
+    def primary(self):
+        return self._keys[0].key if self._keys else None
+
+    def _left(self, entry, now):
+        while entry.calls and now - entry.calls[0] >= self.period:
+            entry.calls.popleft()
+        return self.limit - len(entry.calls)
+
+    def acquire(self, exclude=()):
+        # A key to send one request with (counted in its bucket); None when every
+        # key is in exclude
+        now = time.monotonic()
+        with self._lock:
+            valid = [e for e in self._keys if not e.invalid]
+            if not valid:
+                # Only invalid keys: let the gateway answer (401) for one of them
+                return next((e.key for e in self._keys if e.key not in exclude), None)
+            left = {id(e) : self._left(e, now) for e in valid}
+            ready = [e for e in valid if e.key not in exclude and e.resting_until <= now and left[id(e)] > 0]
+            if not ready:
+                wait = min(
+                    max(e.resting_until - now, e.calls[0] + self.period - now if left[id(e)] <= 0 else 0)
+                    for e in valid
+                )
+                raise RateLimitException("All subscription keys are over their quota", max(wait, 0.001))
+            total = 0
+            for e in ready:
+                e.current += left[id(e)]
+                total += left[id(e)]
+            chosen = max(ready, key=lambda e: e.current)
+            chosen.current -= total
+            chosen.calls.append(now)
+            chosen.sent += 1
+            return chosen.key
+
+    def failed(self, key, status, retry_after=None):
+        # The gateway refused key with 401 / 429
+        with self._lock:
+            for e in self._keys:
+                if e.key == key:
+                    e.failures[status] = e.failures.get(status, 0) + 1
+                    if status == 401:
+                        if not e.invalid:
+                            print("Subscription key [{}] was refused (401), using the other keys".format(mask(key)))
+                        e.invalid = True
+                    else:
+                        e.resting_until = time.monotonic() + (retry_after if retry_after is not None else self.period)
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {"key" : mask(e.key), "sent" : e.sent, "left" : self._left(e, now), "invalid" : e.invalid,
+                 "resting_s" : round(max(e.resting_until - now, 0), 1), "failures" : dict(e.failures)}
+                for e in self._keys
+            ]
@@ -0,0 +1,170 @@
+# Batch licensee lookups on top of function/LicenseCheck.py, with a local TTL cache
+#
+# Vetting many people and companies one call at a time means, per entity, a
+# name search and then 2-3 sub-resource calls by unique_id. LicenseBatch takes
+# lists instead:
+#   persons([...])     names or (name, regis_sale_no); searches run concurrently,
+#                      then license + work_info of every match, also concurrently
+#   companies([...])   names or unique_ids; licensecheck_lcs_company(name) answers
+#                      with the whole company list, so it is fetched once and the
+#                      names are matched locally, then license + personnel +
+#                      business_act of every match concurrently
+# Every answer is kept with the time it was fetched in data/licensecheck-cache.json
+# of this folder (ignored by git, unlike the repo's data/); entries younger than
+# TtlDays are served from there, so a repeated run only calls the API for new or
+# expired entities. Empty or failed answers (None) are not cached.
+# Set LicenseCheckCache in .env to use another file, or to an empty value to
+# keep the cache in memory only.
+#
+# from function.LicenseBatch import LicenseBatch
+# batch = LicenseBatch()
+# batch.companies(["ABERDEEN ASSET MANAGEMENT (THAILAND) LIMITED"])
+# batch.persons([("Somchai Jaidee", ""), "Somsri Rakdee"])
+# batch.save()
+
+from function.LicenseCheck import (
+    licensecheck_lcs_company, licensecheck_lcs_company_business_act, licensecheck_lcs_company_license,
+    licensecheck_lcs_company_personnel, licensecheck_lcs_person, licensecheck_lcs_person_license,
+    licensecheck_lcs_person_workinfo,
+)
+from function import Scheduler
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import json
+import os
+import re
+import threading
+
+TOOL_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_CACHE = TOOL_DIR / "data" / "licensecheck-cache.json"
+
+# Sub-resources expanded for every match
+PERSON_RESOURCES = {
+    "license" : licensecheck_lcs_person_license,
+    "work_info" : licensecheck_lcs_person_workinfo,
+}
+COMPANY_RESOURCES = {
+    "license" : licensecheck_lcs_company_license,
+    "personnel" : licensecheck_lcs_company_personnel,
+    "business_act" : licensecheck_lcs_company_business_act,
+}
+
+def normalize(name):
+    return re.sub(r"\s+", " ", str(name or "")).strip().upper()
+
+class LicenseBatch:
+
+    def __init__(self, CachePath=None, TtlDays=7, Workers=8, priority=None):
+        if CachePath is None:
+            CachePath = os.getenv("LicenseCheckCache", str(DEFAULT_CACHE))
+        self.CachePath = Path(CachePath) if CachePath else None
+        self.Ttl = timedelta(days=TtlDays)
+        self.Workers = Workers
+        self.priority = priority
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.calls = 0
+        self.hits = 0
+        # key -> {"fetched_at", "response"}
+        self._entries = {}
+        if self.CachePath is not None and self.CachePath.is_file():
+            try:
+                self._entries = json.loads(self.CachePath.read_text(encoding="utf-8")).get("entries") or {}
+            except ValueError as e:
+                print("Ignoring unreadable license cache [{}]: {}".format(self.CachePath, e))
+
+    # Cache
+    def _cached(self, key, function, *args):
+        # Fresh cached answer, else call the API and keep the answer
+        now = datetime.now(timezone.utc)
+        entry = self._entries.get(key)
+        if entry is not None and now - datetime.fromisoformat(entry["fetched_at"]) < self.Ttl:
+            with self._lock:
+                self.hits += 1
+            return entry["response"]
+        with Scheduler.priority(self.priority):
+            response = function(*args)
+        with self._lock:
+            self.calls += 1
+            if response is not None:
+                self._entries[key] = {"fetched_at" : now.isoformat(), "response" : response}
+                self._dirty = True
+        return response
+
+    def _map(self, function, items):
+        with ThreadPoolExecutor(max_workers=self.Workers) as pool:
+            return list(pool.map(function, items))
+
+    def _expand(self, kind, resources, unique_ids):
+        # {unique_id: {resource: response}} for every id x resource, concurrently
+        tasks = [(unique_id, name) for unique_id in unique_ids for name in resources]
+        results = self._map(
+            lambda task: self._cached("{}_{}|{}".format(kind, task[1], task[0]), resources[task[1]], task[0]), tasks
+        )
+        details = {unique_id : {} for unique_id in unique_ids}
+        for (unique_id, name), response in zip(tasks, results):
+            details[unique_id][name] = response
+        return details
+
+    # Persons
+    def persons(self, people, expand=True):
+        # {name: {"matches" : [rows], "details" : {unique_id: {resource: response}}}}
+        people = [p if isinstance(p, (tuple, list)) else (p, "") for p in people]
+        searches = self._map(
+            lambda p: self._cached("person|{}|{}".format(normalize(p[0]), p[1] or ""), licensecheck_lcs_person, p[0], p[1] or ""),
+            people,
+        )
+        result = {}
+        for (name, _), rows in zip(people, searches):
+            result[name] = {"matches" : rows or [], "details" : {}}
+        if expand:
+            ids = sorted({row["unique_id"] for r in result.values() for row in r["matches"] if row.get("unique_id")})
+            details = self._expand("person", PERSON_RESOURCES, ids)
+            for r in result.values():
+                r["details"] = {row["unique_id"] : details[row["unique_id"]] for row in r["matches"] if row.get("unique_id")}
+        return result
+
+    # Companies
+    def company_list(self):
+        # licensecheck_lcs_company answers any name with the full company list
+        return self._cached("company_list", licensecheck_lcs_company, "") or []
+
+    def match_company(self, name_or_id, companies):
+        # Rows whose unique_id or any text field equals the name (else contains it);
+        # a blank name matches nothing (it is contained in every text)
+        target = normalize(name_or_id)
+        if not target:
+            return []
+        exact, partial = [], []
+        for row in companies:
+            texts = [normalize(v) for v in row.values() if isinstance(v, str)]
+            if target in texts:
+                exact.append(row)
+            elif any(target in text for text in texts if text):
+                partial.append(row)
+        return exact or partial
+
+    def companies(self, names, expand=True):
+        # {name: {"matches" : [rows], "details" : {unique_id: {resource: response}}}}
+        companies = self.company_list()
+        result = {name : {"matches" : self.match_company(name, companies), "details" : {}} for name in names}
+        for name, r in result.items():
+            if not r["matches"]:
+                print("No company matches [{}]".format(name))
+        if expand:
+            ids = sorted({row["unique_id"] for r in result.values() for row in r["matches"] if row.get("unique_id")})
+            details = self._expand("company", COMPANY_RESOURCES, ids)
+            for r in result.values():
+                r["details"] = {row["unique_id"] : details[row["unique_id"]] for row in r["matches"] if row.get("unique_id")}
+        return result
+
+    def save(self):
+        with self._lock:
+            if not self._dirty or self.CachePath is None:
+                return
+            self.CachePath.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.CachePath.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"entries" : self._entries}, indent=2, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.CachePath)
+            self._dirty = False
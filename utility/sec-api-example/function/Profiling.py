@@ -0,0 +1,325 @@
+# Opt-in profiling of API calls and the pipeline around them
+#
+# Off by default: phase() returns a shared no-op context and note_response()
+# returns at once. Switched on for a whole process by the environment
+#   SecApiProfile=1                        phase timings and bytes per endpoint
+#   SecApiProfile=cprofile,tracemalloc,sample
+#                                          the same plus the heavier collectors
+#   SecApiProfileDir=log/profile/crawl     where to write (default log/profile/run-<time>)
+# (read when the client is first used, written at exit), or around one block:
+#
+# from function.Profiling import Profile
+# with Profile("crawl", sample=True, OutputDir="log/profile/crawl") as profile:
+#     ...
+# profile.report()
+#
+# What is measured, per endpoint (function/Endpoints.py name):
+#   call          Client.call, everything below included (client middleware)
+#   rate_wait     waiting for the pacer of corpus/CrawlEngine.py before a call
+#   queue_wait    waiting for a turn from function/Scheduler.py (schedule policy)
+#   rate_backoff  sleeping after RateLimitException (budget used by another caller)
+#   retry_backoff sleeping before a retry of a connection error (SecApiRetries)
+#   connect       DNS + TCP connect of a new connection (urllib3 create_connection)
+#   tls           TLS handshake of a new HTTPS connection
+#   server        send to response headers, minus connect / tls (response.elapsed)
+#   transfer      reading the response body
+#   decode        response.json()
+#   bytes, empty  response body size, calls answered with nothing (not 200)
+#   alloc_bytes   memory still allocated after the call (tracemalloc only)
+# and pipeline phases named by the caller (Main.py: concat, merge) under "main".
+# Keep-alive connections skip connect / tls, so those count new connections only.
+#
+# Written to the output folder:
+#   report.json      the numbers above
+#   phases.folded    endpoint;phase microseconds (exclusive), for flamegraph.pl /
+#                    speedscope: where the wall time of the calls went
+#   stacks.folded    sampled Python stacks of every thread (sample)
+#   cprofile.prof    pstats file of the thread that started profiling (cprofile)
+#   tracemalloc.txt  top allocation sites (tracemalloc)
+
+from collections import Counter
+from contextlib import nullcontext
+from datetime import datetime
+from pathlib import Path
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+
+MODES = ("cprofile", "tracemalloc", "sample")
+
+_NULL = nullcontext()
+_active = None
+_local = threading.local()
+
+def active():
+    return _active
+
+def _endpoint(endpoint=None):
+    return endpoint or getattr(_local, "endpoint", None) or "main"
+
+class _Phase:
+
+    __slots__ = ("profile", "endpoint", "name", "start")
+
+    def __init__(self, profile, endpoint, name):
+        self.profile, self.endpoint, self.name = profile, endpoint, name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.add(self.endpoint, self.name, time.perf_counter() - self.start)
+
+def phase(name, endpoint=None):
+    # Times the block under (endpoint, name) while a profile is running
+    profile = _active
+    if profile is None:
+        return _NULL
+    return _Phase(profile, _endpoint(endpoint), name)
+
+def note_response(response, seconds):
+    # Splits one requests call (seconds in total) into server / transfer and counts its bytes
+    profile = _active
+    if profile is None:
+        return
+    endpoint = _endpoint()
+    connect = getattr(_local, "connect", 0.0)
+    _local.connect = 0.0
+    elapsed = response.elapsed.total_seconds()
+    profile.add(endpoint, "server", max(elapsed - connect, 0.0))
+    profile.add(endpoint, "transfer", max(seconds - elapsed, 0.0))
+    profile.count(endpoint, "bytes", len(response.content))
+    if response.status_code != 200:
+        profile.count(endpoint, "empty")
+
+# urllib3 hooks, installed while a profile runs
+def _patch_connections():
+    import urllib3.connection
+    import urllib3.util.connection
+
+    create_connection = urllib3.util.connection.create_connection
+    https_connect = urllib3.connection.HTTPSConnection.connect
+
+    def timed_create_connection(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return create_connection(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - started
+            _local.tcp = seconds
+            _local.connect = getattr(_local, "connect", 0.0) + seconds
+            if _active is not None:
+                _active.add(_endpoint(), "connect", seconds)
+
+    def timed_https_connect(self):
+        started = time.perf_counter()
+        _local.tcp = 0.0
+        try:
+            return https_connect(self)
+        finally:
+            tls = time.perf_counter() - started - _local.tcp
+            _local.connect = getattr(_local, "connect", 0.0) + tls
+            if _active is not None:
+                _active.add(_endpoint(), "tls", tls)
+
+    urllib3.util.connection.create_connection = timed_create_connection
+    urllib3.connection.HTTPSConnection.connect = timed_https_connect
+
+    def restore():
+        urllib3.util.connection.create_connection = create_connection
+        urllib3.connection.HTTPSConnection.connect = https_connect
+    return restore
+
+class _Sampler(threading.Thread):
+    # Stack of every other thread every `interval` seconds, as folded stacks
+
+    def __init__(self, interval):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.stacks = Counter()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            names = {t.ident : t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == self.ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append("{} ({}:{})".format(code.co_name, Path(code.co_filename).name, code.co_firstlineno))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+class Profile:
+
+    def __init__(self, name="run", cprofile=False, tracemalloc=False, sample=False, interval=0.005, OutputDir=None):
+        self.name = name
+        self.modes = {"cprofile" : cprofile, "tracemalloc" : tracemalloc, "sample" : sample}
+        self.interval = interval
+        self.OutputDir = Path(OutputDir) if OutputDir else None
+        # endpoint -> {phase: [count, total, max]}, endpoint -> Counter of bytes, calls, ...
+        self.phases = {}
+        self.counts = {}
+        self.wall = 0.0
+        self._lock = threading.Lock()
+        self._undo = []
+
+    @classmethod
+    def from_env(cls):
+        # Profile described by SecApiProfile, or None
+        value = (os.getenv("SecApiProfile") or "").strip().lower()
+        if value in ("", "0", "false", "no", "off"):
+            return None
+        modes = {m.strip() for m in value.split(",")}
+        unknown = modes - set(MODES) - {"1", "true", "yes", "on"}
+        if unknown:
+            raise ValueError("Unknown SecApiProfile modes: {}".format(", ".join(sorted(unknown))))
+        OutputDir = os.getenv("SecApiProfileDir") or Path("log") / "profile" / "run-{}".format(datetime.now().strftime("%Y%m%d%H%M%S"))
+        return cls(**{m : m in modes for m in MODES}, OutputDir=OutputDir)
+
+    # Collecting
+    def add(self, endpoint, name, seconds):
+        with self._lock:
+            entry = self.phases.setdefault(endpoint, {}).setdefault(name, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def count(self, endpoint, name, value=1):
+        with self._lock:
+            self.counts.setdefault(endpoint, Counter())[name] += value
+
+    def middleware(self, endpoint, url, data, proceed):
+        # Client middleware: names the endpoint for the phases below it and times the call
+        import tracemalloc
+
+        outer = getattr(_local, "endpoint", None)
+        _local.endpoint = endpoint.name
+        _local.connect = 0.0
+        tracing = tracemalloc.is_tracing()
+        before = tracemalloc.get_traced_memory()[0] if tracing else 0
+        started = time.perf_counter()
+        try:
+            return proceed()
+        finally:
+            self.add(endpoint.name, "call", time.perf_counter() - started)
+            self.count(endpoint.name, "calls")
+            if tracing:
+                self.count(endpoint.name, "alloc_bytes", tracemalloc.get_traced_memory()[0] - before)
+            _local.endpoint = outer
+
+    # Running
+    def start(self):
+        global _active
+        if _active is not None:
+            raise RuntimeError("A profile is already running: {}".format(_active.name))
+        from function.Client import Client
+
+        client = Client.default()
+        client.use(self.middleware)
+        self._undo.append(lambda: client.middleware.remove(self.middleware))
+        self._undo.append(_patch_connections())
+        if self.modes["tracemalloc"]:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+                self._undo.append(tracemalloc.stop)
+            self._undo.append(self._snapshot)
+        if self.modes["cprofile"]:
+            import cProfile
+
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+            self._undo.append(self._cprofile.disable)
+        if self.modes["sample"]:
+            self._sampler = _Sampler(self.interval)
+            self._sampler.start()
+            self._undo.append(self._sampler.stop)
+        self._started = time.perf_counter()
+        _active = self
+        return self
+
+    def _snapshot(self):
+        import tracemalloc
+
+        self._top = tracemalloc.take_snapshot().statistics("lineno")[:30]
+
+    def stop(self):
+        global _active
+        if _active is self:
+            _active = None
+        self.wall = time.perf_counter() - self._started
+        while self._undo:
+            self._undo.pop()()
+        if self.OutputDir:
+            self.write(self.OutputDir)
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # Results
+    def report(self):
+        with self._lock:
+            endpoints = {}
+            for endpoint in sorted(set(self.phases) | set(self.counts)):
+                entry = dict(self.counts.get(endpoint) or {})
+                entry["phases"] = {
+                    name : {"count" : c, "total_ms" : round(t * 1e3, 3), "mean_ms" : round(t / c * 1e3, 3), "max_ms" : round(m * 1e3, 3)}
+                    for name, (c, t, m) in sorted((self.phases.get(endpoint) or {}).items(), key=lambda kv: -kv[1][1])
+                }
+                endpoints[endpoint] = entry
+        return {"name" : self.name, "wall_s" : round(self.wall, 3), "modes" : [m for m, on in self.modes.items() if on], "endpoints" : endpoints}
+
+    def folded(self):
+        # "name;endpoint;phase microseconds", exclusive: call time not accounted
+        # for by the phases inside it is reported as "other"
+        inner = ("retry_backoff", "connect", "tls", "server", "transfer", "decode")
+        lines = []
+        with self._lock:
+            for endpoint, phases in sorted(self.phases.items()):
+                totals = {name : entry[1] for name, entry in phases.items()}
+                for name, seconds in sorted(totals.items()):
+                    if name != "call":
+                        lines.append((endpoint, name, seconds))
+                if "call" in totals:
+                    other = totals["call"] - sum(totals.get(n, 0.0) for n in inner)
+                    lines.append((endpoint, "other", max(other, 0.0)))
+        return ["{};{};{} {}".format(self.name, e, n, int(s * 1e6)) for e, n, s in lines if s > 0]
+
+    def write(self, OutputDir):
+        OutputDir = Path(OutputDir)
+        OutputDir.mkdir(parents=True, exist_ok=True)
+        (OutputDir / "report.json").write_text(json.dumps(self.report(), indent=2, ensure_ascii=False), encoding="utf-8")
+        (OutputDir / "phases.folded").write_text("\n".join(self.folded()) + "\n", encoding="utf-8")
+        if self.modes["sample"]:
+            lines = ["{} {}".format(stack, count) for stack, count in self._sampler.stacks.most_common()]
+            (OutputDir / "stacks.folded").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        if self.modes["cprofile"]:
+            self._cprofile.dump_stats(str(OutputDir / "cprofile.prof"))
+        if self.modes["tracemalloc"]:
+            (OutputDir / "tracemalloc.txt").write_text("\n".join(str(s) for s in self._top) + "\n", encoding="utf-8")
+        print("Profile written to [{}]".format(OutputDir))
+
+def start_from_env():
+    # Called once by Client.default(): profile the whole process when SecApiProfile is set
+    profile = Profile.from_env()
+    if profile is not None:
+        profile.start()
+        atexit.register(profile.stop)
+    return profile
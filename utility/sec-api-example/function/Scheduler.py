@@ -0,0 +1,165 @@
+# Priority scheduling of API calls over one shared rate budget
+#
+# With the "schedule" client policy on (SecApiSchedule=1 or
+# Client.default().configure(schedule=True)) every request that is not answered
+# from the response cache waits for a turn from a Scheduler before it is sent
+# (one per KeyPool of several keys, one shared by the other products). Turns come from a token bucket at 90% of the product's budget
+# (the RateLimiter budget, times the number of keys of a KeyPool), so the process
+# stays under the quota instead of running into RateLimitException, and they are
+# handed out by weighted fair queueing between three classes:
+#   interactive   weight 16   someone is waiting for the answer (the default)
+#   refresh       weight 4    keeping the corpus current (DeltaSync, TrackingError, ...)
+#   backfill      weight 1    crawls and history extensions
+# Self-clocked fair queueing: a call of class c gets the tag max(V, last tag of
+# c) + 1 / weight(c), the lowest tag at the head of a queue is served next and V
+# becomes the tag served. An interactive call that arrives behind thousands of
+# queued backfill calls is next in line; when only backfill is waiting it gets
+# every token.
+#
+# A call whose deadline passes while it waits is dropped with DeadlineExceeded
+# instead of being sent late: interactive calls have SecApiInteractiveDeadline
+# seconds (default 10), the other classes wait as long as it takes.
+#
+# The class of a call is set per thread:
+# from function.Scheduler import priority
+# with priority("backfill"):
+#     fund_factsheet_fee(proj_id)
+
+from collections import deque
+import os
+import threading
+import time
+
+INTERACTIVE, REFRESH, BACKFILL = "interactive", "refresh", "backfill"
+
+# class -> (weight, deadline in seconds or None)
+CLASSES = {
+    INTERACTIVE : (16, 10.0),
+    REFRESH : (4, None),
+    BACKFILL : (1, None),
+}
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+_local = threading.local()
+
+def current_priority():
+    return getattr(_local, "priority", None) or os.getenv("SecApiPriority") or INTERACTIVE
+
+class priority:
+    # Context manager: calls made by this thread in the block belong to `name`
+
+    def __init__(self, name):
+        if name is not None and name not in CLASSES:
+            raise ValueError("Unknown priority class: {}".format(name))
+        self.name = name
+
+    def __enter__(self):
+        self.outer = getattr(_local, "priority", None)
+        _local.priority = self.name or self.outer
+        return self
+
+    def __exit__(self, *exc):
+        _local.priority = self.outer
+
+def deadline(name):
+    if name == INTERACTIVE and os.getenv("SecApiInteractiveDeadline"):
+        seconds = float(os.getenv("SecApiInteractiveDeadline"))
+        return seconds if seconds > 0 else None
+    return CLASSES[name][1]
+
+class _Call:
+
+    __slots__ = ("name", "tag", "deadline", "enqueued", "state")
+
+    def __init__(self, name, tag, deadline, enqueued):
+        self.name, self.tag, self.deadline, self.enqueued = name, tag, deadline, enqueued
+        self.state = "waiting"      # -> "go" / "dropped"
+
+class Scheduler:
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self._tokens = self.burst
+        self._refilled = time.monotonic()
+        self._queues = {name : deque() for name in CLASSES}
+        self._last_tag = {name : 0.0 for name in CLASSES}
+        self._virtual = 0.0
+        self._cond = threading.Condition()
+        self._stats = {name : {"served" : 0, "dropped" : 0, "wait_s" : 0.0, "max_wait_s" : 0.0} for name in CLASSES}
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def _drop_expired(self, now):
+        for name, queue in self._queues.items():
+            kept = deque(call for call in queue if call.deadline is None or call.deadline > now)
+            if len(kept) != len(queue):
+                for call in queue:
+                    if call.deadline is not None and call.deadline <= now:
+                        call.state = "dropped"
+                        self._stats[name]["dropped"] += 1
+                self._queues[name] = kept
+
+    def _dispatch(self, now):
+        # Hand out the tokens there are to the lowest tags; wake everyone if any moved
+        self._refill(now)
+        self._drop_expired(now)
+        moved = False
+        while self._tokens >= 1:
+            heads = [queue[0] for queue in self._queues.values() if queue]
+            if not heads:
+                break
+            call = min(heads, key=lambda c: c.tag)
+            self._queues[call.name].popleft()
+            self._tokens -= 1
+            self._virtual = call.tag
+            call.state = "go"
+            stats = self._stats[call.name]
+            waited = now - call.enqueued
+            stats["served"] += 1
+            stats["wait_s"] += waited
+            stats["max_wait_s"] = max(stats["max_wait_s"], waited)
+            moved = True
+        return moved
+
+    def acquire(self, name=None):
+        # Blocks until this call's turn; DeadlineExceeded if its deadline passes first
+        name = name or current_priority()
+        weight, _ = CLASSES[name]
+        limit = deadline(name)
+        with self._cond:
+            now = time.monotonic()
+            tag = max(self._virtual, self._last_tag[name]) + 1.0 / weight
+            self._last_tag[name] = tag
+            call = _Call(name, tag, now + limit if limit is not None else None, now)
+            self._queues[name].append(call)
+            while True:
+                if self._dispatch(now) or call.state != "waiting":
+                    self._cond.notify_all()
+                if call.state == "go":
+                    return now - call.enqueued
+                if call.state == "dropped":
+                    raise DeadlineExceeded("{} call dropped after waiting {:.1f} s".format(name, now - call.enqueued))
+                # Next token, or this call's deadline, whichever comes first
+                timeout = max((1 - self._tokens) / self.rate, 0.0005)
+                if call.deadline is not None:
+                    timeout = min(timeout, max(call.deadline - now, 0))
+                self._cond.wait(timeout)
+                now = time.monotonic()
+
+    def queued(self):
+        with self._cond:
+            return {name : len(queue) for name, queue in self._queues.items()}
+
+    def stats(self):
+        with self._cond:
+            return {
+                name : {"served" : s["served"], "dropped" : s["dropped"], "queued" : len(self._queues[name]),
+                        "mean_wait_ms" : round(s["wait_s"] / s["served"] * 1e3, 2) if s["served"] else None,
+                        "max_wait_ms" : round(s["max_wait_s"] * 1e3, 2)}
+                for name, s in self._stats.items()
+            }